@@ -0,0 +1,146 @@
+"""
+全点对瓶颈矩阵：由最大生成森林的合并顺序直接得到 n x n 的答案矩阵（需要 NumPy）
+
+按边权从大到小重放森林边的合并：合并连通分量 A 和 B 的边权 w
+就是 A 中任一点到 B 中任一点的答案，于是 M[A, B] = M[B, A] = w，
+每个点对恰好被赋值一次，总共 O(n^2)，而 Floyd 需要 O(n^3)。
+
+为了按块赋值，第一遍只重放合并：每个连通分量的成员用链表串起来，合并时把两条链表首尾相接，
+记录合并前两个分量的表头和大小。合并只会整体拼接链表，所以最终的链表顺序中，
+每次合并的两个分量都是一段连续区间，第二遍按区间取出成员数组，用 np.ix_ 整块赋值。
+
+矩阵元素：
+    M[x - 1, y - 1] 为 x 到 y 的最大载重
+    不连通为 -1
+    对角线（起点等于终点）为 dtype 的最大值（浮点边权时为 inf）
+整数边权使用能容纳全部边权和 -1 的最小有符号整数类型，n = 10^4 时 int16 边权只需 200 MB。
+指定 path 时矩阵写入内存映射的 .npy 文件（np.lib.format.open_memmap），不需要整个放进内存。
+"""
+
+from common import np
+
+
+def compact_dtype(ws):
+    """
+    能容纳全部边权、-1（不连通）和对角线哨兵的最小类型
+    Args:
+        ws: 边权数组
+    Returns:
+        (dtype, 对角线的值)
+    """
+    if ws.dtype.kind == "f":
+        return np.dtype(np.float64), np.inf
+    low = min(int(ws.min()), -1) if ws.size else -1
+    high = int(ws.max()) if ws.size else 0
+    for dtype in (np.int8, np.int16, np.int32, np.int64):
+        info = np.iinfo(dtype)
+        if info.min <= low and high < info.max:
+            return np.dtype(dtype), int(info.max)
+    raise ValueError("边权超出 int64 范围")
+
+
+def replay_merges(n, us, vs, ws):
+    """
+    按边权从大到小重放森林边的合并，成员链表首尾相接
+    Args:
+        n: 城市数量
+        us, vs, ws: 森林边（顺序任意）
+    Returns:
+        (merges, order, pos)：merges 为 (A 表头, A 大小, B 表头, B 大小, 边权) 列表；
+        order 为最终链表顺序的节点编号数组（int64，已减 1），pos[u] 为 u 在 order 中的位置
+    """
+    parent = list(range(n + 1))
+    size = [1] * (n + 1)
+    head = list(range(n + 1))
+    tail = list(range(n + 1))
+    next_node = [0] * (n + 1)
+    merges = []
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for i in sorted(range(len(ws)), key=ws.__getitem__, reverse=True):
+        ra = find(us[i])
+        rb = find(vs[i])
+        if ra == rb:
+            continue
+        merges.append((head[ra], size[ra], head[rb], size[rb], ws[i]))
+        # B 的链表接在 A 之后，再把较小的集合挂到较大的集合上
+        new_head = head[ra]
+        new_tail = tail[rb]
+        next_node[tail[ra]] = head[rb]
+        if size[ra] < size[rb]:
+            ra, rb = rb, ra
+        parent[rb] = ra
+        size[ra] += size[rb]
+        head[ra] = new_head
+        tail[ra] = new_tail
+
+    order = []
+    for r in range(1, n + 1):
+        if parent[r] == r:
+            u = head[r]
+            for _ in range(size[r]):
+                order.append(u)
+                u = next_node[u]
+    pos = [0] * (n + 1)
+    for i, u in enumerate(order):
+        pos[u] = i
+    return merges, np.asarray(order, dtype=np.int64) - 1, pos
+
+
+def parent_forest_edges(n, parent, weight):
+    """
+    由父节点数组得到森林边（根的父节点是自己）
+    Args:
+        n: 城市数量
+        parent, weight: 父节点和到父节点的边权（list、memoryview 或 numpy 数组）
+    Returns:
+        (us, vs, ws) 列表
+    """
+    nodes = np.arange(1, n + 1)
+    children = nodes[np.asarray(parent[1:n + 1]) != nodes].tolist()
+    return children, [int(parent[v]) for v in children], [weight[v] for v in children]
+
+
+def bottleneck_matrix(n, us, vs, ws, path=None):
+    """
+    由最大生成森林的边得到全点对瓶颈矩阵
+    Args:
+        n: 城市数量
+        us, vs, ws: 森林边的端点和边权（顺序任意）
+        path: 可选的 .npy 文件路径，指定时写入内存映射文件
+    Returns:
+        (n, n) 的 numpy 数组或 np.memmap
+    """
+    if np is None:
+        raise ImportError("all_pairs 需要安装 NumPy")
+
+    us = [int(u) for u in us]
+    vs = [int(v) for v in vs]
+    ws_array = np.asarray(ws) if len(ws) else np.zeros(0, dtype=np.int64)
+    dtype, diagonal = compact_dtype(ws_array)
+    ws = ws_array.tolist()
+
+    if path is None:
+        matrix = np.full((n, n), -1, dtype=dtype)
+    else:
+        matrix = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=(n, n))
+        matrix[...] = -1
+    np.fill_diagonal(matrix, diagonal)
+
+    merges, order, pos = replay_merges(n, us, vs, ws)
+    for head_a, size_a, head_b, size_b, w in merges:
+        start_a = pos[head_a]
+        start_b = pos[head_b]
+        a = order[start_a:start_a + size_a]
+        b = order[start_b:start_b + size_b]
+        matrix[np.ix_(a, b)] = w
+        matrix[np.ix_(b, a)] = w
+
+    if path is not None:
+        matrix.flush()
+    return matrix
@@ -0,0 +1,428 @@
+"""
+基准测试：在多种图族和规模上分别计时构建与查询阶段，结果写入 JSON，
+并可与保存的基线对比，任一阶段变慢超过阈值时以非零状态退出。
+
+图族：
+    random   随机图 G(n, m)
+    chain    长链（n - 1 条链边，其余为随机边；链边权更大，最大生成树就是这条链）
+    star     星形（中心连向所有节点，其余为随机边；星形边权更大，最大生成树深度为 1）
+    grid     网格（sqrt(n) x sqrt(n) 的四邻接网格，m 由网格决定）
+    cluster  稠密团簇（每 100 个节点一簇，九成边在簇内）
+
+每个 (图族, n, m, 求解器, 引擎) 组合先做 --warmup 次预热，再计时 --repeat 次，
+用 perf_counter_ns 分别记录 build（from_edges + solve）和 query（q 个随机查询）两个阶段。
+--memory 时在计时之外再用 tracemalloc 构建一次，build 记录中加上 peak_bytes / retained_bytes，
+对比时内存峰值超过阈值同样算作退化。
+
+用法：
+    python benchmark.py run --n 1000,10000,100000 --m-factor 2,8 --output bench.json
+    python benchmark.py run --families random,chain --n 1000000 --solvers method2 --engine numpy --output big.json
+    python benchmark.py run --n 100000 --memory --output mem.json
+    python benchmark.py compare baseline.json bench.json --threshold 0.2
+"""
+
+import argparse
+import json
+import math
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+from common import ENGINES, np
+from method1_binary_lifting import TruckTransportSolver1
+from method1_skew_binary import TruckTransportSolver1Skew
+from method2_tree_chain import TruckTransportSolver2
+from method3_euler_rmq import TruckTransportSolver3
+
+SOLVERS = {
+    "method1": TruckTransportSolver1,
+    "method1skew": TruckTransportSolver1Skew,
+    "method2": TruckTransportSolver2,
+    "method3": TruckTransportSolver3,
+}
+FAMILIES = ("random", "chain", "star", "grid", "cluster")
+PHASES = ("build", "query")
+MAX_WEIGHT = 10 ** 6
+CLUSTER_SIZE = 100
+
+
+def random_pairs(rng, n, count):
+    """count 个 1..n 中的随机点对，返回 (xs, ys)"""
+    if np is not None:
+        return rng.integers(1, n + 1, count), rng.integers(1, n + 1, count)
+    return [rng.randint(1, n) for _ in range(count)], [rng.randint(1, n) for _ in range(count)]
+
+
+def random_weights(rng, count):
+    """count 个随机边权"""
+    if np is not None:
+        return rng.integers(1, MAX_WEIGHT + 1, count)
+    return [rng.randint(1, MAX_WEIGHT) for _ in range(count)]
+
+
+def backbone_weights(rng, count):
+    """
+    count 个骨架边（长链或星形）的边权，都大于 random_weights 的范围，
+    最大生成树因此就是骨架本身，其余边不会替换骨架边
+    """
+    if np is not None:
+        return random_weights(rng, count) + MAX_WEIGHT
+    return [w + MAX_WEIGHT for w in random_weights(rng, count)]
+
+
+def concat(*parts):
+    """拼接若干列"""
+    if np is not None:
+        return np.concatenate([np.asarray(p, dtype=np.int64) for p in parts])
+    result = []
+    for p in parts:
+        result.extend(p)
+    return result
+
+
+def make_graph(family, n, m, seed):
+    """
+    生成一张图
+    Args:
+        family: 图族名称
+        n, m: 节点数和边数（grid 的 n、m 由网格决定）
+        seed: 随机种子
+    Returns:
+        (n, us, vs, ws)
+    """
+    rng = np.random.default_rng(seed) if np is not None else random.Random(seed)
+    arange = (lambda lo, hi: np.arange(lo, hi, dtype=np.int64)) if np is not None else (lambda lo, hi: list(range(lo, hi)))
+
+    ws = None  # 长链和星形单独生成边权，其余图族全部为随机边权
+    if family == "random":
+        us, vs = random_pairs(rng, n, m)
+    elif family == "chain":
+        extra = max(0, m - (n - 1))
+        xs, ys = random_pairs(rng, n, extra)
+        us, vs = concat(arange(1, n), xs), concat(arange(2, n + 1), ys)
+        ws = concat(backbone_weights(rng, n - 1), random_weights(rng, extra))
+    elif family == "star":
+        extra = max(0, m - (n - 1))
+        xs, ys = random_pairs(rng, n, extra)
+        us, vs = concat([1] * (n - 1), xs), concat(arange(2, n + 1), ys)
+        ws = concat(backbone_weights(rng, n - 1), random_weights(rng, extra))
+    elif family == "grid":
+        side = max(2, math.isqrt(n))
+        n = side * side
+        # 节点 (r, c) 编号为 r * side + c + 1
+        right_u = [r * side + c + 1 for r in range(side) for c in range(side - 1)]
+        down_u = list(range(1, n - side + 1))
+        us = concat(right_u, down_u)
+        vs = concat([u + 1 for u in right_u], [u + side for u in down_u])
+    elif family == "cluster":
+        inner = m * 9 // 10
+        if np is not None:
+            base = rng.integers(0, max(1, n // CLUSTER_SIZE), inner) * CLUSTER_SIZE
+            xs = np.minimum(base + rng.integers(1, CLUSTER_SIZE + 1, inner), n)
+            ys = np.minimum(base + rng.integers(1, CLUSTER_SIZE + 1, inner), n)
+        else:
+            xs, ys = [], []
+            for _ in range(inner):
+                base = rng.randrange(max(1, n // CLUSTER_SIZE)) * CLUSTER_SIZE
+                xs.append(min(n, base + rng.randint(1, CLUSTER_SIZE)))
+                ys.append(min(n, base + rng.randint(1, CLUSTER_SIZE)))
+        cross_u, cross_v = random_pairs(rng, n, m - inner)
+        us, vs = concat(xs, cross_u), concat(ys, cross_v)
+    else:
+        raise ValueError(f"未知图族: {family!r}，可选: {FAMILIES}")
+
+    if ws is None:
+        ws = random_weights(rng, len(us))
+    return n, us, vs, ws
+
+
+def time_ns(func, warmup, repeat):
+    """
+    预热 warmup 次后计时 repeat 次
+    Args:
+        func: 被计时的无参函数
+        warmup: 预热次数
+        repeat: 计时次数
+    Returns:
+        (每次耗时的纳秒列表, 最后一次的返回值)
+    """
+    result = None
+    for _ in range(warmup):
+        result = func()
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        result = func()
+        runs.append(time.perf_counter_ns() - start)
+    return runs, result
+
+
+def measure_memory(func):
+    """
+    用 tracemalloc 运行一次 func
+    Args:
+        func: 被统计的无参函数
+    Returns:
+        (峰值增量字节数, 结束时的保留增量字节数)
+    """
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = func()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak - before, current - before
+
+
+def bench_one(solver_class, engine, graph, queries, warmup, repeat, memory=False):
+    """
+    对一个求解器分别计时构建和查询
+    Args:
+        solver_class: 求解器类
+        engine: 求解器引擎
+        graph: make_graph 返回的 (n, us, vs, ws)
+        queries: (xs, ys) 查询点对
+        warmup, repeat: 预热和计时次数
+        memory: 是否额外用 tracemalloc 构建一次，记录构建的内存
+    Returns:
+        {"build": 纳秒列表, "query": 纳秒列表}，memory 时还有 "memory": (峰值, 保留)
+    """
+    n, us, vs, ws = graph
+    xs, ys = queries
+
+    def build():
+        """from_edges + solve，返回求解器"""
+        solver = solver_class.from_edges(n, us, vs, ws, engine=engine)
+        solver.solve()
+        return solver
+
+    build_runs, solver = time_ns(build, warmup, repeat)
+
+    if engine == "numpy":
+        def query():
+            """一次 query_many 回答全部查询"""
+            return solver.query_many(xs, ys)
+    else:
+        query_xs, query_ys = list(map(int, xs)), list(map(int, ys))
+
+        def query():
+            """逐个调用 query_max_weight"""
+            answer = solver.query_max_weight
+            return [answer(x, y) for x, y in zip(query_xs, query_ys)]
+
+    query_runs, _ = time_ns(query, warmup, repeat)
+    runs = {"build": build_runs, "query": query_runs}
+    if memory:
+        del solver
+        runs["memory"] = measure_memory(build)
+    return runs
+
+
+def environment():
+    """运行环境信息"""
+    return {
+        "python": sys.version.split()[0],
+        "numpy": np.__version__ if np is not None else None,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def run_suite(families, n_values, m_factors, solvers, engines, q, warmup, repeat, seed, memory=False, log=print):
+    """
+    运行整个基准扫描
+    Args:
+        families: 图族列表
+        n_values: 节点数列表
+        m_factors: 边数与节点数之比的列表（m = factor * n）
+        solvers: 求解器名称列表
+        engines: 引擎列表
+        q: 每个组合的查询数
+        warmup, repeat: 预热和计时次数
+        seed: 随机种子
+        memory: 是否记录构建阶段的内存峰值和保留量
+        log: 每完成一项时调用的输出函数
+    Returns:
+        JSON 可序列化的结果字典
+    """
+    results = []
+    for family in families:
+        for n in n_values:
+            for factor in m_factors:
+                graph = make_graph(family, n, int(factor * n), seed)
+                real_n, us = graph[0], graph[1]
+                qrng = np.random.default_rng(seed + 1) if np is not None else random.Random(seed + 1)
+                queries = random_pairs(qrng, real_n, q)
+                for solver_name in solvers:
+                    for engine in engines:
+                        runs = bench_one(SOLVERS[solver_name], engine, graph, queries, warmup, repeat, memory)
+                        for phase in PHASES:
+                            record = {
+                                "family": family, "n": real_n, "m": len(us), "q": q,
+                                "solver": solver_name, "engine": engine, "phase": phase,
+                                "runs_ns": runs[phase],
+                                "min_ns": min(runs[phase]),
+                                "median_ns": int(statistics.median(runs[phase])),
+                            }
+                            line = (f"{family:8s} n={real_n:<8d} m={len(us):<9d} {solver_name:12s} {engine:6s} "
+                                    f"{phase:5s} {record['median_ns'] / 1e6:10.2f} ms")
+                            if phase == "build" and memory:
+                                record["peak_bytes"], record["retained_bytes"] = runs["memory"]
+                                line += (f"  peak {record['peak_bytes'] / 2 ** 20:8.1f} MiB"
+                                         f"  {record['retained_bytes'] / real_n:7.1f} B/node")
+                            results.append(record)
+                            log(line)
+                if family == "grid":
+                    break  # 网格的 m 由网格决定，不随 m_factor 变化
+    return {"environment": environment(), "warmup": warmup, "repeat": repeat, "seed": seed, "results": results}
+
+
+def result_key(record):
+    """
+    用于对比的结果键
+    Args:
+        record: run_suite 结果中的一项
+    Returns:
+        (图族, n, m, q, 求解器, 引擎, 阶段)
+    """
+    return (record["family"], record["n"], record["m"], record["q"],
+            record["solver"], record["engine"], record["phase"])
+
+
+def compare_results(baseline, current, threshold):
+    """
+    与基线对比
+    Args:
+        baseline, current: run_suite 的结果字典
+        threshold: 允许的相对变慢比例，0.1 表示 10%
+    Returns:
+        (regressions, compared)：超过阈值的 (键, 指标, 基线值, 当前值) 列表，以及对比的条目数；
+        指标为 median_ns，两边都记录了内存时还有 peak_bytes
+    """
+    base = {result_key(r): r for r in baseline["results"]}
+    regressions = []
+    compared = 0
+    for record in current["results"]:
+        key = result_key(record)
+        if key not in base:
+            continue
+        compared += 1
+        for metric in ("median_ns", "peak_bytes"):
+            if metric in record and metric in base[key]:
+                before, after = base[key][metric], record[metric]
+                if after > before * (1 + threshold):
+                    regressions.append((key, metric, before, after))
+    return regressions, compared
+
+
+def parse_list(text, cast=str):
+    """
+    解析逗号分隔的列表
+    Args:
+        text: 逗号分隔的字符串
+        cast: 每一项的类型转换函数
+    Returns:
+        列表
+    """
+    return [cast(item) for item in text.split(",") if item]
+
+
+def parse_args(argv=None):
+    """
+    解析命令行参数（run / compare 两个子命令）
+    Args:
+        argv: 命令行参数，默认为 sys.argv[1:]
+    Returns:
+        argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(description="货车运输问题 - 基准测试")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="运行基准扫描并写出 JSON")
+    run.add_argument("--families", default=",".join(FAMILIES), help=f"图族，可选 {','.join(FAMILIES)}")
+    run.add_argument("--n", default="1000,10000,100000", help="节点数列表（10^3 到 10^6）")
+    run.add_argument("--m-factor", default="2,8", help="边数与节点数之比的列表")
+    run.add_argument("--solvers", default="method1,method2", help=f"求解器，可选 {','.join(SOLVERS)}")
+    run.add_argument("--engine", default="python", help=f"引擎列表，可选 {','.join(ENGINES)}")
+    run.add_argument("--q", type=int, default=10000, help="每个组合的查询数")
+    run.add_argument("--warmup", type=int, default=1, help="预热次数")
+    run.add_argument("--repeat", type=int, default=3, help="计时次数")
+    run.add_argument("--seed", type=int, default=2024)
+    run.add_argument("--memory", action="store_true", help="额外用 tracemalloc 记录构建阶段的内存")
+    run.add_argument("--output", required=True, help="结果 JSON 文件")
+    run.add_argument("--baseline", default=None, help="运行后立即与该基线对比")
+    run.add_argument("--threshold", type=float, default=0.2, help="允许的相对变慢比例")
+
+    compare = sub.add_parser("compare", help="与基线对比，任一阶段变慢超过阈值时退出码为 1")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=0.2, help="允许的相对变慢比例")
+
+    return parser.parse_args(argv)
+
+
+def report(baseline, current, threshold):
+    """
+    打印对比结果
+    Args:
+        baseline, current: run_suite 的结果字典
+        threshold: 允许的相对变慢比例
+    Returns:
+        退出码：有退化或没有任何可对比的条目时为 1，否则为 0
+    """
+    regressions, compared = compare_results(baseline, current, threshold)
+    for key, metric, before, after in regressions:
+        if metric == "median_ns":
+            change = f"{before / 1e6:.2f} ms -> {after / 1e6:.2f} ms"
+        else:
+            change = f"{before / 2 ** 20:.1f} MiB -> {after / 2 ** 20:.1f} MiB"
+        print(f"REGRESSION {'/'.join(map(str, key))} {metric}: {change} "
+              f"(+{(after / max(before, 1) - 1) * 100:.1f}%)")
+    print(f"对比 {compared} 项，{len(regressions)} 项退化超过 {threshold * 100:.0f}%")
+    if compared == 0:
+        # 图族、规模或求解器与基线完全不重合时什么都没有检查，不能算通过
+        print("ERROR 没有与基线匹配的条目（图族 / n / m / q / 求解器 / 引擎 / 阶段都需相同），未做任何检查")
+        return 1
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    """
+    命令行入口：run 运行基准扫描（可选地立即与基线对比），compare 对比两个结果文件
+    Args:
+        argv: 命令行参数，默认为 sys.argv[1:]
+    Returns:
+        退出码：有退化或没有可对比的条目时为 1
+    """
+    args = parse_args(argv)
+    if args.command == "compare":
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+        return report(baseline, current, args.threshold)
+
+    for name in parse_list(args.solvers):
+        if name not in SOLVERS:
+            raise SystemExit(f"未知求解器: {name}")
+    current = run_suite(
+        parse_list(args.families), parse_list(args.n, int), parse_list(args.m_factor, float),
+        parse_list(args.solvers), parse_list(args.engine), args.q, args.warmup, args.repeat, args.seed,
+        args.memory,
+    )
+    with open(args.output, "w") as f:
+        json.dump(current, f, indent=1)
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            return report(json.load(f), current, args.threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+向量化的 Borůvka 最大生成森林（需要 NumPy）
+
+Kruskal 必须逐条边处理；Borůvka 每一轮让所有连通分量同时选出各自最重的出边：
+1. 用分量编号数组把边的两端映射到分量，删去两端已在同一分量的边
+2. 分组求最大值（np.maximum.at）得到每个分量最重的出边
+3. 每个分量挂到其最重出边另一端的分量上；两个分量互选同一条边时编号小的作根
+4. 指针倍增把挂接关系压缩到根，重新标号分量
+每轮分量数至少减半，共 O(log n) 轮，每轮都是整列的向量化操作。
+
+相同边权按加入顺序决胜：键为 (边权, -下标)，所有键互不相同，最大生成森林唯一，
+恰好等于按边权稳定降序排序的 Kruskal 选出的森林。
+结果按 Kruskal 的顺序产出，求解器据此得到与 Kruskal 完全相同的树邻接表和重构树。
+"""
+
+from array import array
+
+from common import np
+
+
+def edge_keys(ws):
+    """
+    计算边的全序键：边权大的键大，边权相同时下标小的键大，所有键互不相同
+    Args:
+        ws: 边权数组（int64 或 float64）
+    Returns:
+        int64 键数组
+    """
+    m = len(ws)
+    if m == 0:
+        return np.zeros(0, dtype=np.int64)
+    index = np.arange(m, dtype=np.int64)
+    if ws.dtype == np.int64:
+        low, high = int(ws.min()), int(ws.max())
+        if (high - low + 1) * m < (1 << 63):
+            # 直接编码：(w - low) * m + (m - 1 - 下标)
+            return (ws - low) * m + (m - 1 - index)
+
+    # 编码会溢出（或边权不是整数）时，用排序后的名次作键
+    keys = np.empty(m, dtype=np.int64)
+    keys[np.lexsort((-index, ws))] = index
+    return keys
+
+
+def boruvka_forest(n, edges):
+    """
+    用 Borůvka 算法求最大生成森林
+    Args:
+        n: 城市数量（节点 1..n）
+        edges: EdgeStore
+    Returns:
+        森林中的边 (u, v, w) 的迭代器，按 Kruskal 的处理顺序（边权降序，相同边权按加入顺序）
+    """
+    if np is None:
+        raise ImportError("Borůvka 构建需要安装 NumPy")
+
+    us = np.frombuffer(edges.us, dtype=np.int32).astype(np.int64)
+    vs = np.frombuffer(edges.vs, dtype=np.int32).astype(np.int64)
+    if isinstance(edges.ws, array):
+        ws = np.frombuffer(edges.ws, dtype=np.int64)
+    else:
+        ws = np.asarray(edges.ws, dtype=np.float64)
+    keys = edge_keys(ws)
+
+    labels = np.arange(n + 1, dtype=np.int64)
+    comp = labels.copy()  # comp[u] = u 所在分量的根
+    eu, ev, ek = us, vs, keys
+    eidx = np.arange(len(keys), dtype=np.int64)
+    chosen = []
+
+    while True:
+        # 删去两端已在同一分量的边
+        cu = comp[eu]
+        cv = comp[ev]
+        external = cu != cv
+        if not external.all():
+            eu, ev, ek, eidx = eu[external], ev[external], ek[external], eidx[external]
+            cu, cv = cu[external], cv[external]
+        if eidx.size == 0:
+            break
+
+        # 每个分量最重的出边（分组求最大键）
+        best = np.full(n + 1, -1, dtype=np.int64)
+        np.maximum.at(best, cu, ek)
+        np.maximum.at(best, cv, ek)
+        by_u = best[cu] == ek
+        by_v = best[cv] == ek
+        chosen.append(eidx[by_u | by_v])
+
+        # 分量挂到最重出边另一端的分量上；互选同一条边时编号小的作根
+        hook = labels.copy()
+        hook[cu[by_u]] = cv[by_u]
+        hook[cv[by_v]] = cu[by_v]
+        mutual = (hook[hook] == labels) & (labels < hook)
+        hook[mutual] = labels[mutual]
+
+        # 指针倍增压缩到根，重新标号
+        while True:
+            jumped = hook[hook]
+            if np.array_equal(jumped, hook):
+                break
+            hook = jumped
+        comp = hook[comp]
+
+    if not chosen:
+        return iter(())
+    forest = np.concatenate(chosen)
+    forest = forest[np.argsort(-keys[forest])]
+    if isinstance(edges.ws, array):
+        return zip(us[forest].tolist(), vs[forest].tolist(), ws[forest].tolist())
+    return ((edges.us[i], edges.vs[i], edges.ws[i]) for i in forest.tolist())
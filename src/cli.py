@@ -0,0 +1,327 @@
+"""
+命令行入口：两种方法的 main() 共用的读入、求解和输出流程
+
+输入格式与题目一致：
+    n m
+    x y z   (m 行道路)
+    q
+    x y     (q 行查询)
+
+--fast-io 一次性读入全部输入并切分为整数数组，批量添加道路，
+所有答案拼接后一次写出；--input 从文件读入（通过 mmap 映射，按窗口切分，不复制整个文件）。
+--workers N 在预处理完成后 fork 出 N 个进程，按写时复制共享只读的预处理结构，
+查询切块后并行回答，再按输入顺序拼接。
+各种模式的输出格式完全相同。
+--profile 开启分阶段计时与计数（见 profiling.py），回答完查询后把 stats() 以 JSON 写到标准错误；
+--memory-report 另外用 tracemalloc 统计各阶段的峰值和保留内存以及各常驻结构的大小。
+--external-sort CHUNK 用于放不进内存的边表：逐行读入，每 CHUNK 条边排序后写入临时 run 文件，
+多路归并直接送入 Kruskal（见 external_sort.py），查询按块读入、按块回答。
+"""
+
+import argparse
+import gc
+import json
+import mmap
+import multiprocessing
+import os
+import sys
+from array import array
+
+from common import ENGINES, MST_MODES, to_answer
+from external_sort import iter_ints, read_edge_stream, sort_edges
+from offline_tarjan import TruckTransportSolverOffline
+
+
+def build_parser(description):
+    """
+    构建命令行参数解析器
+    Args:
+        description: 程序说明
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--offline", action="store_true",
+                        help="离线模式：读入全部查询后用 Tarjan 离线 LCA 一次遍历回答"
+                             "（纯 Python，不能与 --engine numpy、--mst-mode 同用）")
+    parser.add_argument("--fast-io", action="store_true",
+                        help="批量读入和输出（适合 m、q 达到 10^6 的输入）")
+    parser.add_argument("--engine", choices=ENGINES, default="python",
+                        help="在线求解器的引擎；numpy 引擎在 --fast-io 下使用 query_many 批量回答")
+    parser.add_argument("--mst-mode", choices=MST_MODES, default="auto",
+                        help="构建最大生成森林的方式：完整排序 / Filter-Kruskal / 向量化 Borůvka / 按稠密程度自动选择")
+    parser.add_argument("--input", default=None,
+                        help="从文件读入（mmap 映射，隐含 --fast-io），默认读标准输入")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="并行回答查询的进程数（隐含 --fast-io，不能与 --offline 同用）")
+    parser.add_argument("--profile", action="store_true",
+                        help="分阶段计时与计数，结束后把统计以 JSON 写到标准错误（不能与 --offline、--workers 同用）")
+    parser.add_argument("--memory-report", action="store_true",
+                        help="在 --profile 的基础上统计各阶段内存和各结构大小（tracemalloc，较慢）")
+    parser.add_argument("--external-sort", type=int, default=None, metavar="CHUNK",
+                        help="外部排序：每 CHUNK 条边排序后写入临时文件再多路归并，内存 O(n + CHUNK)"
+                             "（边权需为整数，不能与 --offline、--workers 同用）")
+    parser.add_argument("--tmpdir", default=None,
+                        help="--external-sort 的 run 文件目录，默认新建临时目录")
+    return parser
+
+
+# --input 映射文件后每次切分的字节数，只有这么大的一段会被复制成 bytes
+READ_WINDOW = 1 << 24
+
+
+def split_ints(buffer, window=READ_WINDOW):
+    """
+    按窗口把 buffer 中的整数追加到数组，不把整个 buffer 复制成一个 bytes
+    Args:
+        buffer: mmap 或 bytes
+        window: 每段的字节数；段尾退回到最后一个空白字符，不会把一个数切成两半
+    Returns:
+        array('q') 整数数组
+    """
+    result = array('q')
+    size = len(buffer)
+    start = 0
+    while start < size:
+        end = start + window
+        if end >= size:
+            end = size
+        else:
+            cut = max(buffer.rfind(b"\n", start, end), buffer.rfind(b" ", start, end))
+            end = cut + 1 if cut >= start else size  # 窗口内没有空白时（极长的数）读到末尾
+        result.extend(map(int, buffer[start:end].split()))
+        start = end
+    return result
+
+
+def read_ints(path=None, window=READ_WINDOW):
+    """
+    一次性读入全部输入并切分为整数数组
+    Args:
+        path: 输入文件路径，None 表示标准输入
+        window: 文件映射后每次切分的字节数
+    Returns:
+        array('q') 整数数组
+    """
+    if path is None:
+        return array('q', map(int, sys.stdin.buffer.read().split()))
+
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return array('q')
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return split_ints(mm, window)
+
+
+def write_answers(answers):
+    """
+    所有答案拼接后一次写出，每行一个，与 print 的格式相同
+    Args:
+        answers: 答案序列（int 或 float('inf')）
+    """
+    if answers:
+        sys.stdout.buffer.write(("\n".join(map(str, answers)) + "\n").encode())
+
+
+def answer_all(solver, xs, ys):
+    """
+    回答一批查询
+    Args:
+        solver: 已完成预处理的求解器
+        xs, ys: 起点和终点序列
+    Returns:
+        答案列表
+    """
+    if isinstance(solver, TruckTransportSolverOffline):
+        return solver.answer_queries(list(zip(xs, ys)))
+    if getattr(solver, "engine", "python") == "numpy":
+        return [to_answer(value) for value in solver.query_many(xs, ys).tolist()]
+    query = solver.query_max_weight
+    return [query(x, y) for x, y in zip(xs, ys)]
+
+
+# fork 出的子进程通过该全局变量访问父进程中已预处理好的求解器
+_worker_solver = None
+
+
+def _answer_chunk(chunk):
+    """子进程中回答一块查询"""
+    xs, ys = chunk
+    return answer_all(_worker_solver, xs, ys)
+
+
+def answer_parallel(solver, xs, ys, workers):
+    """
+    多进程回答一批查询，答案按输入顺序返回
+    Args:
+        solver: 已完成预处理的在线求解器
+        xs, ys: 起点和终点序列
+        workers: 进程数
+    Returns:
+        答案列表
+    """
+    if workers <= 1 or len(xs) == 0 or "fork" not in multiprocessing.get_all_start_methods():
+        return answer_all(solver, xs, ys)
+
+    global _worker_solver
+    _worker_solver = solver
+    # 把现存对象移出 gc 跟踪，避免子进程中的垃圾回收改写共享页、触发复制
+    gc.freeze()
+
+    # 每个进程分到若干块，块数多于进程数以平衡负载
+    chunk_size = max(1, -(-len(xs) // (workers * 4)))
+    chunks = [(xs[i:i + chunk_size], ys[i:i + chunk_size]) for i in range(0, len(xs), chunk_size)]
+    try:
+        with multiprocessing.get_context("fork").Pool(workers) as pool:
+            answers = []
+            for part in pool.imap(_answer_chunk, chunks):
+                answers.extend(part)
+    finally:
+        gc.unfreeze()
+        _worker_solver = None
+    return answers
+
+
+def create_solver(solver_class, n, m, args):
+    """
+    按命令行参数创建求解器（离线求解器没有引擎选项）
+    """
+    if solver_class is TruckTransportSolverOffline:
+        return solver_class(n, m)
+    solver = solver_class(n, m, engine=args.engine, mst_mode=args.mst_mode)
+    if args.memory_report:
+        solver.enable_memory_report()
+    elif args.profile:
+        solver.enable_profiling()
+    return solver
+
+
+def write_profile(solver, args):
+    """--profile 时把求解统计以 JSON 写到标准错误"""
+    if args.profile:
+        sys.stderr.write(json.dumps(solver.stats(), sort_keys=True) + "\n")
+
+
+def run_fast(solver_class, args):
+    """
+    批量输入输出模式
+    Args:
+        solver_class: 求解器类
+        args: 命令行参数
+    """
+    data = read_ints(args.input)
+    n, m = data[0], data[1]
+
+    solver = create_solver(solver_class, n, m, args)
+    edges_end = 2 + 3 * m
+    solver.add_edges(data[2:edges_end:3], data[3:edges_end:3], data[4:edges_end:3])
+    solver.solve()
+
+    q = data[edges_end]
+    queries_end = edges_end + 1 + 2 * q
+    xs = data[edges_end + 1:queries_end:2]
+    ys = data[edges_end + 2:queries_end:2]
+    if args.workers > 1:
+        write_answers(answer_parallel(solver, xs, ys, args.workers))
+    else:
+        write_answers(answer_all(solver, xs, ys))
+    write_profile(solver, args)
+
+
+# --external-sort 模式下每次读入并回答的查询数
+QUERY_BLOCK = 1 << 16
+
+
+def run_external(solver_class, args):
+    """
+    外部排序模式：边和查询都逐行读入，不一次性读入整个输入
+    Args:
+        solver_class: 在线求解器类
+        args: 命令行参数
+    """
+    stream = sys.stdin.buffer if args.input is None else open(args.input, "rb")
+    try:
+        tokens = iter_ints(stream)
+        n, m = next(tokens), next(tokens)
+        with sort_edges(read_edge_stream(tokens, m), args.external_sort, args.tmpdir) as runs:
+            solver = solver_class.from_sorted_runs(n, runs, engine=args.engine)
+            if args.memory_report:
+                solver.enable_memory_report()
+            elif args.profile:
+                solver.enable_profiling()
+            solver.solve()
+
+        q = next(tokens)
+        for start in range(0, q, QUERY_BLOCK):
+            xs, ys = array('q'), array('q')
+            for _ in range(min(QUERY_BLOCK, q - start)):
+                xs.append(next(tokens))
+                ys.append(next(tokens))
+            write_answers(answer_all(solver, xs, ys))
+    finally:
+        if stream is not sys.stdin.buffer:
+            stream.close()
+    write_profile(solver, args)
+
+
+def run(solver_class, description, argv=None):
+    """
+    读取输入，求解并输出结果
+    Args:
+        solver_class: 在线求解器类（TruckTransportSolver1 / TruckTransportSolver2）
+        description: 程序说明
+        argv: 命令行参数，默认为 sys.argv[1:]
+    """
+    parser = build_parser(description)
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers 必须为正整数")
+    if args.offline and args.workers > 1:
+        parser.error("--offline 一次遍历回答全部查询，不能与 --workers 同用")
+    if args.offline and (args.engine != "python" or args.mst_mode != "auto"):
+        parser.error("--offline 使用纯 Python 的 Tarjan 求解器，不能与 --engine numpy、--mst-mode 同用")
+    if args.memory_report:
+        args.profile = True
+    if args.profile and (args.offline or args.workers > 1):
+        parser.error("--profile 只统计当前进程中的在线求解器，不能与 --offline、--workers 同用")
+    if args.external_sort is not None:
+        if args.external_sort < 1:
+            parser.error("--external-sort 必须为正整数")
+        if args.offline or args.workers > 1:
+            parser.error("--external-sort 不能与 --offline、--workers 同用")
+        run_external(solver_class, args)
+        return
+    if args.offline:
+        solver_class = TruckTransportSolverOffline
+
+    if args.fast_io or args.input is not None or args.workers > 1:
+        run_fast(solver_class, args)
+        return
+
+    # 读取城市数和道路数
+    n, m = map(int, input().split())
+
+    # 创建求解器
+    solver = create_solver(solver_class, n, m, args)
+
+    # 读取道路信息
+    for _ in range(m):
+        x, y, z = map(int, input().split())
+        solver.add_edge(x, y, z)
+
+    # 构建最大生成树并预处理
+    solver.solve()
+
+    # 读取查询数量
+    q = int(input())
+
+    if args.offline:
+        # 离线模式：先读入全部查询，再按输入顺序输出答案
+        queries = [tuple(map(int, input().split())) for _ in range(q)]
+        for answer in solver.answer_queries(queries):
+            print(answer)
+        return
+
+    # 处理每个查询
+    for _ in range(q):
+        x, y = map(int, input().split())
+        print(solver.query_max_weight(x, y))
+    write_profile(solver, args)
@@ -8,6 +8,8 @@
 # - Unified result encoding: disconnected=-1; self-pair=+inf -> 10**18
 # - CSV export
 # - --connected-only: queries restricted to DSU-connected pairs
+# - --floyd-engine numpy: vectorized Floyd (one matrix update per pivot, row-tiled)
+# - --skip-floyd-threshold: Floyd is skipped (reported as SKIPPED) when n exceeds it
 
 
 # Environment
@@ -28,6 +30,16 @@
 import argparse, csv, math, os, platform, random, statistics, sys, time
 from collections import defaultdict
 
+try:
+    import numpy as np
+except ImportError:  # the python engine needs nothing beyond the stdlib
+    np = None
+
+FLOYD_ENGINES = ("python", "numpy")
+# default --skip-floyd-threshold per engine: the python loop is O(n^3) interpreted steps,
+# the numpy engine keeps an n x n matrix (400 MB at n = 10^4 with int32 weights)
+FLOYD_SKIP_DEFAULTS = {"python": 1200, "numpy": 10000}
+
 # -----------------------------
 # Utilities
 # -----------------------------
@@ -216,6 +228,37 @@ def floyd_bottleneck(n, edges):
                     rowi[j] = cand
     return dp  # 0 => disconnected
 
+def floyd_bottleneck_numpy(n, edges, tile=64):
+    """Vectorized bottleneck Floyd: for each pivot k the whole matrix is updated as
+    D = max(D, min(D[:, k], D[k, :])). Row k and column k do not change at pivot k,
+    so the update is done in place. With tile > 0 the rows are processed in blocks
+    of `tile` rows through a reused buffer, which keeps the working set in cache and
+    avoids an n x n temporary per pivot. Blocks with no path to k are skipped.
+    Same encoding as floyd_bottleneck: 0 => disconnected (weights must be positive),
+    the diagonal holds the dtype's max value (stands for +inf)."""
+    weights = [w for _, _, w in edges]
+    dtype = np.int32 if not weights or max(weights) < np.iinfo(np.int32).max else np.int64
+    dp = np.zeros((n, n), dtype=dtype)
+    if edges:
+        us, vs, ws = (np.asarray(col) for col in zip(*edges))
+        np.maximum.at(dp, (us - 1, vs - 1), ws.astype(dtype))
+        np.maximum.at(dp, (vs - 1, us - 1), ws.astype(dtype))
+    np.fill_diagonal(dp, np.iinfo(dtype).max)
+
+    tile = tile if tile and tile > 0 else n
+    buf = np.empty((min(tile, n), n), dtype=dtype)
+    for k in range(n):
+        rowk = dp[k].copy()
+        for i in range(0, n, tile):
+            block = dp[i:i + tile]
+            colk = block[:, k, None]
+            if not colk.any():
+                continue
+            cand = buf[:len(block)]
+            np.minimum(colk, rowk, out=cand)
+            np.maximum(block, cand, out=block)
+    return dp
+
 # -----------------------------
 # Random graph + queries
 # -----------------------------
@@ -256,7 +299,8 @@ def make_connected_queries(n, q, uf, seed=1, max_attempts=None):
 # -----------------------------
 # One trial of one scale
 # -----------------------------
-def run_one_trial(n, m, q, seed_base, cap_lo, cap_hi, connected_only):
+def run_one_trial(n, m, q, seed_base, cap_lo, cap_hi, connected_only,
+                  floyd_engine="python", skip_floyd_threshold=None, floyd_tile=64):
     edges = make_random_graph(n, m, cap_lo=cap_lo, cap_hi=cap_hi, seed=seed_base)
 
     # Build Method 1 first so we can use DSU connectivity if needed for queries
@@ -276,26 +320,30 @@ def run_one_trial(n, m, q, seed_base, cap_lo, cap_hi, connected_only):
     else:
         queries = make_queries(n, q, seed=seed_base + 1)
 
-    # Floyd (optionally skip if n too large)
+    # Floyd (skipped if n too large)
     floyd_pre_ms = None
     floyd_q_ms = None
     floyd_answers = None
-    t0 = now_ms()
-    dp = floyd_bottleneck(n, edges)
-    t1 = now_ms()
-    floyd_pre_ms = t1 - t0
-    t2 = now_ms()
-    floyd_answers = []
-    for s, t in queries:
-        val = dp[s-1][t-1]
-        if val == 0:                # disconnected
-            floyd_answers.append(-1)
-        elif val == float('inf'):   # s==t
-            floyd_answers.append(10**18)
+    if skip_floyd_threshold is None or n <= skip_floyd_threshold:
+        t0 = now_ms()
+        if floyd_engine == "numpy":
+            dp = floyd_bottleneck_numpy(n, edges, tile=floyd_tile)
         else:
-            floyd_answers.append(int(val))
-    t3 = now_ms()
-    floyd_q_ms = t3 - t2
+            dp = floyd_bottleneck(n, edges)
+        t1 = now_ms()
+        floyd_pre_ms = t1 - t0
+        t2 = now_ms()
+        floyd_answers = []
+        for s, t in queries:
+            val = dp[s-1][t-1]
+            if val == 0:                # disconnected
+                floyd_answers.append(-1)
+            elif s == t:                # diagonal holds +inf (python) / dtype max (numpy)
+                floyd_answers.append(10**18)
+            else:
+                floyd_answers.append(int(val))
+        t3 = now_ms()
+        floyd_q_ms = t3 - t2
 
     # Method 1 query phase (unified encoding)
     t6 = now_ms()
@@ -319,7 +367,8 @@ def run_one_trial(n, m, q, seed_base, cap_lo, cap_hi, connected_only):
 # -----------------------------
 # Multi-trial harness
 # -----------------------------
-def run_scale(scale_name, n, m, q, trials, seed_base, cap_lo, cap_hi, connected_only):
+def run_scale(scale_name, n, m, q, trials, seed_base, cap_lo, cap_hi, connected_only,
+              floyd_engine="python", skip_floyd_threshold=None, floyd_tile=64):
     floyd_pre_list, floyd_q_list = [], []
     m1_pre_list, m1_q_list = [], []
     mismatch_list = []
@@ -327,7 +376,8 @@ def run_scale(scale_name, n, m, q, trials, seed_base, cap_lo, cap_hi, connected_
     for t in range(trials):
         seed = seed_base + 1000 * t  # deterministic but different per trial
         fp, fq, mp, mq, mis = run_one_trial(
-            n, m, q, seed, cap_lo, cap_hi, connected_only
+            n, m, q, seed, cap_lo, cap_hi, connected_only,
+            floyd_engine, skip_floyd_threshold, floyd_tile,
         )
         if fp is not None: floyd_pre_list.append(fp)
         if fq is not None: floyd_q_list.append(fq)
@@ -376,18 +426,36 @@ def parse_args():
     p.add_argument("--seed", type=int, default=1234, help="base random seed")
     p.add_argument("--cap-lo", type=int, default=1, help="min edge capacity")
     p.add_argument("--cap-hi", type=int, default=1000, help="max edge capacity")
-    p.add_argument("--skip-floyd-threshold", type=int, default=1200,
-                   help="skip Floyd when n > threshold (Python runtime realism)")
+    p.add_argument("--floyd-engine", choices=FLOYD_ENGINES,
+                   default="numpy" if np is not None else "python",
+                   help="Floyd implementation: pure-python triple loop or vectorized numpy")
+    p.add_argument("--floyd-tile", type=int, default=64,
+                   help="rows per block in the numpy engine (0 = whole matrix at once)")
+    p.add_argument("--skip-floyd-threshold", type=int, default=None,
+                   help="skip Floyd when n > threshold (default: %s)" %
+                        ", ".join(f"{k} {v}" for k, v in FLOYD_SKIP_DEFAULTS.items()))
+    p.add_argument("--scale", action="append", default=[], metavar="NAME:N:M:Q",
+                   help="run this scale instead of the built-in ones (repeatable), e.g. XXL:10000:20000:1000")
     p.add_argument("--connected-only", action="store_true",
                    help="restrict queries to DSU-connected pairs (from MST/DSU)")
     p.add_argument("--csv", type=str, default="", help="optional path to write CSV results")
-    return p.parse_args()
+    args = p.parse_args()
+    if args.floyd_engine == "numpy" and np is None:
+        p.error("--floyd-engine numpy requires numpy")
+    if args.skip_floyd_threshold is None:
+        args.skip_floyd_threshold = FLOYD_SKIP_DEFAULTS[args.floyd_engine]
+    try:
+        args.scale = [(name, int(n), int(m), int(q))
+                      for name, n, m, q in (item.split(":") for item in args.scale)]
+    except ValueError:
+        p.error("--scale expects NAME:N:M:Q")
+    return args
 
 def main():
     args = parse_args()
 
     # Define scales (editable)
-    scales = [
+    scales = args.scale or [
         ("Small", 100, 200, 50),
         ("Medium", 500, 1000, 100),
         ("Large", 1000, 2000, 200),
@@ -398,6 +466,7 @@ def main():
     print(env_summary())
     print(f"Graph distribution: G(n,m), weight ~ Uniform[{args.cap_lo}, {args.cap_hi}]")
     print(f"Trials per scale: {args.trials}, seed base: {args.seed}")
+    print(f"Floyd engine: {args.floyd_engine}, skipped for n > {args.skip_floyd_threshold}")
     print(f"Connected-only queries: {args.connected_only}\n")
 
     results = []
@@ -409,6 +478,9 @@ def main():
             cap_lo=args.cap_lo,
             cap_hi=args.cap_hi,
             connected_only=args.connected_only,
+            floyd_engine=args.floyd_engine,
+            skip_floyd_threshold=args.skip_floyd_threshold,
+            floyd_tile=args.floyd_tile,
         )
         results.append(res)
 
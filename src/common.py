@@ -1,9 +1,96 @@
 """
-公共模块：提供图的数据结构和并查集实现
+公共模块：提供图的数据结构、边存储、并查集实现和非递归的森林遍历
 """
 
+from array import array
+
+try:
+    import numpy as np  # 可选依赖：仅 numpy 引擎需要
+except ImportError:
+    np = None
+
+# 整数数组中表示 inf 的哨兵值（numpy 引擎的 min_weight 表使用）
+INT_INF = (1 << 63) - 1
+
+ENGINES = ("python", "numpy")
+
+# 构建最大生成森林的方式：完整排序 / Filter-Kruskal / 向量化 Borůvka / 按图的稠密程度自动选择
+MST_MODES = ("sort", "filter", "boruvka", "auto")
+
+
+def check_engine(engine):
+    """
+    检查求解器引擎名称，numpy 引擎要求已安装 NumPy
+    Args:
+        engine: "python" 或 "numpy"
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"未知引擎: {engine!r}，可选: {ENGINES}")
+    if engine == "numpy" and np is None:
+        raise ImportError("numpy 引擎需要安装 NumPy")
+
+
+def resolve_mst_mode(mode, n, m):
+    """
+    确定构建最大生成森林的方式
+    Args:
+        mode: "sort"、"filter"、"boruvka" 或 "auto"
+        n, m: 城市数和道路数
+    Returns:
+        "sort"、"filter" 或 "boruvka"；auto 在有 NumPy 且 m >= 8n 的稠密图上选择 filter
+    """
+    if mode not in MST_MODES:
+        raise ValueError(f"未知的生成森林构建方式: {mode!r}，可选: {MST_MODES}")
+    if mode == "boruvka" and np is None:
+        raise ImportError("Borůvka 构建需要安装 NumPy")
+    if mode == "auto":
+        return "filter" if np is not None and m >= 8 * n else "sort"
+    return mode
+
+
+def to_answer(value):
+    """
+    将批量查询结果数组中的一个元素转换为与 query_max_weight 相同的 Python 值
+    Args:
+        value: int64 结果（-1 表示不连通，INT_INF 表示起点等于终点）
+    Returns:
+        int 或 float('inf')
+    """
+    if value == INT_INF:
+        return float('inf')
+    return int(value)
+
+
+def check_integer_weights(edges, engine):
+    """
+    numpy 引擎的表都是 int64 数组，边权含非整数（或超出 int64 范围）时报错，而不是截断
+    Args:
+        edges: EdgeStore 或 SortedEdgeRuns
+        engine: "python" 或 "numpy"
+    """
+    if engine == "numpy" and not edges.integer_weights():
+        raise ValueError("numpy 引擎需要 int64 范围内的整数边权，请使用 python 引擎")
+
+
+def same_component(component_id, xs, ys, vectorized):
+    """
+    按连通分量编号批量判断连通性（各求解器与并查集的 connected_many 共用）
+    Args:
+        component_id: 每个节点的连通分量编号
+        xs, ys: 起点和终点序列（等长）
+        vectorized: component_id 是否为 numpy 数组（numpy 引擎），是则整批比较
+    Returns:
+        vectorized 时为 bool 数组，否则为列表
+    """
+    if vectorized:
+        return component_id[np.asarray(xs, dtype=np.int64)] == component_id[np.asarray(ys, dtype=np.int64)]
+    return [component_id[x] == component_id[y] for x, y in zip(xs, ys)]
+
+
 class Edge:
     """表示一条边"""
+    __slots__ = ("u", "v", "weight")
+
     def __init__(self, u, v, weight):
         self.u = u  # 起点
         self.v = v  # 终点
@@ -13,28 +100,355 @@ class Edge:
         return f"Edge({self.u}, {self.v}, {self.weight})"
 
 
+# 基数排序每一位 16 比特（NumPy 对 16 位以内整数的稳定排序就是基数排序）；
+# 边权极差不超过 RADIX_MAX_DIGITS 位时用 LSD 基数排序，否则退回比较排序
+RADIX_DIGIT_BITS = 16
+RADIX_MAX_DIGITS = 3
+
+
+def radix_descending_order(ws):
+    """
+    有界整数边权的稳定降序排列：LSD 基数排序，每一位是一次 uint8 / uint16 的稳定 argsort
+    极差小于 2^16 时只有一位，即计数排序
+    Args:
+        ws: int64 边权数组
+    Returns:
+        按边权从大到小（相同边权保持原顺序）的下标数组；极差超出范围时返回 None
+    """
+    if len(ws) == 0:
+        return np.zeros(0, dtype=np.intp)
+    high = int(ws.max())
+    bits = (high - int(ws.min())).bit_length()
+    if bits > RADIX_DIGIT_BITS * RADIX_MAX_DIGITS:
+        return None
+    # 键 high - w 非负且小于 2^bits，键升序即边权降序；按 uint64 计算不会溢出
+    keys = np.uint64(high % (1 << 64)) - ws.view(np.uint64)
+    if bits <= 8:
+        return np.argsort(keys.astype(np.uint8), kind="stable")
+    order = None
+    mask = np.uint64((1 << RADIX_DIGIT_BITS) - 1)
+    for shift in range(0, bits, RADIX_DIGIT_BITS):
+        if order is None:
+            digit = keys & mask
+        else:
+            digit = (keys[order] >> np.uint64(shift)) & mask
+        step = np.argsort(digit.astype(np.uint16), kind="stable")
+        order = step if order is None else order[step]
+    return order
+
+
+def descending_argsort(ws):
+    """
+    边权数组的稳定降序排列：有界整数用基数排序，否则 np.argsort(-ws)
+    Args:
+        ws: int64 或 float64 边权数组
+    Returns:
+        下标数组
+    """
+    if ws.dtype == np.int64:
+        order = radix_descending_order(ws)
+        if order is not None:
+            return order
+    # 对 -w 做稳定的升序排序，即边权降序且相同边权保持原顺序
+    return np.argsort(-ws, kind="stable")
+
+
+def _extend_column(column, values):
+    """将一列数据追加到 array 列的末尾（numpy 数组直接拷贝字节）"""
+    if not isinstance(column, array):
+        column.extend(values)
+    elif np is not None and isinstance(values, np.ndarray):
+        column.frombytes(np.ascontiguousarray(values, dtype=column.typecode).tobytes())
+    elif isinstance(values, array) and values.typecode != column.typecode:
+        column.extend(iter(values))
+    else:
+        column.extend(values)
+
+
+def _weight_batch(weights):
+    """
+    整批边权先转换为 int64 列，转换失败时不会留下追加了一半的数据
+    Args:
+        weights: 边权序列（list / array / numpy 数组）
+    Returns:
+        array('q')；含非整数（或超出 int64 范围）的边权时返回 None
+    """
+    if np is not None and isinstance(weights, np.ndarray):
+        if weights.dtype.kind not in "biu":
+            return None  # 浮点边权不能截断为整数
+        if weights.dtype.kind == "u" and weights.size and int(weights.max()) > INT_INF:
+            return None
+        return array('q', np.ascontiguousarray(weights, dtype=np.int64).tobytes())
+    try:
+        return array('q', weights)
+    except (TypeError, OverflowError):
+        return None
+
+
+class EdgeStore:
+    """
+    紧凑的边存储：u、v、w 三列分别保存在 array 中，每条边 16 字节，
+    不再为每条边创建一个 Edge 对象。
+    边权列默认为 int64；出现非整数边权时退化为列表。
+    排序只对边权列求下标顺序，不移动边本身：有 NumPy 且边权极差有界时为基数排序，
+    否则为 np.argsort 或 sorted。
+    """
+    def __init__(self):
+        self.us = array('i')  # 起点
+        self.vs = array('i')  # 终点
+        self.ws = array('q')  # 边权（限重）
+
+    def __len__(self):
+        return len(self.us)
+
+    def __getitem__(self, i):
+        return Edge(self.us[i], self.vs[i], self.ws[i])
+
+    def __iter__(self):
+        return map(Edge, self.us, self.vs, self.ws)
+
+    def append(self, u, v, weight):
+        """
+        添加一条边
+        Args:
+            u, v: 边的两个端点
+            weight: 边权
+        """
+        # 端点先追加，超出 int32 时撤销并报错，三列长度保持一致
+        self.us.append(u)
+        try:
+            self.vs.append(v)
+        except (TypeError, OverflowError):
+            self.us.pop()
+            raise
+        try:
+            self.ws.append(weight)
+        except (TypeError, OverflowError):
+            self.ws = list(self.ws)
+            self.ws.append(weight)
+
+    def extend(self, us, vs, weights):
+        """
+        批量添加边
+        Args:
+            us, vs: 端点序列（list / array / numpy 数组）
+            weights: 边权序列
+        """
+        if np is not None and isinstance(weights, np.ndarray):
+            batch = _weight_batch(weights) if isinstance(self.ws, array) else None
+            weights = weights.tolist()  # 退化为列表时保留浮点边权，不截断
+        else:
+            if not isinstance(weights, (list, tuple, array)):
+                weights = list(weights)  # 迭代器只能遍历一次，转换失败后还要再用
+            batch = _weight_batch(weights) if isinstance(self.ws, array) else None
+        count = len(self.us)
+        try:
+            _extend_column(self.us, us)
+            _extend_column(self.vs, vs)
+        except (TypeError, OverflowError):
+            # 端点超出 int32：撤销这一批已追加的端点，三列长度保持一致
+            del self.us[count:]
+            del self.vs[count:]
+            raise
+        if batch is not None:
+            self.ws.extend(batch)
+        else:
+            if isinstance(self.ws, array):
+                self.ws = list(self.ws)
+            self.ws.extend(weights)
+
+    def integer_weights(self):
+        """
+        边权列是否为 int64（全部边权都是 int64 范围内的整数）
+        Returns:
+            bool
+        """
+        return isinstance(self.ws, array)
+
+    def descending_order(self):
+        """
+        按边权从大到小排列的边下标（相同边权保持加入顺序）
+        Returns:
+            numpy 数组或列表
+        """
+        if np is not None and isinstance(self.ws, array):
+            return descending_argsort(np.frombuffer(self.ws, dtype=np.int64))
+        # 纯 Python 的计数排序要逐条边循环，比 C 实现的 sorted 还慢，这里仍用 sorted
+        return sorted(range(len(self.ws)), key=self.ws.__getitem__, reverse=True)
+
+    def component_count(self, n):
+        """
+        城市 1..n 在这些边下的连通分量数，Kruskal 的森林边数达到 n - 分量数时即可停止
+        有 NumPy 时为精确值：每一轮各分量挂到相邻分量中编号最小的根上，再用指针倍增压缩到根，
+        直到不再变化；没有 NumPy 时只统计孤立点，返回一个下界（仍可安全地用于提前结束）
+        Args:
+            n: 城市数量
+        Returns:
+            连通分量数（或其下界）
+        """
+        if np is None:
+            touched = set(self.us)
+            touched.update(self.vs)
+            return n - len(touched) + (1 if touched else 0)
+
+        us = np.frombuffer(self.us, dtype=np.int32)
+        vs = np.frombuffer(self.vs, dtype=np.int32)
+        root = np.arange(n + 1, dtype=np.int32)
+        while True:
+            ru = root[us]
+            rv = root[vs]
+            hooked = root.copy()
+            np.minimum.at(hooked, ru, rv)
+            np.minimum.at(hooked, rv, ru)
+            while True:
+                jumped = hooked[hooked]
+                if np.array_equal(jumped, hooked):
+                    break
+                hooked = jumped
+            if np.array_equal(hooked, root):
+                break
+            root = hooked
+        return int(np.count_nonzero(root[1:] == np.arange(1, n + 1, dtype=np.int32)))
+
+    def descending(self):
+        """
+        按边权从大到小遍历所有边
+        Returns:
+            (u, v, w) 元组的迭代器
+        """
+        order = self.descending_order()
+        if np is not None and isinstance(order, np.ndarray):
+            us = np.frombuffer(self.us, dtype=np.int32)[order].tolist()
+            vs = np.frombuffer(self.vs, dtype=np.int32)[order].tolist()
+            ws = np.frombuffer(self.ws, dtype=np.int64)[order].tolist()
+            return zip(us, vs, ws)
+        us, vs, ws = self.us, self.vs, self.ws
+        return ((us[i], vs[i], ws[i]) for i in order)
+
+    def descending_filtered(self, uf, nodes=None, base_size=1024):
+        """
+        Filter-Kruskal：按边权从大到小产出边，但不对全部边排序。
+        以随机边权为轴把边分成重、等、轻三段，先处理重的一段；
+        轮到较轻的一段时，先删去两端已经连通的边，再继续划分，
+        段长不超过 base_size 时才排序。调用方在生成森林完成后停止迭代即可，
+        剩下的边既不会被过滤也不会被排序。
+        生成器是惰性的：调用方对产出的边执行合并后，后续的过滤立即看到新的连通性。
+        Args:
+            uf: 调用方正在使用的并查集（只读，用于过滤）
+            nodes: 并查集中会被用到的元素为 1..nodes，默认全部
+            base_size: 直接排序的段长上限
+        Returns:
+            (u, v, w) 元组的迭代器，顺序与 descending() 相同（相同边权按加入顺序）
+        """
+        if nodes is None:
+            nodes = len(uf.parent) - 1
+        if np is None or not isinstance(self.ws, array):
+            return self._descending_filtered_python(uf, base_size)
+        return self._descending_filtered_numpy(uf, nodes, base_size)
+
+    def _descending_filtered_numpy(self, uf, nodes, base_size):
+        """Filter-Kruskal 的 NumPy 实现：划分和过滤都是向量化操作"""
+        us = np.frombuffer(self.us, dtype=np.int32)
+        vs = np.frombuffer(self.vs, dtype=np.int32)
+        ws = np.frombuffer(self.ws, dtype=np.int64)
+        # 过滤一次要 O(nodes) 计算所有节点的根，段太短时不值得
+        base_size = max(base_size, nodes // 4)
+        rng = np.random.default_rng(0)
+
+        # 栈中每一段的边权都大于其下方的段；第二项表示该段是否只含同一种边权
+        stack = [(np.arange(len(ws)), False)]
+        produced = False  # 是否已经产出过边（之后取出的段需要先过滤）
+        while stack:
+            idx, uniform = stack.pop()
+            if produced and len(idx) > base_size:
+                # 沿 parent 指针倍增求出每个节点的根，删去两端已连通的边
+                root = np.frombuffer(uf.parent, dtype=np.int32, count=nodes + 1)
+                root = root[root]
+                while True:
+                    jumped = root[root]
+                    if np.array_equal(jumped, root):
+                        break
+                    root = jumped
+                idx = idx[root[us[idx]] != root[vs[idx]]]
+
+            if len(idx) <= base_size or uniform:
+                if not uniform:
+                    idx = idx[descending_argsort(ws[idx])]
+                if len(idx):
+                    produced = True
+                    yield from zip(us[idx].tolist(), vs[idx].tolist(), ws[idx].tolist())
+                continue
+
+            # 三路划分：轻的一段先入栈，重的一段最后入栈、最先处理
+            w = ws[idx]
+            pivot = w[rng.integers(len(idx))]
+            stack.append((idx[w < pivot], False))
+            stack.append((idx[w == pivot], True))
+            stack.append((idx[w > pivot], False))
+
+    def _descending_filtered_python(self, uf, base_size):
+        """Filter-Kruskal 的纯 Python 实现（无 NumPy 或边权不是整数时使用）"""
+        import random
+
+        us, vs, ws = self.us, self.vs, self.ws
+        find = uf.find
+        rng = random.Random(0)
+        stack = [(list(range(len(ws))), False)]
+        produced = False
+        while stack:
+            idx, uniform = stack.pop()
+            if produced and len(idx) > base_size:
+                idx = [i for i in idx if find(us[i]) != find(vs[i])]
+
+            if len(idx) <= base_size or uniform:
+                if not uniform:
+                    idx.sort(key=ws.__getitem__, reverse=True)
+                if idx:
+                    produced = True
+                    yield from ((us[i], vs[i], ws[i]) for i in idx)
+                continue
+
+            pivot = ws[idx[rng.randrange(len(idx))]]
+            stack.append(([i for i in idx if ws[i] < pivot], False))
+            stack.append(([i for i in idx if ws[i] == pivot], True))
+            stack.append(([i for i in idx if ws[i] > pivot], False))
+
+
 class UnionFind:
-    """并查集数据结构"""
+    """
+    并查集数据结构：parent / size 为扁平的 array('i')，
+    迭代 find 使用路径减半，合并按集合大小进行。
+    freeze() 之后得到稠密的 component_id 数组，连通性判断只需一次下标比较。
+    """
     def __init__(self, n):
         """
         初始化并查集
         Args:
             n: 元素个数（1-indexed，所以实际创建 n+1 个）
         """
-        self.parent = list(range(n + 1))
-        self.rank = [0] * (n + 1)
+        self.parent = array('i', range(n + 1))
+        self.size = array('i', [1]) * (n + 1)
+        self.component_id = None  # freeze() 之后为每个元素所在集合的根
 
     def find(self, x):
         """
-        查找 x 的根节点，带路径压缩优化
+        查找 x 的根节点，带路径减半优化（迭代实现，不受递归深度限制）
         Args:
             x: 要查找的元素
         Returns:
             x 所在集合的代表元素
         """
-        if self.parent[x] != x:
-            self.parent[x] = self.find(self.parent[x])  # 路径压缩
-        return self.parent[x]
+        parent = self.parent
+        while True:
+            p = parent[x]
+            if p == x:
+                return x
+            g = parent[p]
+            if g == p:
+                return p
+            # 路径减半：把 x 挂到祖父节点上，再跳到祖父节点（父节点已是根时不写入）
+            parent[x] = g
+            x = g
 
     def union(self, x, y):
         """
@@ -50,27 +464,127 @@ class UnionFind:
         if root_x == root_y:
             return False
 
-        # 按秩合并
-        if self.rank[root_x] < self.rank[root_y]:
-            self.parent[root_x] = root_y
-        elif self.rank[root_x] > self.rank[root_y]:
-            self.parent[root_y] = root_x
-        else:
-            self.parent[root_y] = root_x
-            self.rank[root_x] += 1
-
+        # 按大小合并：小集合挂到大集合上
+        size = self.size
+        if size[root_x] < size[root_y]:
+            root_x, root_y = root_y, root_x
+        self.parent[root_y] = root_x
+        size[root_x] += size[root_y]
+        self.component_id = None
         return True
 
     def connected(self, x, y):
         """
-        判断 x 和 y 是否在同一集合中
+        判断 x 和 y 是否在同一集合中（freeze() 之后为 O(1)）
         Args:
             x, y: 要判断的两个元素
         Returns:
             如果在同一集合返回 True，否则返回 False
         """
+        if self.component_id is not None:
+            return self.component_id[x] == self.component_id[y]
         return self.find(x) == self.find(y)
 
+    def freeze(self, count=None):
+        """
+        将当前划分固定为稠密的连通分量编号数组（编号为集合的根）
+        Args:
+            count: 只处理元素 1..count，默认全部
+        Returns:
+            array('i') 连通分量编号数组，下标 0 不使用
+        """
+        total = len(self.parent) if count is None else count + 1
+        component_id = array('i', bytes(4 * total))
+        find = self.find
+        for i in range(1, total):
+            component_id[i] = find(i)
+        self.component_id = component_id
+        return component_id
+
+    def connected_many(self, xs, ys):
+        """
+        批量判断连通性
+        Args:
+            xs, ys: 元素序列（等长）
+        Returns:
+            有 NumPy 时为 bool 数组，否则为列表
+        """
+        component_id = self.component_id if self.component_id is not None else self.freeze()
+        if np is not None:
+            component_id = np.frombuffer(component_id, dtype=np.int32)
+        return same_component(component_id, xs, ys, np is not None)
+
+
+class RollbackUnionFind(UnionFind):
+    """
+    可撤销并查集：按大小合并、不做路径压缩，合并操作可按栈序撤销
+    find 为 O(log n)，用于线段树分治等需要回滚的场景
+    """
+    def __init__(self, n):
+        """
+        初始化并查集
+        Args:
+            n: 元素个数（1-indexed，所以实际创建 n+1 个）
+        """
+        super().__init__(n)
+        self.history = []  # [被挂到别处的根, ...]
+
+    def find(self, x):
+        """
+        查找 x 的根节点（不做路径压缩，保证合并可以撤销）
+        Args:
+            x: 要查找的元素
+        Returns:
+            x 所在集合的代表元素
+        """
+        parent = self.parent
+        while parent[x] != x:
+            x = parent[x]
+        return x
+
+    def union(self, x, y):
+        """
+        按大小合并 x 和 y 所在的集合，并记录到撤销栈
+        Args:
+            x, y: 要合并的两个元素
+        Returns:
+            如果合并成功返回 True，如果已在同一集合返回 False
+        """
+        root_x = self.find(x)
+        root_y = self.find(y)
+
+        if root_x == root_y:
+            return False
+
+        size = self.size
+        if size[root_x] < size[root_y]:
+            root_x, root_y = root_y, root_x
+        self.parent[root_y] = root_x
+        size[root_x] += size[root_y]
+        self.history.append(root_y)
+        return True
+
+    def snapshot(self):
+        """
+        记录当前状态
+        Returns:
+            可传给 rollback 的状态标记
+        """
+        return len(self.history)
+
+    def rollback(self, snapshot):
+        """
+        撤销 snapshot 之后的所有合并
+        Args:
+            snapshot: snapshot() 返回的状态标记
+        """
+        history = self.history
+        while len(history) > snapshot:
+            root_y = history.pop()
+            root_x = self.parent[root_y]
+            self.parent[root_y] = root_y
+            self.size[root_x] -= self.size[root_y]
+
 
 class Graph:
     """图的邻接表表示"""
@@ -102,3 +616,73 @@ class Graph:
             [(v, weight), ...] 邻居列表
         """
         return self.adj[u]
+
+
+class ForestTraversal:
+    """
+    森林的非递归遍历（显式队列 BFS）
+
+    对每棵树从给定的根出发做一次 BFS，得到：
+        order: BFS 序（父节点总是排在子节点之前）
+        parent: 父节点，根的父节点是它自己
+        parent_weight: 到父节点的边权，根为 inf
+        depth: 深度，根的深度为 root_depth
+        size: 子树大小（按 BFS 逆序累加得到）
+        root: 所在树的根，可直接作为连通分量编号
+    全程只用数组和一个队列，内存为 O(节点数)，不受 Python 递归深度限制。
+    """
+    def __init__(self, graph, roots, root_depth=0):
+        """
+        Args:
+            graph: Graph 对象（树或森林）
+            roots: 根节点的可迭代对象；已被访问过的根会被跳过
+            root_depth: 根节点的深度
+        """
+        adj = graph.adj
+        total = len(adj)
+        self.order = []
+        self.parent = [0] * total
+        self.parent_weight = [float('inf')] * total
+        self.depth = [0] * total
+        self.size = [0] * total
+        self.root = [0] * total
+
+        order = self.order
+        parent = self.parent
+        parent_weight = self.parent_weight
+        depth = self.depth
+        tree_root = self.root
+        visited = [False] * total
+
+        for root in roots:
+            if visited[root]:
+                continue
+            visited[root] = True
+            parent[root] = root
+            depth[root] = root_depth
+            tree_root[root] = root
+            head = len(order)
+            order.append(root)
+
+            # order 本身就是 BFS 队列
+            while head < len(order):
+                u = order[head]
+                head += 1
+                next_depth = depth[u] + 1
+                for v, weight in adj[u]:
+                    if not visited[v]:
+                        visited[v] = True
+                        parent[v] = u
+                        parent_weight[v] = weight
+                        depth[v] = next_depth
+                        tree_root[v] = root
+                        order.append(v)
+
+        # 按 BFS 逆序累加子树大小
+        size = self.size
+        for u in order:
+            size[u] = 1
+        for u in reversed(order):
+            p = parent[u]
+            if p != u:
+                size[p] += size[u]
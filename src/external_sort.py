@@ -0,0 +1,262 @@
+"""
+外部排序：内存放不下全部边时，按边权降序把边送入 Kruskal
+
+1. 边按输入顺序每 chunk_size 条一段，段内按边权稳定降序排序后写入临时目录中的一个 run 文件
+   （每条记录为 int64 的 边权、原始下标、u、v，共 32 字节）
+2. heapq.merge 对所有 run 做多路归并，每个 run 每次只读入一小块记录；
+   run 超过 fan_in 个时先分组归并成较大的 run，同时打开的文件数不超过 fan_in
+3. 归并结果是惰性的迭代器，Kruskal 逐条消费，森林完整后即停止读取
+
+归并键为 (边权, -原始下标)：相同边权按输入顺序产出，与 EdgeStore.descending() 的顺序完全相同，
+因此得到的最大生成森林（Method 1 的树、Method 2 的重构树）与内存中排序时相同。
+内存占用为 O(chunk_size + fan_in * READ_BLOCK)，加上求解器本身的 O(n)。边权需为 int64 范围内的整数。
+"""
+
+import heapq
+import os
+import shutil
+import tempfile
+from array import array
+
+from common import descending_argsort, np
+
+RECORD_FIELDS = 4  # 每条记录：边权、原始下标、u、v
+READ_BLOCK = 1 << 14  # 读 run 时每次读入的记录数
+DEFAULT_CHUNK_SIZE = 1 << 20  # 每个 run 的边数
+DEFAULT_FAN_IN = 64  # 一次归并同时打开的 run 数
+
+
+def sorted_chunk(us, vs, ws, base):
+    """
+    一段边按边权稳定降序排序，交错排成记录
+    Args:
+        us, vs, ws: 该段边的三列（array('q')）
+        base: 该段第一条边的原始下标
+    Returns:
+        numpy 数组或 array('q')，依次为每条边的 边权、原始下标、u、v
+    """
+    if np is not None:
+        w = np.frombuffer(ws, dtype=np.int64)
+        order = descending_argsort(w)
+        records = np.empty((len(order), RECORD_FIELDS), dtype=np.int64)
+        records[:, 0] = w[order]
+        records[:, 1] = order + base
+        records[:, 2] = np.frombuffer(us, dtype=np.int64)[order]
+        records[:, 3] = np.frombuffer(vs, dtype=np.int64)[order]
+        return records
+    records = array('q')
+    for i in sorted(range(len(ws)), key=ws.__getitem__, reverse=True):
+        records.extend((ws[i], base + i, us[i], vs[i]))
+    return records
+
+
+def read_run(path, block=READ_BLOCK):
+    """
+    按块读出一个 run 文件中的记录
+    Args:
+        path: run 文件路径
+        block: 每次读入的记录数
+    Returns:
+        (边权, 原始下标, u, v) 元组的生成器
+    """
+    with open(path, "rb") as f:
+        while True:
+            records = array('q')
+            try:
+                records.fromfile(f, block * RECORD_FIELDS)
+            except EOFError:
+                pass  # 最后一块不足 block 条，已读到的记录仍在 records 中
+            if not records:
+                return
+            yield from zip(records[0::4], records[1::4], records[2::4], records[3::4])
+
+
+def _merge_key(record):
+    """归并键：边权大的在前，相同边权时原始下标小的在前"""
+    return record[0], -record[1]
+
+
+def merge_runs(paths):
+    """
+    多路归并若干 run
+    Args:
+        paths: run 文件路径列表
+    Returns:
+        按 (边权降序, 原始下标升序) 排列的记录迭代器
+    """
+    return heapq.merge(*(read_run(path) for path in paths), key=_merge_key, reverse=True)
+
+
+class SortedEdgeRuns:
+    """
+    磁盘上按边权降序排好的边：若干 run 文件，descending() 时多路归并
+    提供与 EdgeStore 相同的 len() 和 descending()，可以代替 EdgeStore 交给求解器
+    """
+
+    def __init__(self, directory, paths, count, passes, cleanup):
+        """
+        Args:
+            directory: run 文件所在的临时目录
+            paths: run 文件路径列表
+            count: 边数
+            passes: 写出最终 run 之前的归并轮数（0 表示没有分组归并）
+            cleanup: close() 时是否删除整个临时目录
+        """
+        self.directory = directory
+        self.paths = paths
+        self.count = count
+        self.passes = passes
+        self.cleanup = cleanup
+
+    def __len__(self):
+        return self.count
+
+    def descending(self):
+        """
+        按边权从大到小遍历所有边
+        Returns:
+            (u, v, w) 元组的迭代器，顺序与 EdgeStore.descending() 相同
+        """
+        return ((u, v, w) for w, _, u, v in merge_runs(self.paths))
+
+    def integer_weights(self):
+        """
+        run 文件中的边权都是 int64
+        Returns:
+            True
+        """
+        return True
+
+    def component_count(self, n):
+        """
+        连通分量数的下界：不读 run 就无法知道连通性，只能按连通处理
+        Args:
+            n: 城市数量
+        Returns:
+            min(n, 1)
+        """
+        return min(n, 1)
+
+    def close(self):
+        """删除 run 文件（和自己创建的临时目录）"""
+        if self.cleanup:
+            shutil.rmtree(self.directory, ignore_errors=True)
+        else:
+            for path in self.paths:
+                if os.path.exists(path):
+                    os.remove(path)
+        self.paths = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _RunWriter:
+    """在临时目录中依次创建 run 文件"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.created = 0
+
+    def new_path(self):
+        """下一个 run 文件的路径"""
+        self.created += 1
+        return os.path.join(self.directory, f"run{self.created:06d}.bin")
+
+    def write_chunk(self, us, vs, ws, base):
+        """一段边排序后写成一个 run，返回文件路径"""
+        path = self.new_path()
+        with open(path, "wb") as f:
+            sorted_chunk(us, vs, ws, base).tofile(f)
+        return path
+
+    def write_merged(self, paths):
+        """把若干 run 归并成一个 run，删除原来的文件，返回新文件路径"""
+        path = self.new_path()
+        with open(path, "wb") as f:
+            buffer = array('q')
+            for record in merge_runs(paths):
+                buffer.extend(record)
+                if len(buffer) >= READ_BLOCK * RECORD_FIELDS:
+                    buffer.tofile(f)
+                    buffer = array('q')
+            buffer.tofile(f)
+        for old in paths:
+            os.remove(old)
+        return path
+
+
+def sort_edges(edges, chunk_size=DEFAULT_CHUNK_SIZE, tmpdir=None, fan_in=DEFAULT_FAN_IN):
+    """
+    外部排序：把边流切成段，段内排序后写入 run 文件
+    Args:
+        edges: (u, v, w) 元组的可迭代对象（可以是逐行读文件的生成器）
+        chunk_size: 每个 run 的边数，决定排序阶段的内存占用
+        tmpdir: 存放 run 的目录，默认新建一个临时目录（close() 时删除）
+        fan_in: 一次归并同时打开的 run 数上限（至少为 2）
+    Returns:
+        SortedEdgeRuns（用 with 语句或 close() 删除 run 文件）
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size 必须为正整数")
+    if fan_in < 2:
+        raise ValueError("fan_in 至少为 2")
+    cleanup = tmpdir is None
+    directory = tempfile.mkdtemp(prefix="truck_runs_") if cleanup else tmpdir
+    writer = _RunWriter(directory)
+    paths = []
+    count = 0
+    try:
+        us, vs, ws = array('q'), array('q'), array('q')
+        for u, v, w in edges:
+            try:
+                ws.append(w)
+            except (TypeError, OverflowError):
+                raise ValueError(f"外部排序要求 int64 范围内的整数边权，遇到 {w!r}") from None
+            us.append(u)
+            vs.append(v)
+            if len(ws) == chunk_size:
+                paths.append(writer.write_chunk(us, vs, ws, count))
+                count += len(ws)
+                us, vs, ws = array('q'), array('q'), array('q')
+        if ws:
+            paths.append(writer.write_chunk(us, vs, ws, count))
+            count += len(ws)
+
+        # run 太多时分组归并，直到可以一次打开全部 run
+        passes = 0
+        while len(paths) > fan_in:
+            paths = [writer.write_merged(paths[i:i + fan_in]) for i in range(0, len(paths), fan_in)]
+            passes += 1
+    except BaseException:
+        SortedEdgeRuns(directory, paths, count, 0, cleanup).close()
+        raise
+    return SortedEdgeRuns(directory, paths, count, passes, cleanup)
+
+
+def read_edge_stream(tokens, m):
+    """
+    从整数流中依次取出 m 条边
+    Args:
+        tokens: 整数迭代器（如 iter_ints 的结果）
+        m: 边数
+    Returns:
+        (u, v, w) 元组的生成器
+    """
+    for _ in range(m):
+        yield next(tokens), next(tokens), next(tokens)
+
+
+def iter_ints(stream):
+    """
+    逐行读入二进制流并切分为整数，不一次性读入整个文件
+    Args:
+        stream: 以二进制模式打开的文件或 sys.stdin.buffer
+    Returns:
+        整数生成器
+    """
+    for line in stream:
+        yield from map(int, line.split())
@@ -0,0 +1,113 @@
+"""
+增量模式：用 Link-Cut Tree 维护最大生成森林，solve() 之后仍可继续加边
+
+算法步骤：
+1. solve() 时与 Method 1 相同，用 Kruskal 构建最大生成森林，并把森林边连入 Link-Cut Tree
+2. solve() 之后每加一条边 (u, v, w)：
+   - u、v 不连通：直接连边
+   - u、v 已连通：查询 u-v 路径上的最小边，若其权值小于 w，则删去它并连入新边
+3. 查询 x-y 路径上的最小边权，均摊 O(log n)
+
+每次加边均摊 O(log n)，无需重新排序和预处理。
+"""
+
+from common import EdgeStore, UnionFind
+from link_cut_tree import LinkCutTree
+
+
+class TruckTransportSolverIncremental:
+    """使用 Link-Cut Tree 的增量货车运输求解器"""
+
+    def __init__(self, n, m):
+        """
+        初始化求解器
+        Args:
+            n: 城市数量
+            m: 初始道路数量
+        """
+        self.n = n
+        self.m = m
+        self.edges = EdgeStore()  # 原始边（u、v、w 三列，包括 solve() 之后加入的边）
+        self.uf = UnionFind(n)  # 并查集（只加边，连通性单调）
+        self.lct = LinkCutTree(n)  # 节点 1..n 为城市，之后的节点为森林中的边
+        self.solved = False
+
+    def add_edge(self, u, v, weight):
+        """
+        添加一条道路；solve() 之后立即更新最大生成森林
+        Args:
+            u, v: 道路连接的两个城市
+            weight: 道路的限重
+        Returns:
+            solve() 之后返回该边是否进入了最大生成森林
+        """
+        self.edges.append(u, v, weight)
+        if self.solved:
+            return self.insert_edge(u, v, weight)
+        return None
+
+    def add_edges(self, us, vs, weights):
+        """
+        批量添加道路
+        Args:
+            us, vs: 每条道路两个端点的序列
+            weights: 每条道路限重的序列
+        """
+        for u, v, weight in zip(us, vs, weights):
+            self.add_edge(u, v, weight)
+
+    def build_maximum_spanning_tree(self):
+        """
+        使用 Kruskal 算法构建最大生成森林，并连入 Link-Cut Tree
+        """
+        for u, v, weight in self.edges.descending():
+            if self.uf.union(u, v):
+                self.lct.link_edge(u, v, weight)
+
+    def insert_edge(self, u, v, weight):
+        """
+        向已构建的最大生成森林中插入一条边
+        Args:
+            u, v: 道路连接的两个城市
+            weight: 道路的限重
+        Returns:
+            该边是否进入了最大生成森林
+        """
+        if u == v:
+            return False
+
+        # 不连通：直接连边
+        if self.uf.union(u, v):
+            self.lct.link_edge(u, v, weight)
+            return True
+
+        # 已连通：新边与路径构成环，替换环上的最小边
+        node = self.lct.path_min(u, v)
+        if self.lct.val[node] >= weight:
+            return False
+        self.lct.cut_edge(node)
+        self.lct.link_edge(u, v, weight)
+        return True
+
+    def solve(self):
+        """
+        求解问题：构建最大生成森林，之后进入增量模式
+        """
+        self.build_maximum_spanning_tree()
+        self.solved = True
+
+    def query_max_weight(self, x, y):
+        """
+        查询从 x 到 y 的路径上能承载的最大重量
+        Args:
+            x, y: 起点和终点城市
+        Returns:
+            最大载重，如果不连通返回 -1
+        """
+        if not self.uf.connected(x, y):
+            return -1
+
+        if x == y:
+            return float('inf')
+
+        return self.lct.val[self.lct.path_min(x, y)]
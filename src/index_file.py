@@ -0,0 +1,131 @@
+"""
+预处理索引文件：把求解器预处理得到的数组写入带版本号的二进制文件，
+加载时用 mmap 映射，数组直接是文件页上的 memoryview / numpy 视图，不复制数据。
+多个进程打开同一个文件时，由操作系统共享这些只读页。
+
+文件格式（本机字节序，int64）：
+    头部:   magic(8s) version(I) kind(16s) 表数量(I)
+    目录:   每张表 name(16s) rows(q) cols(q) offset(q)
+    数据:   每张表 rows x cols 个 int64，按行连续存放，8 字节对齐
+所有数组都按二维表存储，一维数组是 rows = 1 的表；inf 存为 INT_INF。
+"""
+
+import mmap
+import struct
+from array import array
+
+from common import INT_INF, EdgeStore, check_engine, np
+from profiling import NULL_PROFILER
+
+MAGIC = b"TRUCKIDX"
+VERSION = 1
+HEADER = struct.Struct("<8sI16sI")
+ENTRY = struct.Struct("<16sqqq")
+
+
+def _row_bytes(row):
+    """将一行数据编码为 int64 字节串"""
+    if np is not None and isinstance(row, np.ndarray):
+        return np.ascontiguousarray(row, dtype=np.int64).tobytes()
+    return array('q', (INT_INF if value == float('inf') else value for value in row)).tobytes()
+
+
+def write_index(path, kind, tables):
+    """
+    写入索引文件
+    Args:
+        path: 文件路径
+        kind: 求解器类型标识
+        tables: [(name, rows), ...]，rows 为等长序列组成的列表
+    """
+    offset = HEADER.size + ENTRY.size * len(tables)
+    entries = []
+    for name, rows in tables:
+        cols = len(rows[0]) if len(rows) else 0
+        entries.append((name, len(rows), cols, offset))
+        offset += 8 * len(rows) * cols
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, kind.encode(), len(tables)))
+        for name, rows, cols, start in entries:
+            f.write(ENTRY.pack(name.encode(), rows, cols, start))
+        for (_, rows), (name, _, cols, _) in zip(tables, entries):
+            for row in rows:
+                if len(row) != cols:
+                    raise ValueError(f"表 {name} 的各行长度不一致")
+                f.write(_row_bytes(row))
+
+
+class IndexFile:
+    """用 mmap 打开的索引文件"""
+
+    def __init__(self, path):
+        """
+        打开并解析索引文件
+        Args:
+            path: 文件路径
+        """
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, kind, count = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} 不是索引文件")
+        if version != VERSION:
+            raise ValueError(f"索引文件版本 {version} 不受支持（当前版本 {VERSION}）")
+        self.kind = kind.rstrip(b"\0").decode()
+
+        self.entries = {}
+        for i in range(count):
+            name, rows, cols, offset = ENTRY.unpack_from(self.mm, HEADER.size + i * ENTRY.size)
+            self.entries[name.rstrip(b"\0").decode()] = (rows, cols, offset)
+
+    def table(self, name, engine="python"):
+        """
+        取出一张表（零拷贝）
+        Args:
+            name: 表名
+            engine: "python" 返回 memoryview 行的列表，"numpy" 返回二维 int64 数组视图
+        """
+        rows, cols, offset = self.entries[name]
+        if engine == "numpy":
+            return np.frombuffer(self.mm, dtype=np.int64, count=rows * cols, offset=offset).reshape(rows, cols)
+        view = memoryview(self.mm)[offset:offset + 8 * rows * cols].cast('q')
+        return [view[i * cols:(i + 1) * cols] for i in range(rows)]
+
+
+def save_solver_index(solver, path):
+    """
+    保存求解器的预处理结果
+    Args:
+        solver: 已完成 solve() 的求解器，提供 INDEX_KIND 和 index_tables()
+        path: 文件路径
+    """
+    write_index(path, solver.INDEX_KIND, solver.index_tables())
+
+
+def load_solver_index(solver_class, path, engine="python"):
+    """
+    从索引文件创建只读的求解器（只能查询，不能再加边或 solve()）
+    Args:
+        solver_class: 求解器类，提供 INDEX_KIND 和 restore_index()
+        path: 文件路径
+        engine: 查询使用的引擎
+    Returns:
+        求解器实例
+    """
+    check_engine(engine)
+    index = IndexFile(path)
+    if index.kind != solver_class.INDEX_KIND:
+        raise ValueError(f"索引类型为 {index.kind}，不能用 {solver_class.__name__} 加载")
+
+    solver = solver_class.__new__(solver_class)
+    solver.engine = engine
+    solver.edges = EdgeStore()
+    solver.tree = None
+    solver.uf = None
+    solver.mst_stats = {}
+    solver.profiler = NULL_PROFILER
+    solver.index_file = index
+    solver.restore_index(index)
+    return solver
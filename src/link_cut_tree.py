@@ -0,0 +1,248 @@
+"""
+Link-Cut Tree：维护动态森林，支持连边、断边和路径最小值查询
+
+每个节点带一个权值 val，splay 子树中维护权值最小的节点 best。
+边权通过"边节点"表示：一条边 (u, v, w) 对应一个 val = w 的节点，
+连接为 u - 边节点 - v，原始节点的 val 为 inf。
+link_edge / cut_edge 封装了边节点的分配与复用。
+所有操作均为迭代实现，均摊 O(log n)。
+"""
+
+
+class LinkCutTree:
+    """Link-Cut Tree（数组实现，节点编号从 1 开始，0 表示空）"""
+
+    def __init__(self, n):
+        """
+        初始化森林
+        Args:
+            n: 初始节点个数，节点 1..n 的权值为 inf
+        """
+        size = n + 1
+        self.left = [0] * size  # splay 左儿子
+        self.right = [0] * size  # splay 右儿子
+        self.fa = [0] * size  # splay 父节点或路径父指针
+        self.rev = [False] * size  # 翻转懒标记（儿子尚未交换）
+        self.val = [float('inf')] * size  # 节点权值
+        self.best = list(range(size))  # splay 子树中权值最小的节点
+        self.edge_ends = {}  # 边节点 -> (u, v)
+        self.free_nodes = []  # 已被删除、可复用的边节点
+
+    def add_node(self, value):
+        """
+        新建一个孤立节点
+        Args:
+            value: 节点权值
+        Returns:
+            新节点编号
+        """
+        self.left.append(0)
+        self.right.append(0)
+        self.fa.append(0)
+        self.rev.append(False)
+        self.val.append(value)
+        self.best.append(len(self.val) - 1)
+        return len(self.val) - 1
+
+    def reset_node(self, x, value):
+        """
+        将一个已经孤立的节点重置为新的权值（用于复用被删除的边节点）
+        Args:
+            x: 节点编号
+            value: 新权值
+        """
+        self.left[x] = self.right[x] = self.fa[x] = 0
+        self.rev[x] = False
+        self.val[x] = value
+        self.best[x] = x
+
+    def _is_root(self, x):
+        """x 是否为所在 splay 的根"""
+        f = self.fa[x]
+        return self.left[f] != x and self.right[f] != x
+
+    def _pushup(self, x):
+        """由儿子更新 x 的 best"""
+        val = self.val
+        best = x
+        child = self.left[x]
+        if child and val[self.best[child]] < val[best]:
+            best = self.best[child]
+        child = self.right[x]
+        if child and val[self.best[child]] < val[best]:
+            best = self.best[child]
+        self.best[x] = best
+
+    def _pushdown(self, x):
+        """下传翻转标记"""
+        if self.rev[x]:
+            left, right = self.left[x], self.right[x]
+            self.left[x], self.right[x] = right, left
+            if left:
+                self.rev[left] = not self.rev[left]
+            if right:
+                self.rev[right] = not self.rev[right]
+            self.rev[x] = False
+
+    def _rotate(self, x):
+        """将 x 旋转到父节点的位置"""
+        left, right, fa = self.left, self.right, self.fa
+        y = fa[x]
+        z = fa[y]
+        if not self._is_root(y):
+            if left[z] == y:
+                left[z] = x
+            else:
+                right[z] = x
+        fa[x] = z
+
+        if left[y] == x:
+            child = right[x]
+            left[y] = child
+            right[x] = y
+        else:
+            child = left[x]
+            right[y] = child
+            left[x] = y
+        if child:
+            fa[child] = y
+        fa[y] = x
+
+        self._pushup(y)
+        self._pushup(x)
+
+    def _splay(self, x):
+        """将 x 伸展到所在 splay 的根"""
+        left, right, fa = self.left, self.right, self.fa
+
+        # 先从 splay 的根到 x 依次下传标记
+        path = [x]
+        y = x
+        while left[fa[y]] == y or right[fa[y]] == y:
+            y = fa[y]
+            path.append(y)
+        for node in reversed(path):
+            if self.rev[node]:
+                self._pushdown(node)
+
+        while left[fa[x]] == x or right[fa[x]] == x:
+            y = fa[x]
+            z = fa[y]
+            if left[z] == y or right[z] == y:
+                # 同侧先转父节点，异侧先转自己
+                if (left[y] == x) == (left[z] == y):
+                    self._rotate(y)
+                else:
+                    self._rotate(x)
+            self._rotate(x)
+
+    def access(self, x):
+        """
+        打通根到 x 的实链
+        Args:
+            x: 节点编号
+        """
+        last = 0
+        y = x
+        while y:
+            self._splay(y)
+            self.right[y] = last
+            self._pushup(y)
+            last = y
+            y = self.fa[y]
+
+    def make_root(self, x):
+        """
+        将 x 设为所在树的根
+        Args:
+            x: 节点编号
+        """
+        self.access(x)
+        self._splay(x)
+        self.rev[x] = not self.rev[x]
+
+    def find_root(self, x):
+        """
+        查找 x 所在树的根
+        Args:
+            x: 节点编号
+        Returns:
+            根节点编号
+        """
+        self.access(x)
+        self._splay(x)
+        self._pushdown(x)
+        while self.left[x]:
+            x = self.left[x]
+            self._pushdown(x)
+        self._splay(x)
+        return x
+
+    def link(self, x, y):
+        """
+        连接两棵不同树中的节点 x 和 y
+        Args:
+            x, y: 节点编号
+        """
+        self.make_root(x)
+        self.fa[x] = y
+
+    def cut(self, x, y):
+        """
+        断开树边 (x, y)，要求 x 和 y 相邻
+        Args:
+            x, y: 节点编号
+        """
+        self.make_root(x)
+        self.access(y)
+        self._splay(y)
+        # x 是根且与 y 相邻：x 恰好是 y 在 splay 中的左儿子
+        self.left[y] = 0
+        self.fa[x] = 0
+        self._pushup(y)
+
+    def path_min(self, x, y):
+        """
+        查询 x 到 y 路径上权值最小的节点，要求 x 和 y 连通
+        Args:
+            x, y: 节点编号
+        Returns:
+            权值最小的节点编号
+        """
+        self.make_root(x)
+        self.access(y)
+        self._splay(y)
+        return self.best[y]
+
+    def link_edge(self, u, v, weight):
+        """
+        连入一条森林边 u - 边节点 - v，要求 u 和 v 不连通
+        Args:
+            u, v: 边的两个端点
+            weight: 边权
+        Returns:
+            边节点编号
+        """
+        if self.free_nodes:
+            node = self.free_nodes.pop()
+            self.reset_node(node, weight)
+        else:
+            node = self.add_node(weight)
+        self.edge_ends[node] = (u, v)
+        self.link(u, node)
+        self.link(node, v)
+        return node
+
+    def cut_edge(self, node):
+        """
+        删去一条森林边
+        Args:
+            node: 边节点编号
+        Returns:
+            (u, v, weight) 被删去的边
+        """
+        u, v = self.edge_ends.pop(node)
+        self.cut(u, node)
+        self.cut(node, v)
+        self.free_nodes.append(node)
+        return u, v, self.val[node]
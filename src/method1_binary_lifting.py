@@ -3,35 +3,59 @@ Method 1: 使用倍增算法(Binary Lifting)求解货车运输问题
 
 算法步骤：
 1. 使用 Kruskal 算法构建最大生成树
-2. 在最大生成树上使用倍增算法预处理 LCA
+2. 在最大生成树上使用倍增算法预处理 LCA（非递归 BFS，支持百万级节点的长链）
 3. 对于每个查询，找到两点的 LCA 并计算路径上的最小边权
+
+倍增表按层存储：parent[k] / min_weight[k] 是第 k 层的一整行。
+engine="numpy" 时两张表是 (MAX_LOG+1) x (n+1) 的 int64 数组，
+每一层由一次 gather 加一次 np.minimum 得到，并支持 query_many 批量查询。
+
+save_index / load_index 将预处理结果写入索引文件，并用 mmap 零拷贝加载。
 """
 
-from common import Edge, UnionFind, Graph
+import cli
+from common import (EdgeStore, UnionFind, Graph, ForestTraversal, INT_INF,
+                    check_engine, check_integer_weights, resolve_mst_mode, same_component,
+                    to_answer, np)
+from all_pairs import bottleneck_matrix, parent_forest_edges
+from boruvka import boruvka_forest
+from index_file import save_solver_index, load_solver_index
+from profiling import NULL_PROFILER, enable_memory_report, enable_profiling
 
 
 class TruckTransportSolver1:
     """使用倍增算法的货车运输求解器"""
 
-    def __init__(self, n, m):
+    INDEX_KIND = "method1"  # 索引文件中的求解器类型
+
+    def __init__(self, n, m, engine="python", mst_mode="auto"):
         """
         初始化求解器
         Args:
             n: 城市数量
             m: 道路数量
+            engine: "python"（列表）或 "numpy"（int64 数组，需要整数边权）
+            mst_mode: "sort"（完整排序）、"filter"（Filter-Kruskal）、"boruvka"（向量化 Borůvka）
+                或 "auto"（稠密图用 filter）
         """
+        check_engine(engine)
+        resolve_mst_mode(mst_mode, n, m)
         self.n = n
         self.m = m
-        self.edges = []  # 原始边列表
+        self.engine = engine
+        self.mst_mode = mst_mode
+        self.mst_stats = {}  # 最近一次构建最大生成森林的统计
+        self.profiler = NULL_PROFILER  # 分阶段计时与计数（enable_profiling 后开启）
+        self.edges = EdgeStore()  # 原始边列表（u、v、w 三列）
         self.tree = Graph(n)  # 最大生成树
         self.uf = UnionFind(n)  # 并查集
 
         # 倍增相关数组
-        self.MAX_LOG = 20  # log2(10000) < 20
+        self.MAX_LOG = max(1, n.bit_length())  # 2^MAX_LOG > n >= 任意深度差
         self.depth = [0] * (n + 1)  # 节点深度
-        self.parent = [[0] * (self.MAX_LOG + 1) for _ in range(n + 1)]  # parent[u][k] = u 的第 2^k 个祖先
-        self.min_weight = [[float('inf')] * (self.MAX_LOG + 1) for _ in range(n + 1)]  # min_weight[u][k] = u 到第 2^k 个祖先路径上的最小边权
-        self.visited = [False] * (n + 1)  # DFS 访问标记
+        self.parent = []  # parent[k][u] = u 的第 2^k 个祖先（preprocess_lca 中按层填充）
+        self.min_weight = []  # min_weight[k][u] = u 到第 2^k 个祖先路径上的最小边权
+        self.component_id = [0] * (n + 1)  # 所在树的根（连通分量编号）
 
     def add_edge(self, u, v, weight):
         """
@@ -40,67 +64,150 @@ class TruckTransportSolver1:
             u, v: 道路连接的两个城市
             weight: 道路的限重
         """
-        self.edges.append(Edge(u, v, weight))
+        self.edges.append(u, v, weight)
 
-    def build_maximum_spanning_tree(self):
+    def add_edges(self, us, vs, weights):
         """
-        使用 Kruskal 算法构建最大生成树
-        核心思想：按边权从大到小排序，依次加入不构成环的边
+        批量添加道路
+        Args:
+            us, vs: 每条道路两个端点的序列
+            weights: 每条道路限重的序列
         """
-        # 按边权从大到小排序
-        self.edges.sort(key=lambda e: e.weight, reverse=True)
-
-        # Kruskal 算法
-        for edge in self.edges:
-            u, v, weight = edge.u, edge.v, edge.weight
-            # 如果 u 和 v 不在同一连通分量，则加入这条边
-            if self.uf.union(u, v):
-                self.tree.add_edge(u, v, weight)
+        self.edges.extend(us, vs, weights)
 
-    def dfs(self, u, parent_node=-1, parent_weight=float('inf')):
+    @classmethod
+    def from_edges(cls, n, us, vs, weights, engine="python", mst_mode="auto"):
         """
-        深度优先搜索，预处理深度和倍增数组
+        由边的三列数据直接创建求解器，不逐条调用 add_edge
         Args:
-            u: 当前节点
-            parent_node: 父节点
-            parent_weight: 到父节点的边权
+            n: 城市数量
+            us, vs: 每条道路两个端点的序列（list / array / numpy 数组）
+            weights: 每条道路限重的序列
+            engine: 求解器引擎
+            mst_mode: 构建最大生成森林的方式
+        Returns:
+            尚未 solve() 的 TruckTransportSolver1
         """
-        self.visited[u] = True
+        solver = cls(n, len(us), engine=engine, mst_mode=mst_mode)
+        solver.edges.extend(us, vs, weights)
+        return solver
 
-        # 设置直接父节点和到父节点的边权
-        self.parent[u][0] = parent_node
-        self.min_weight[u][0] = parent_weight
+    @classmethod
+    def from_sorted_runs(cls, n, runs, engine="python"):
+        """
+        由外部排序得到的边创建求解器（见 external_sort.py），边不进入内存
+        Args:
+            n: 城市数量
+            runs: external_sort.sort_edges 返回的 SortedEdgeRuns，solve() 之前不能关闭
+            engine: 求解器引擎
+        Returns:
+            尚未 solve() 的 TruckTransportSolver1，Kruskal 直接消费多路归并的结果
+        """
+        solver = cls(n, len(runs), engine=engine, mst_mode="sort")
+        solver.edges = runs
+        return solver
 
-        # 遍历所有邻居
-        for v, weight in self.tree.get_neighbors(u):
-            if not self.visited[v]:
-                self.depth[v] = self.depth[u] + 1
-                self.dfs(v, u, weight)
+    def build_maximum_spanning_tree(self):
+        """
+        使用 Kruskal 算法构建最大生成树
+        核心思想：按边权从大到小排序，依次加入不构成环的边
+        filter 模式下边按 Filter-Kruskal 的顺序产出，两端已连通的边在排序前就被删去；
+        boruvka 模式下先用向量化的 Borůvka 选出森林边，再按 Kruskal 顺序连边；
+        sort 模式在森林边数达到 n - 连通分量数时提前结束，其余模式在达到 n - 1 时提前结束
+        """
+        mode = resolve_mst_mode(self.mst_mode, self.n, len(self.edges))
+        profiler = self.profiler
+        components = 1
+        with profiler.phase("sort"):
+            if mode == "filter":
+                edges = self.edges.descending_filtered(self.uf, nodes=self.n)
+            elif mode == "boruvka":
+                # 森林边已由 Borůvka 选出，按 Kruskal 顺序产出，下面的合并都会成功
+                edges = boruvka_forest(self.n, self.edges)
+            else:
+                # 只对边权列求下标顺序（有界整数边权为基数排序）
+                edges = self.edges.descending()
+                # 图不连通时森林不到 n - 1 条边，预先算出连通分量数才能提前结束；
+                # filter 模式的较轻段会先被过滤，不需要这一步
+                components = self.edges.component_count(self.n)
+
+        # Kruskal 算法：按边权从大到小依次处理
+        target = self.n - components
+        merged = 0
+        scanned = 0
+        with profiler.phase("kruskal"):
+            for u, v, weight in edges:
+                scanned += 1
+                # 如果 u 和 v 不在同一连通分量，则加入这条边
+                if self.uf.union(u, v):
+                    self.tree.add_edge(u, v, weight)
+                    merged += 1
+                    if merged == target:
+                        break
+        profiler.count("unions", merged)
+
+        self.mst_stats = {"mst_mode": mode, "edges_scanned": scanned, "tree_edges": merged}
 
     def preprocess_lca(self):
         """
         预处理倍增数组
-        处理所有连通分量（可能是森林）
+        处理所有连通分量（可能是森林），用非递归的 BFS 得到父节点、深度和到父节点的边权
+        """
+        # 每个连通分量以编号最小的节点为根，根的父节点是自己
+        with self.profiler.phase("traversal"):
+            traversal = ForestTraversal(self.tree, range(1, self.n + 1), root_depth=1)
+        self.component_id = traversal.root
+
+        with self.profiler.phase("lifting"):
+            self.build_lifting_tables(traversal)
+
+    def build_lifting_tables(self, traversal):
         """
-        # 对每个连通分量的根节点进行 DFS
-        for i in range(1, self.n + 1):
-            if not self.visited[i]:
-                self.depth[i] = 1
-                self.dfs(i, i, float('inf'))  # 根节点的父节点是自己
-                self.parent[i][0] = i
-                self.min_weight[i][0] = float('inf')
+        由 BFS 遍历结果逐层填充倍增表
+        Args:
+            traversal: ForestTraversal 遍历结果
+        """
+        if self.engine == "numpy":
+            self.preprocess_lca_numpy(traversal)
+            return
+
+        self.depth = traversal.depth
+        self.parent = [traversal.parent]
+        self.min_weight = [traversal.parent_weight]
 
-        # 预处理倍增数组
+        # 预处理倍增数组，逐层整行生成
         for k in range(1, self.MAX_LOG + 1):
-            for u in range(1, self.n + 1):
-                # parent[u][k] = parent[parent[u][k-1]][k-1]
-                mid = self.parent[u][k - 1]
-                self.parent[u][k] = self.parent[mid][k - 1]
-                # min_weight[u][k] = min(min_weight[u][k-1], min_weight[parent[u][k-1]][k-1])
-                self.min_weight[u][k] = min(
-                    self.min_weight[u][k - 1],
-                    self.min_weight[mid][k - 1]
-                )
+            prev_parent = self.parent[k - 1]
+            prev_min = self.min_weight[k - 1]
+            # parent[k][u] = parent[k-1][parent[k-1][u]]
+            self.parent.append([prev_parent[mid] for mid in prev_parent])
+            # min_weight[k][u] = min(min_weight[k-1][u], min_weight[k-1][parent[k-1][u]])
+            self.min_weight.append([
+                w if w < prev_min[mid] else prev_min[mid]
+                for w, mid in zip(prev_min, prev_parent)
+            ])
+
+    def preprocess_lca_numpy(self, traversal):
+        """
+        numpy 引擎：倍增表为连续的 int64 数组，每层一行
+        Args:
+            traversal: ForestTraversal 遍历结果
+        """
+        levels = self.MAX_LOG + 1
+        self.depth = np.asarray(traversal.depth, dtype=np.int64)
+        self.component_id = np.asarray(traversal.root, dtype=np.int64)
+        self.parent = np.empty((levels, self.n + 1), dtype=np.int64)
+        self.min_weight = np.empty((levels, self.n + 1), dtype=np.int64)
+
+        self.parent[0] = traversal.parent
+        self.min_weight[0] = [
+            INT_INF if w == float('inf') else w for w in traversal.parent_weight
+        ]
+        for k in range(1, levels):
+            prev_parent = self.parent[k - 1]
+            prev_min = self.min_weight[k - 1]
+            np.take(prev_parent, prev_parent, out=self.parent[k])
+            np.minimum(prev_min, prev_min[prev_parent], out=self.min_weight[k])
 
     def query_max_weight(self, x, y):
         """
@@ -110,8 +217,11 @@ class TruckTransportSolver1:
         Returns:
             最大载重，如果不连通返回 -1
         """
-        # 检查是否连通
-        if not self.uf.connected(x, y):
+        if self.engine == "numpy":
+            return to_answer(self.query_many((x,), (y,))[0])
+
+        # 检查是否连通（同一棵树的根相同）
+        if self.component_id[x] != self.component_id[y]:
             return -1
 
         # 特殊情况：查询节点到自己
@@ -128,8 +238,8 @@ class TruckTransportSolver1:
         diff = self.depth[y] - self.depth[x]
         for k in range(self.MAX_LOG + 1):
             if (diff >> k) & 1:  # 如果 diff 的第 k 位是 1
-                result = min(result, self.min_weight[y][k])
-                y = self.parent[y][k]
+                result = min(result, self.min_weight[k][y])
+                y = self.parent[k][y]
 
         # 如果此时 x == y，说明 x 是 y 的祖先
         if x == y:
@@ -137,47 +247,232 @@ class TruckTransportSolver1:
 
         # 同时向上跳，直到跳到 LCA 的下一层
         for k in range(self.MAX_LOG, -1, -1):
-            if self.parent[x][k] != self.parent[y][k]:
-                result = min(result, self.min_weight[x][k], self.min_weight[y][k])
-                x = self.parent[x][k]
-                y = self.parent[y][k]
+            if self.parent[k][x] != self.parent[k][y]:
+                result = min(result, self.min_weight[k][x], self.min_weight[k][y])
+                x = self.parent[k][x]
+                y = self.parent[k][y]
 
         # 最后再跳一步到 LCA
-        result = min(result, self.min_weight[x][0], self.min_weight[y][0])
+        result = min(result, self.min_weight[0][x], self.min_weight[0][y])
 
         return result
 
+    def query_many(self, xs, ys):
+        """
+        批量查询：所有查询按层一起提升
+        Args:
+            xs, ys: 起点和终点城市序列（等长）
+        Returns:
+            numpy 引擎返回 int64 数组（不连通为 -1，起点等于终点为 INT_INF，用 to_answer 转换）；
+            python 引擎逐个调用 query_max_weight，返回列表
+        """
+        if self.engine != "numpy":
+            return [self.query_max_weight(x, y) for x, y in zip(xs, ys)]
+
+        parent = self.parent
+        min_weight = self.min_weight
+        depth = self.depth
+        xs = np.asarray(xs, dtype=np.int64)
+        ys = np.asarray(ys, dtype=np.int64)
+
+        # 连通性由连通分量编号数组一次性判断
+        connected = self.component_id[xs] == self.component_id[ys]
+        answers = np.where(connected, INT_INF, -1)
+
+        # 只处理连通且起点不等于终点的查询，并确保 y 的深度不小于 x
+        active = np.flatnonzero(connected & (xs != ys))
+        x = xs[active]
+        y = ys[active]
+        swap = depth[x] > depth[y]
+        x, y = np.where(swap, y, x), np.where(swap, x, y)
+        result = np.full(active.size, INT_INF, dtype=np.int64)
+
+        # 将 y 提升到与 x 相同的深度：第 k 层只处理 diff 第 k 位为 1 的查询
+        diff = depth[y] - depth[x]
+        for k in range(self.MAX_LOG + 1):
+            sel = np.flatnonzero((diff >> k) & 1)
+            if sel.size:
+                ysel = y[sel]
+                result[sel] = np.minimum(result[sel], min_weight[k][ysel])
+                y[sel] = parent[k][ysel]
+
+        # 尚未相遇的查询同时向上跳，直到跳到 LCA 的下一层
+        rest = np.flatnonzero(x != y)
+        x = x[rest]
+        y = y[rest]
+        rest_result = result[rest]
+        for k in range(self.MAX_LOG, -1, -1):
+            px = parent[k][x]
+            py = parent[k][y]
+            sel = np.flatnonzero(px != py)
+            if sel.size:
+                xsel = x[sel]
+                ysel = y[sel]
+                rest_result[sel] = np.minimum(
+                    rest_result[sel],
+                    np.minimum(min_weight[k][xsel], min_weight[k][ysel])
+                )
+                x[sel] = px[sel]
+                y[sel] = py[sel]
+
+        # 最后再跳一步到 LCA
+        result[rest] = np.minimum(
+            rest_result, np.minimum(min_weight[0][x], min_weight[0][y])
+        )
+        answers[active] = result
+        return answers
+
+    def query_steps(self, x, y):
+        """
+        查询 x 到 y 时倍增跳跃的次数（开启计时后用于统计，不计算答案）
+        Args:
+            x, y: 起点和终点城市
+        Returns:
+            跳跃次数；不连通或起点等于终点为 0
+        """
+        if self.component_id[x] != self.component_id[y] or x == y:
+            return 0
+        if self.depth[x] > self.depth[y]:
+            x, y = y, x
+        diff = int(self.depth[y] - self.depth[x])
+        steps = bin(diff).count("1")
+        for k in range(self.MAX_LOG + 1):
+            if (diff >> k) & 1:
+                y = self.parent[k][y]
+        if x == y:
+            return steps
+        for k in range(self.MAX_LOG, -1, -1):
+            if self.parent[k][x] != self.parent[k][y]:
+                x = self.parent[k][x]
+                y = self.parent[k][y]
+                steps += 1
+        return steps + 1
+
+    def forest_edges(self):
+        """
+        最大生成森林的边（由倍增表第 0 层得到，load_index 得到的求解器同样可用）
+        Returns:
+            (us, vs, ws) 列表
+        """
+        return parent_forest_edges(self.n, self.parent[0], self.min_weight[0])
+
+    def all_pairs(self, path=None):
+        """
+        全点对瓶颈矩阵（见 all_pairs.py，需要 NumPy），由森林的合并顺序 O(n^2) 得到
+        Args:
+            path: 可选的 .npy 文件路径，指定时写入内存映射文件
+        Returns:
+            (n, n) 数组：M[x - 1, y - 1] 为最大载重，不连通为 -1，对角线为 dtype 的最大值
+        """
+        return bottleneck_matrix(self.n, *self.forest_edges(), path=path)
+
+    def connected_many(self, xs, ys):
+        """
+        批量判断连通性：比较连通分量编号
+        Args:
+            xs, ys: 起点和终点城市序列（等长）
+        Returns:
+            numpy 引擎返回 bool 数组，python 引擎返回列表
+        """
+        return same_component(self.component_id, xs, ys, self.engine == "numpy")
+
     def solve(self):
         """
         求解问题：构建最大生成树并预处理 LCA
+        numpy 引擎要求边权为 int64 范围内的整数，否则抛出 ValueError
         """
+        check_integer_weights(self.edges, self.engine)
         self.build_maximum_spanning_tree()
         self.preprocess_lca()
 
+    def enable_profiling(self):
+        """
+        开启分阶段计时与计数（见 profiling.py），需在 solve() 之前调用
+        Returns:
+            Profiler
+        """
+        return enable_profiling(self)
+
+    def enable_memory_report(self):
+        """
+        开启分阶段计时、计数和内存统计（见 profiling.py），需在 solve() 之前调用
+        Returns:
+            MemoryProfiler
+        """
+        return enable_memory_report(self)
 
-def main():
-    """主函数：读取输入，求解并输出结果"""
-    # 读取城市数和道路数
-    n, m = map(int, input().split())
+    def memory_structures(self):
+        """
+        内存报告中统计的常驻结构
+        Returns:
+            {结构名: 对象}
+        """
+        return {
+            "edges": self.edges,
+            "tree.adj": self.tree.adj if self.tree is not None else None,
+            "dsu": self.uf,
+            "lifting": [self.depth, self.parent, self.min_weight, self.component_id],
+        }
+
+    def stats(self):
+        """
+        求解统计
+        Returns:
+            {"mst_mode": 实际使用的构建方式, "edges_scanned": Kruskal 检查过的边数, "tree_edges": 森林边数}；
+            开启计时后还有 "phases_ns"（各阶段纳秒）和 "counters"（并查集与查询的计数）
+        """
+        return dict(self.mst_stats, **self.profiler.report())
 
-    # 创建求解器
-    solver = TruckTransportSolver1(n, m)
+    def index_tables(self):
+        """
+        需要写入索引文件的数组
+        Returns:
+            [(name, rows), ...]
+        """
+        return [
+            ("meta", [[self.n, self.m, self.MAX_LOG]]),
+            ("depth", [self.depth]),
+            ("parent", list(self.parent)),
+            ("min_weight", list(self.min_weight)),
+            ("component_id", [self.component_id]),
+        ]
+
+    def restore_index(self, index):
+        """
+        从索引文件恢复查询所需的数组（零拷贝视图）
+        Args:
+            index: IndexFile
+        """
+        self.n, self.m, self.MAX_LOG = (int(v) for v in index.table("meta")[0])
+        self.depth = index.table("depth", self.engine)[0]
+        self.parent = index.table("parent", self.engine)
+        self.min_weight = index.table("min_weight", self.engine)
+        self.component_id = index.table("component_id", self.engine)[0]
 
-    # 读取道路信息
-    for _ in range(m):
-        x, y, z = map(int, input().split())
-        solver.add_edge(x, y, z)
+    def save_index(self, path):
+        """
+        将预处理结果保存为索引文件（边权需为整数）
+        Args:
+            path: 文件路径
+        """
+        save_solver_index(self, path)
 
-    # 构建最大生成树并预处理
-    solver.solve()
+    @classmethod
+    def load_index(cls, path, engine="python"):
+        """
+        用 mmap 加载索引文件，得到只能查询的求解器
+        Args:
+            path: 文件路径
+            engine: "python"（memoryview）或 "numpy"（数组视图）
+        Returns:
+            TruckTransportSolver1
+        """
+        return load_solver_index(cls, path, engine)
 
-    # 读取查询数量
-    q = int(input())
 
-    # 处理每个查询
-    for _ in range(q):
-        x, y = map(int, input().split())
-        print(solver.query_max_weight(x, y))
+def main(argv=None):
+    """主函数：读取输入，求解并输出结果（--offline 切换为 Tarjan 离线模式）"""
+    cli.run(TruckTransportSolver1, "货车运输问题 - Method 1（倍增）", argv)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,298 @@
+"""
+Method 1 的线性内存变体：斜二进制(skew-binary)跳跃指针
+
+倍增表需要 (MAX_LOG+1) x (n+1) 的 parent / min_weight，n 达到 10^7 时放不进内存。
+这里每个节点只存一个跳跃指针 jump 和跳跃路径上的最小边权 jump_min：
+    设 p 为 v 的父节点，若 p 到 jump[p] 与 jump[p] 到 jump[jump[p]] 的深度差相等，
+    则 jump[v] = jump[jump[p]]（两段合并为一段），否则 jump[v] = p。
+跳跃长度形如斜二进制数 2^k - 1，从任意节点向上到任意祖先只需 O(log n) 步：
+能跳（目标不越过祖先）就跳，否则走一步父边。
+
+算法步骤：
+1. 与 Method 1 相同，用 Kruskal 构建最大生成森林
+2. 按 BFS 序（父节点先于子节点）计算 depth / parent / parent_weight / jump / jump_min
+3. 查询时先把较深的点提升到同一深度，再两点同步上跳；
+   同一深度的节点跳跃指针的深度也相同，jump 不同就一起跳，相同就各走一步父边
+
+预处理 O(n) 时间和空间，查询 O(log n)。
+engine="numpy" 时数组为 int64，query_many 让一批查询同步上跳。
+"""
+
+import cli
+from common import ForestTraversal, INT_INF, to_answer, np
+from all_pairs import parent_forest_edges
+from method1_binary_lifting import TruckTransportSolver1
+
+
+class TruckTransportSolver1Skew(TruckTransportSolver1):
+    """使用斜二进制跳跃指针的货车运输求解器（最大生成森林与 Method 1 共用）"""
+
+    INDEX_KIND = "method1skew"  # 索引文件中的求解器类型
+
+    def __init__(self, n, m, engine="python", mst_mode="auto"):
+        """
+        初始化求解器
+        Args:
+            n: 城市数量
+            m: 道路数量
+            engine: "python"（列表）或 "numpy"（int64 数组，需要整数边权，solve() 时检查）
+            mst_mode: 构建最大生成森林的方式（见 common.MST_MODES）
+        """
+        super().__init__(n, m, engine, mst_mode)
+        self.parent = []  # 父节点，根的父节点是自己
+        self.parent_weight = []  # 到父节点的边权，根为 inf
+        self.jump = []  # 跳跃指针，根指向自己
+        self.jump_min = []  # 从节点到 jump 目标路径上的最小边权
+
+    def preprocess_lca(self):
+        """
+        预处理跳跃指针：按 BFS 序，父节点的指针总是先于子节点算好
+        """
+        with self.profiler.phase("traversal"):
+            traversal = ForestTraversal(self.tree, range(1, self.n + 1), root_depth=1)
+        with self.profiler.phase("jump_pointers"):
+            self.build_jump_pointers(traversal)
+
+    def build_jump_pointers(self, traversal):
+        """
+        由 BFS 遍历结果计算跳跃指针
+        Args:
+            traversal: ForestTraversal 遍历结果
+        """
+        depth = traversal.depth
+        parent = traversal.parent
+        parent_weight = traversal.parent_weight
+        jump = list(range(self.n + 1))
+        jump_min = [float('inf')] * (self.n + 1)
+
+        for v in traversal.order:
+            p = parent[v]
+            if p == v:
+                continue
+            w = parent_weight[v]
+            jp = jump[p]
+            jjp = jump[jp]
+            if jp != p and depth[p] - depth[jp] == depth[jp] - depth[jjp]:
+                # v -> p 一步，加上 p 的两段跳跃，合并为一段
+                jump[v] = jjp
+                best = jump_min[p] if jump_min[p] < jump_min[jp] else jump_min[jp]
+                jump_min[v] = w if w < best else best
+            else:
+                jump[v] = p
+                jump_min[v] = w
+
+        self.depth = depth
+        self.parent = parent
+        self.parent_weight = parent_weight
+        self.jump = jump
+        self.jump_min = jump_min
+        self.component_id = traversal.root
+
+        if self.engine == "numpy":
+            self.depth = np.asarray(depth, dtype=np.int64)
+            self.parent = np.asarray(parent, dtype=np.int64)
+            self.jump = np.asarray(jump, dtype=np.int64)
+            self.parent_weight = np.asarray(
+                [INT_INF if w == float('inf') else w for w in parent_weight], dtype=np.int64)
+            self.jump_min = np.asarray(
+                [INT_INF if w == float('inf') else w for w in jump_min], dtype=np.int64)
+            self.component_id = np.asarray(traversal.root, dtype=np.int64)
+
+    def query_max_weight(self, x, y):
+        """
+        查询从 x 到 y 的路径上能承载的最大重量
+        Args:
+            x, y: 起点和终点城市
+        Returns:
+            最大载重，如果不连通返回 -1
+        """
+        if self.engine == "numpy":
+            return to_answer(self.query_many((x,), (y,))[0])
+
+        if self.component_id[x] != self.component_id[y]:
+            return -1
+
+        if x == y:
+            return float('inf')
+
+        depth = self.depth
+        parent = self.parent
+        parent_weight = self.parent_weight
+        jump = self.jump
+        jump_min = self.jump_min
+        result = float('inf')
+
+        # 确保 y 的深度不小于 x，然后把 y 提升到 x 的深度
+        if depth[x] > depth[y]:
+            x, y = y, x
+        target = depth[x]
+        while depth[y] > target:
+            if depth[jump[y]] >= target:
+                if jump_min[y] < result:
+                    result = jump_min[y]
+                y = jump[y]
+            else:
+                if parent_weight[y] < result:
+                    result = parent_weight[y]
+                y = parent[y]
+
+        # 同一深度同步上跳，直到相遇
+        while x != y:
+            if jump[x] != jump[y]:
+                result = min(result, jump_min[x], jump_min[y])
+                x = jump[x]
+                y = jump[y]
+            else:
+                result = min(result, parent_weight[x], parent_weight[y])
+                x = parent[x]
+                y = parent[y]
+
+        return result
+
+    def query_steps(self, x, y):
+        """
+        查询 x 到 y 时走过的跳跃指针和父边的步数（开启计时后用于统计，不计算答案）
+        Args:
+            x, y: 起点和终点城市
+        Returns:
+            步数；不连通或起点等于终点为 0
+        """
+        if self.component_id[x] != self.component_id[y] or x == y:
+            return 0
+        depth = self.depth
+        parent = self.parent
+        jump = self.jump
+        if depth[x] > depth[y]:
+            x, y = y, x
+        target = depth[x]
+        steps = 0
+        while depth[y] > target:
+            y = jump[y] if depth[jump[y]] >= target else parent[y]
+            steps += 1
+        while x != y:
+            if jump[x] != jump[y]:
+                x, y = jump[x], jump[y]
+            else:
+                x, y = parent[x], parent[y]
+            steps += 1
+        return steps
+
+    def query_many(self, xs, ys):
+        """
+        批量查询：每一轮所有未完成的查询各跳一步
+        Args:
+            xs, ys: 起点和终点城市序列（等长）
+        Returns:
+            numpy 引擎返回 int64 数组（不连通为 -1，起点等于终点为 INT_INF，用 to_answer 转换）；
+            python 引擎逐个调用 query_max_weight，返回列表
+        """
+        if self.engine != "numpy":
+            return [self.query_max_weight(x, y) for x, y in zip(xs, ys)]
+
+        depth = self.depth
+        parent = self.parent
+        parent_weight = self.parent_weight
+        jump = self.jump
+        jump_min = self.jump_min
+        xs = np.asarray(xs, dtype=np.int64)
+        ys = np.asarray(ys, dtype=np.int64)
+
+        connected = self.component_id[xs] == self.component_id[ys]
+        answers = np.where(connected, INT_INF, -1)
+
+        active = np.flatnonzero(connected & (xs != ys))
+        x = xs[active]
+        y = ys[active]
+        swap = depth[x] > depth[y]
+        x, y = np.where(swap, y, x), np.where(swap, x, y)
+        result = np.full(active.size, INT_INF, dtype=np.int64)
+
+        # 把 y 提升到 x 的深度
+        target = depth[x]
+        pending = np.flatnonzero(depth[y] > target)
+        while pending.size:
+            yp = y[pending]
+            jy = jump[yp]
+            use_jump = depth[jy] >= target[pending]
+            step_min = np.where(use_jump, jump_min[yp], parent_weight[yp])
+            result[pending] = np.minimum(result[pending], step_min)
+            y[pending] = np.where(use_jump, jy, parent[yp])
+            pending = pending[depth[y[pending]] > target[pending]]
+
+        # 同一深度同步上跳，直到相遇
+        pending = np.flatnonzero(x != y)
+        while pending.size:
+            xp = x[pending]
+            yp = y[pending]
+            jx = jump[xp]
+            jy = jump[yp]
+            use_jump = jx != jy
+            step_min = np.where(use_jump,
+                                np.minimum(jump_min[xp], jump_min[yp]),
+                                np.minimum(parent_weight[xp], parent_weight[yp]))
+            result[pending] = np.minimum(result[pending], step_min)
+            x[pending] = np.where(use_jump, jx, parent[xp])
+            y[pending] = np.where(use_jump, jy, parent[yp])
+            pending = pending[x[pending] != y[pending]]
+
+        answers[active] = result
+        return answers
+
+    def forest_edges(self):
+        """
+        最大生成森林的边（由父节点数组得到）
+        Returns:
+            (us, vs, ws) 列表
+        """
+        return parent_forest_edges(self.n, self.parent, self.parent_weight)
+
+    def memory_structures(self):
+        """
+        内存报告中统计的常驻结构（跳跃指针代替倍增表）
+        Returns:
+            {结构名: 对象}
+        """
+        structures = super().memory_structures()
+        del structures["lifting"]
+        structures["jump_pointers"] = [self.depth, self.parent, self.parent_weight,
+                                       self.jump, self.jump_min, self.component_id]
+        return structures
+
+    def index_tables(self):
+        """
+        需要写入索引文件的数组
+        Returns:
+            [(name, rows), ...]
+        """
+        return [
+            ("meta", [[self.n, self.m]]),
+            ("depth", [self.depth]),
+            ("parent", [self.parent]),
+            ("parent_weight", [self.parent_weight]),
+            ("jump", [self.jump]),
+            ("jump_min", [self.jump_min]),
+            ("component_id", [self.component_id]),
+        ]
+
+    def restore_index(self, index):
+        """
+        从索引文件恢复查询所需的数组（零拷贝视图）
+        Args:
+            index: IndexFile
+        """
+        self.n, self.m = (int(v) for v in index.table("meta")[0])
+        self.depth = index.table("depth", self.engine)[0]
+        self.parent = index.table("parent", self.engine)[0]
+        self.parent_weight = index.table("parent_weight", self.engine)[0]
+        self.jump = index.table("jump", self.engine)[0]
+        self.jump_min = index.table("jump_min", self.engine)[0]
+        self.component_id = index.table("component_id", self.engine)[0]
+
+
+def main(argv=None):
+    """主函数：读取输入，求解并输出结果（--offline 切换为 Tarjan 离线模式）"""
+    cli.run(TruckTransportSolver1Skew, "货车运输问题 - Method 1（斜二进制跳跃指针）", argv)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,38 +3,71 @@ Method 2: 使用树链剖分(Heavy-Light Decomposition)求解货车运输问题
 
 算法步骤：
 1. 使用 Kruskal 算法构建最大生成树，将边转化为虚拟节点
-2. 在扩展树上使用树链剖分预处理
+2. 在扩展树上使用树链剖分预处理（非递归 BFS，支持百万级节点的长链）
 3. 对于每个查询，使用树链剖分快速找到 LCA
+
+engine="numpy" 时 top/parent/depth/val 与连通分量编号保存为 int64 数组，
+query_many 让一批查询同步跳链：每一轮所有未完成的查询各跳一条重链，
+已在同一条重链上的查询退出活动集合，总共 O(log n) 轮向量化操作。
+
+save_index / load_index 将预处理结果写入索引文件，并用 mmap 零拷贝加载。
+
+阈值可达查询（reachable_set / reachable_count / can_ship）：重构树中从叶子向上 val 单调不增，
+载重 W 的货车从 x 出发能到达的城市，恰好是 x 的 val >= W 的最高祖先子树中的全部叶子。
+首次查询时按重儿子优先的 DFS 序建立索引：每条重链在 DFS 序中连续，子树是一段连续区间。
+查询沿重链向上跳找到该祖先（链顶满足条件就跳到链顶的父节点，否则在这条链上二分），
+再取出子树对应的叶子区间，O(log n + 输出大小)。
 """
 
-from common import Edge, UnionFind, Graph
+from bisect import bisect_left
+
+import cli
+from common import (EdgeStore, UnionFind, Graph, ForestTraversal, INT_INF, check_engine,
+                    check_integer_weights, resolve_mst_mode, same_component, to_answer, np)
+from all_pairs import bottleneck_matrix
+from boruvka import boruvka_forest
+from index_file import save_solver_index, load_solver_index
+from profiling import NULL_PROFILER, enable_memory_report, enable_profiling
 
 
 class TruckTransportSolver2:
     """使用树链剖分的货车运输求解器"""
 
-    def __init__(self, n, m):
+    INDEX_KIND = "method2"  # 索引文件中的求解器类型
+
+    def __init__(self, n, m, engine="python", mst_mode="auto"):
         """
         初始化求解器
         Args:
             n: 城市数量（原始节点）
             m: 道路数量
+            engine: "python"（列表）或 "numpy"（int64 数组，需要整数边权）
+            mst_mode: "sort"（完整排序）、"filter"（Filter-Kruskal）、"boruvka"（向量化 Borůvka）
+                或 "auto"（稠密图用 filter）
         """
+        check_engine(engine)
+        resolve_mst_mode(mst_mode, n, m)
         self.n = n
         self.m = m
-        self.edges = []  # 原始边列表
+        self.engine = engine
+        self.mst_mode = mst_mode
+        self.mst_stats = {}  # 最近一次构建最大生成森林的统计
+        self.profiler = NULL_PROFILER  # 分阶段计时与计数（enable_profiling 后开启）
+        self.edges = EdgeStore()  # 原始边列表（u、v、w 三列）
         self.node_count = n  # 当前节点总数（包括虚拟节点）
-        self.tree = Graph(n + m)  # 扩展后的树（原始节点 + 虚拟节点）
-        self.uf = UnionFind(n + m)  # 并查集
+        nodes = n + min(m, max(n - 1, 0))  # 森林至多 n - 1 条边，即至多 n - 1 个虚拟节点
+        self.tree = Graph(nodes)  # 扩展后的树（原始节点 + 虚拟节点）
+        self.uf = UnionFind(nodes)  # 并查集
 
         # 树链剖分相关数组
-        self.val = [0] * (n + m + 1)  # 虚拟节点的权值（边权）
-        self.depth = [0] * (n + m + 1)  # 节点深度
-        self.parent = [0] * (n + m + 1)  # 父节点
-        self.heavy_son = [0] * (n + m + 1)  # 重儿子
-        self.size = [0] * (n + m + 1)  # 子树大小
-        self.top = [0] * (n + m + 1)  # 所在重链的顶端节点
-        self.visited = [False] * (n + m + 1)  # 访问标记
+        self.val = [0] * (nodes + 1)  # 虚拟节点的权值（边权）
+        self.depth = [0] * (nodes + 1)  # 节点深度
+        self.parent = [0] * (nodes + 1)  # 父节点
+        self.heavy_son = [0] * (nodes + 1)  # 重儿子
+        self.size = [0] * (nodes + 1)  # 子树大小
+        self.top = [0] * (nodes + 1)  # 所在重链的顶端节点
+        self.component_id = [0] * (nodes + 1)  # 所在重构树的根（连通分量编号）
+        self.reach_index = None  # 阈值可达查询的 DFS 序索引（首次查询时建立）
 
     def add_edge(self, u, v, weight):
         """
@@ -43,83 +76,135 @@ class TruckTransportSolver2:
             u, v: 道路连接的两个城市
             weight: 道路的限重
         """
-        self.edges.append(Edge(u, v, weight))
+        self.edges.append(u, v, weight)
 
-    def build_maximum_spanning_tree(self):
+    def add_edges(self, us, vs, weights):
         """
-        使用 Kruskal 算法构建最大生成树
-        将每条边转化为一个虚拟节点，边权存储在虚拟节点上
+        批量添加道路
+        Args:
+            us, vs: 每条道路两个端点的序列
+            weights: 每条道路限重的序列
         """
-        # 按边权从大到小排序
-        self.edges.sort(key=lambda e: e.weight, reverse=True)
-
-        # Kruskal 算法
-        for edge in self.edges:
-            u, v, weight = edge.u, edge.v, edge.weight
-            fu = self.uf.find(u)
-            fv = self.uf.find(v)
-
-            # 如果 u 和 v 不在同一连通分量
-            if fu != fv:
-                # 创建虚拟节点
-                self.node_count += 1
-                virtual_node = self.node_count
-                self.val[virtual_node] = weight  # 虚拟节点存储边权
+        self.edges.extend(us, vs, weights)
 
-                # 合并三个节点到同一集合
-                self.uf.parent[virtual_node] = virtual_node
-                self.uf.parent[fu] = virtual_node
-                self.uf.parent[fv] = virtual_node
-
-                # 添加边：原始节点 -> 虚拟节点
-                self.tree.add_edge(fu, virtual_node, weight)
-                self.tree.add_edge(fv, virtual_node, weight)
-
-    def dfs1(self, u, parent_node):
+    @classmethod
+    def from_edges(cls, n, us, vs, weights, engine="python", mst_mode="auto"):
         """
-        第一次 DFS：计算深度、父节点、子树大小、重儿子
+        由边的三列数据直接创建求解器，不逐条调用 add_edge
         Args:
-            u: 当前节点
-            parent_node: 父节点
+            n: 城市数量
+            us, vs: 每条道路两个端点的序列（list / array / numpy 数组）
+            weights: 每条道路限重的序列
+            engine: 求解器引擎
+            mst_mode: 构建最大生成森林的方式
+        Returns:
+            尚未 solve() 的 TruckTransportSolver2
         """
-        self.visited[u] = True
-        self.size[u] = 1
-        self.parent[u] = parent_node
+        solver = cls(n, len(us), engine=engine, mst_mode=mst_mode)
+        solver.edges.extend(us, vs, weights)
+        return solver
 
-        max_size = 0
-        for v, _ in self.tree.get_neighbors(u):
-            if v == parent_node:
-                continue
-
-            self.depth[v] = self.depth[u] + 1
-            self.dfs1(v, u)
-            self.size[u] += self.size[v]
-
-            # 找重儿子（子树最大的儿子）
-            if self.size[v] > max_size:
-                max_size = self.size[v]
-                self.heavy_son[u] = v
-
-    def dfs2(self, u, top_node):
+    @classmethod
+    def from_sorted_runs(cls, n, runs, engine="python"):
         """
-        第二次 DFS：标记每个节点所在重链的顶端
+        由外部排序得到的边创建求解器（见 external_sort.py），边不进入内存
         Args:
-            u: 当前节点
-            top_node: 当前重链的顶端节点
+            n: 城市数量
+            runs: external_sort.sort_edges 返回的 SortedEdgeRuns，solve() 之前不能关闭
+            engine: 求解器引擎
+        Returns:
+            尚未 solve() 的 TruckTransportSolver2，Kruskal 直接消费多路归并的结果
         """
-        self.top[u] = top_node
-
-        # 如果没有重儿子，返回
-        if self.heavy_son[u] == 0:
-            return
-
-        # 先处理重儿子（继续当前重链）
-        self.dfs2(self.heavy_son[u], top_node)
+        solver = cls(n, len(runs), engine=engine, mst_mode="sort")
+        solver.edges = runs
+        return solver
 
-        # 再处理轻儿子（开始新的重链）
-        for v, _ in self.tree.get_neighbors(u):
-            if v != self.parent[u] and v != self.heavy_son[u]:
-                self.dfs2(v, v)
+    def build_maximum_spanning_tree(self):
+        """
+        使用 Kruskal 算法构建最大生成树
+        将每条边转化为一个虚拟节点，边权存储在虚拟节点上
+        filter 模式下边按 Filter-Kruskal 的顺序产出，两端已连通的边在排序前就被删去；
+        boruvka 模式下先用向量化的 Borůvka 选出森林边，再按 Kruskal 顺序连边；
+        sort 模式在森林边数达到 n - 连通分量数时提前结束，其余模式在达到 n - 1 时提前结束
+        """
+        mode = resolve_mst_mode(self.mst_mode, self.n, len(self.edges))
+        profiler = self.profiler
+        components = 1
+        with profiler.phase("sort"):
+            if mode == "filter":
+                # 并查集只为 n 个城市和至多 n - 1（且不超过 m）个虚拟节点分配了元素
+                edges = self.edges.descending_filtered(self.uf, nodes=len(self.uf.parent) - 1)
+            elif mode == "boruvka":
+                # 森林边已由 Borůvka 选出，按 Kruskal 顺序产出，下面的合并都会成功
+                edges = boruvka_forest(self.n, self.edges)
+            else:
+                # 只对边权列求下标顺序（有界整数边权为基数排序）
+                edges = self.edges.descending()
+                # 图不连通时森林不到 n - 1 条边，预先算出连通分量数才能提前结束；
+                # filter 模式的较轻段会先被过滤，不需要这一步
+                components = self.edges.component_count(self.n)
+        target = 2 * self.n - components  # 森林完整时的节点总数
+
+        # Kruskal 算法：按边权从大到小依次处理
+        scanned = 0
+        with profiler.phase("kruskal"):
+            for u, v, weight in edges:
+                scanned += 1
+                fu = self.uf.find(u)
+                fv = self.uf.find(v)
+
+                # 如果 u 和 v 不在同一连通分量
+                if fu != fv:
+                    # 创建虚拟节点
+                    self.node_count += 1
+                    virtual_node = self.node_count
+                    self.val[virtual_node] = weight  # 虚拟节点存储边权
+
+                    # 合并三个节点到同一集合（直接改写 parent，重构树的根即并查集的根）
+                    self.uf.parent[virtual_node] = virtual_node
+                    self.uf.parent[fu] = virtual_node
+                    self.uf.parent[fv] = virtual_node
+
+                    # 添加边：原始节点 -> 虚拟节点
+                    self.tree.add_edge(fu, virtual_node, weight)
+                    self.tree.add_edge(fv, virtual_node, weight)
+                    if self.node_count == target:
+                        break
+        profiler.count("unions", self.node_count - self.n)
+
+        self.mst_stats = {"mst_mode": mode, "edges_scanned": scanned, "tree_edges": self.node_count - self.n}
+
+    def build_heavy_light(self, traversal):
+        """
+        在 BFS 遍历结果上完成树链剖分：计算重儿子和每个节点所在重链的顶端
+        Args:
+            traversal: ForestTraversal，提供 BFS 序、父节点、深度和子树大小
+        """
+        order = traversal.order
+        parent = traversal.parent
+        size = traversal.size
+        heavy_son = self.heavy_son
+        top = self.top
+        adj = self.tree.adj
+
+        # 找重儿子（子树最大的儿子）
+        for u in order:
+            max_size = 0
+            p = parent[u]
+            for v, _ in adj[u]:
+                if v != p and size[v] > max_size:
+                    max_size = size[v]
+                    heavy_son[u] = v
+
+        # BFS 序中父节点先于子节点：重儿子继承父节点的链顶，轻儿子开始新的重链
+        for u in order:
+            p = parent[u]
+            if p == u:
+                top[u] = u
+            elif heavy_son[p] == u:
+                top[u] = top[p]
+            else:
+                top[u] = u
 
     def get_lca(self, u, v):
         """
@@ -143,14 +228,26 @@ class TruckTransportSolver2:
     def preprocess(self):
         """
         预处理树链剖分
-        对每个连通分量分别处理
+        对每个连通分量分别处理（以重构树的根为根，非递归 BFS）
         """
-        for i in range(1, self.node_count + 1):
-            if not self.visited[i]:
-                root = self.uf.find(i)
-                self.depth[root] = 0
-                self.dfs1(root, root)
-                self.dfs2(root, root)
+        # 并查集中仍指向自己的节点就是各棵重构树的根
+        uf_parent = self.uf.parent
+        with self.profiler.phase("traversal"):
+            roots = [i for i in range(1, self.node_count + 1) if uf_parent[i] == i]
+            traversal = ForestTraversal(self.tree, roots, root_depth=0)
+        self.depth = traversal.depth
+        self.parent = traversal.parent
+        self.size = traversal.size
+        self.component_id = traversal.root
+        with self.profiler.phase("heavy_light"):
+            self.build_heavy_light(traversal)
+            if self.engine == "numpy":
+                # 查询只需要这些数组，转换为连续的 int64 数组
+                self.top = np.asarray(self.top, dtype=np.int64)
+                self.parent = np.asarray(self.parent, dtype=np.int64)
+                self.depth = np.asarray(self.depth, dtype=np.int64)
+                self.val = np.asarray(self.val, dtype=np.int64)
+                self.component_id = np.asarray(self.component_id, dtype=np.int64)
 
     def query_max_weight(self, x, y):
         """
@@ -160,8 +257,11 @@ class TruckTransportSolver2:
         Returns:
             最大载重，如果不连通返回 -1
         """
-        # 检查是否连通
-        if not self.uf.connected(x, y):
+        if self.engine == "numpy":
+            return to_answer(self.query_many((x,), (y,))[0])
+
+        # 检查是否连通（同一棵重构树的根相同）
+        if self.component_id[x] != self.component_id[y]:
             return -1
 
         # 特殊情况：查询节点到自己
@@ -175,37 +275,355 @@ class TruckTransportSolver2:
         # 因为在最大生成树中，x 到 y 的路径上权值最小的边对应的虚拟节点就是它们的 LCA
         return self.val[lca]
 
+    def query_many(self, xs, ys):
+        """
+        批量查询：所有未完成的查询同步跳链
+        Args:
+            xs, ys: 起点和终点城市序列（等长）
+        Returns:
+            numpy 引擎返回 int64 数组（不连通为 -1，起点等于终点为 INT_INF，用 to_answer 转换）；
+            python 引擎逐个调用 query_max_weight，返回列表
+        """
+        if self.engine != "numpy":
+            return [self.query_max_weight(x, y) for x, y in zip(xs, ys)]
+
+        top = self.top
+        parent = self.parent
+        depth = self.depth
+        xs = np.asarray(xs, dtype=np.int64)
+        ys = np.asarray(ys, dtype=np.int64)
+
+        # 连通性由连通分量编号数组一次性判断
+        connected = self.component_id[xs] == self.component_id[ys]
+        answers = np.where(connected, INT_INF, -1)
+
+        active = np.flatnonzero(connected & (xs != ys))
+        lca = np.empty(active.size, dtype=np.int64)
+        pending = np.arange(active.size)  # 尚未完成的查询在 active 中的位置
+        u = xs[active]
+        v = ys[active]
+
+        while pending.size:
+            top_u = top[u]
+            top_v = top[v]
+
+            # 已在同一条重链上：深度较小的就是 LCA，查询退出活动集合
+            done = top_u == top_v
+            if done.any():
+                du = u[done]
+                dv = v[done]
+                lca[pending[done]] = np.where(depth[du] < depth[dv], du, dv)
+                keep = ~done
+                pending = pending[keep]
+                u, v = u[keep], v[keep]
+                top_u, top_v = top_u[keep], top_v[keep]
+
+            # 将链顶深度较大的一侧跳到链顶的父节点
+            jump_u = depth[top_u] > depth[top_v]
+            u = np.where(jump_u, parent[top_u], u)
+            v = np.where(jump_u, v, parent[top_v])
+
+        # LCA 对应的虚拟节点的权值就是路径上的瓶颈
+        answers[active] = self.val[lca]
+        return answers
+
+    def query_steps(self, x, y):
+        """
+        查询 x 到 y 时跳链的次数（开启计时后用于统计，不计算答案）
+        Args:
+            x, y: 起点和终点城市
+        Returns:
+            跳链次数；不连通或起点等于终点为 0
+        """
+        if self.component_id[x] != self.component_id[y] or x == y:
+            return 0
+        top = self.top
+        depth = self.depth
+        steps = 0
+        while top[x] != top[y]:
+            if depth[top[x]] > depth[top[y]]:
+                x = self.parent[top[x]]
+            else:
+                y = self.parent[top[y]]
+            steps += 1
+        return steps
+
+    def build_reach_index(self):
+        """
+        建立阈值可达查询的索引：重儿子优先的 DFS 序，每条重链是其中连续的一段
+        （只用到 parent / heavy_son / top / val，load_index 得到的求解器同样可用）
+        Returns:
+            (order, pos, key, leaf_before, leaf_order, subtree_end)：
+            order 为 DFS 序；pos[u] 为 u 在 DFS 序中的位置；key[i] 为该位置节点的 val（叶子为 inf，保证链上自顶向下不减）；
+            leaf_before[i] 为位置 i 之前的叶子数；leaf_order 为按 DFS 序排列的城市；
+            subtree_end[u] 为 u 的子树在 DFS 序中的结束位置（不含）
+        """
+        total = self.node_count
+        parent = self.parent
+        heavy_son = self.heavy_son
+        val = self.val
+        n = self.n
+
+        children = [[] for _ in range(total + 1)]
+        roots = []
+        for c in range(1, total + 1):
+            p = int(parent[c])
+            if p == c:
+                roots.append(c)
+            elif int(heavy_son[p]) != c:
+                children[p].append(c)
+
+        # 先序遍历：轻儿子先入栈，重儿子最后入栈、最先访问，重链因此连续
+        order = []
+        stack = roots[::-1]
+        while stack:
+            u = stack.pop()
+            order.append(u)
+            stack.extend(children[u])
+            h = int(heavy_son[u])
+            if h and int(parent[h]) == u:
+                stack.append(h)
+
+        pos = [0] * (total + 1)
+        for i, u in enumerate(order):
+            pos[u] = i
+
+        # 子树大小按逆先序累加
+        size = [1] * (total + 1)
+        for u in reversed(order):
+            p = int(parent[u])
+            if p != u:
+                size[p] += size[u]
+        subtree_end = [pos[u] + size[u] for u in range(total + 1)]
+
+        inf = float('inf')
+        key = [inf if u <= n else int(val[u]) for u in order]
+        leaf_before = [0] * (len(order) + 1)
+        leaf_order = []
+        for i, u in enumerate(order):
+            if u <= n:
+                leaf_order.append(u)
+            leaf_before[i + 1] = len(leaf_order)
+        if self.engine == "numpy":
+            leaf_order = np.asarray(leaf_order, dtype=np.int64)
+        return order, pos, key, leaf_before, leaf_order, subtree_end
+
+    def highest_reachable(self, x, weight):
+        """
+        x 的祖先中 val >= weight 的最高节点（x 本身总满足条件）
+        Args:
+            x: 城市
+            weight: 货车载重
+        Returns:
+            重构树节点
+        """
+        if self.reach_index is None:
+            self.reach_index = self.build_reach_index()
+        order, pos, key, _, _, _ = self.reach_index
+        top = self.top
+        parent = self.parent
+
+        u = x
+        while True:
+            t = int(top[u])
+            if key[pos[t]] < weight:
+                # 链顶不满足：链上 [t, u] 在 DFS 序中连续且 key 自顶向下不减，二分出满足条件的最高节点
+                return order[bisect_left(key, weight, pos[t], pos[u] + 1)]
+            p = int(parent[t])
+            if p == t or key[pos[p]] < weight:
+                return t
+            u = p
+
+    def reachable_set(self, x, weight):
+        """
+        载重 weight 的货车从 x 出发能到达的全部城市（包括 x）
+        Args:
+            x: 起点城市
+            weight: 货车载重
+        Returns:
+            按 DFS 序排列的城市；python 引擎为列表，numpy 引擎为 int64 数组
+        """
+        a = self.highest_reachable(x, weight)
+        _, pos, _, leaf_before, leaf_order, subtree_end = self.reach_index
+        return leaf_order[leaf_before[pos[a]]:leaf_before[subtree_end[a]]]
+
+    def reachable_count(self, x, weight):
+        """
+        载重 weight 的货车从 x 出发能到达的城市数（包括 x），O(log n)
+        Args:
+            x: 起点城市
+            weight: 货车载重
+        Returns:
+            城市数
+        """
+        a = self.highest_reachable(x, weight)
+        _, pos, _, leaf_before, _, subtree_end = self.reach_index
+        return leaf_before[subtree_end[a]] - leaf_before[pos[a]]
+
+    def can_ship(self, x, y, weight):
+        """
+        载重 weight 的货车能否从 x 到达 y（y 在 x 的可达子树的叶子区间中），O(log n)
+        Args:
+            x, y: 起点和终点城市
+            weight: 货车载重
+        Returns:
+            bool
+        """
+        if x == y:
+            return True
+        a = self.highest_reachable(x, weight)
+        _, pos, _, _, _, subtree_end = self.reach_index
+        return pos[a] <= pos[y] < subtree_end[a]
+
+    def forest_edges(self):
+        """
+        与重构树等价的森林边：每个虚拟节点连接两棵子树，
+        取两棵子树中各一个原始节点作端点，边权为虚拟节点的权值
+        （由父节点数组得到，load_index 得到的求解器同样可用）
+        Returns:
+            (us, vs, ws) 列表
+        """
+        parent = self.parent
+        val = self.val
+        rep = list(range(self.node_count + 1))  # rep[z] = 子树中的一个原始节点
+        first_child = [False] * (self.node_count + 1)
+        us, vs, ws = [], [], []
+        # 子节点的编号总是小于父节点，按编号递增处理时子树的代表已经确定
+        for c in range(1, self.node_count + 1):
+            p = int(parent[c])
+            if p == c:
+                continue
+            if not first_child[p]:
+                first_child[p] = True
+                rep[p] = rep[c]
+            else:
+                us.append(rep[p])
+                vs.append(rep[c])
+                ws.append(val[p])
+        return us, vs, ws
+
+    def all_pairs(self, path=None):
+        """
+        全点对瓶颈矩阵（见 all_pairs.py，需要 NumPy），由森林的合并顺序 O(n^2) 得到
+        Args:
+            path: 可选的 .npy 文件路径，指定时写入内存映射文件
+        Returns:
+            (n, n) 数组：M[x - 1, y - 1] 为最大载重，不连通为 -1，对角线为 dtype 的最大值
+        """
+        return bottleneck_matrix(self.n, *self.forest_edges(), path=path)
+
+    def connected_many(self, xs, ys):
+        """
+        批量判断连通性：比较连通分量编号
+        Args:
+            xs, ys: 起点和终点城市序列（等长）
+        Returns:
+            numpy 引擎返回 bool 数组，python 引擎返回列表
+        """
+        return same_component(self.component_id, xs, ys, self.engine == "numpy")
+
     def solve(self):
         """
         求解问题：构建最大生成树并预处理树链剖分
+        numpy 引擎要求边权为 int64 范围内的整数，否则抛出 ValueError
         """
+        check_integer_weights(self.edges, self.engine)
         self.build_maximum_spanning_tree()
         self.preprocess()
+        self.reach_index = None
 
+    def enable_profiling(self):
+        """
+        开启分阶段计时与计数（见 profiling.py），需在 solve() 之前调用
+        Returns:
+            Profiler
+        """
+        return enable_profiling(self)
 
-def main():
-    """主函数：读取输入，求解并输出结果"""
-    # 读取城市数和道路数
-    n, m = map(int, input().split())
+    def enable_memory_report(self):
+        """
+        开启分阶段计时、计数和内存统计（见 profiling.py），需在 solve() 之前调用
+        Returns:
+            MemoryProfiler
+        """
+        return enable_memory_report(self)
 
-    # 创建求解器
-    solver = TruckTransportSolver2(n, m)
+    def memory_structures(self):
+        """
+        内存报告中统计的常驻结构
+        Returns:
+            {结构名: 对象}
+        """
+        return {
+            "edges": self.edges,
+            "tree.adj": self.tree.adj if self.tree is not None else None,
+            "dsu": self.uf,
+            # load_index 得到的求解器只有查询用到的数组
+            "hld": [getattr(self, name, None) for name in
+                    ("val", "depth", "parent", "heavy_son", "size", "top", "component_id")],
+        }
+
+    def stats(self):
+        """
+        求解统计
+        Returns:
+            {"mst_mode": 实际使用的构建方式, "edges_scanned": Kruskal 检查过的边数, "tree_edges": 森林边数}；
+            开启计时后还有 "phases_ns"（各阶段纳秒）和 "counters"（并查集与查询的计数）
+        """
+        return dict(self.mst_stats, **self.profiler.report())
 
-    # 读取道路信息
-    for _ in range(m):
-        x, y, z = map(int, input().split())
-        solver.add_edge(x, y, z)
+    def index_tables(self):
+        """
+        需要写入索引文件的数组（只保存已使用的 node_count + 1 个节点）
+        Returns:
+            [(name, rows), ...]
+        """
+        end = self.node_count + 1
+        return [
+            ("meta", [[self.n, self.m, self.node_count]]),
+            ("depth", [self.depth[:end]]),
+            ("parent", [self.parent[:end]]),
+            ("top", [self.top[:end]]),
+            ("heavy_son", [self.heavy_son[:end]]),
+            ("val", [self.val[:end]]),
+            ("component_id", [self.component_id[:end]]),
+        ]
+
+    def restore_index(self, index):
+        """
+        从索引文件恢复查询所需的数组（零拷贝视图）
+        Args:
+            index: IndexFile
+        """
+        self.n, self.m, self.node_count = (int(v) for v in index.table("meta")[0])
+        for name in ("depth", "parent", "top", "heavy_son", "val", "component_id"):
+            setattr(self, name, index.table(name, self.engine)[0])
+        self.reach_index = None
 
-    # 构建最大生成树并预处理
-    solver.solve()
+    def save_index(self, path):
+        """
+        将预处理结果保存为索引文件（边权需为整数）
+        Args:
+            path: 文件路径
+        """
+        save_solver_index(self, path)
+
+    @classmethod
+    def load_index(cls, path, engine="python"):
+        """
+        用 mmap 加载索引文件，得到只能查询的求解器
+        Args:
+            path: 文件路径
+            engine: "python"（memoryview）或 "numpy"（数组视图）
+        Returns:
+            求解器实例
+        """
+        return load_solver_index(cls, path, engine)
 
-    # 读取查询数量
-    q = int(input())
 
-    # 处理每个查询
-    for _ in range(q):
-        x, y = map(int, input().split())
-        print(solver.query_max_weight(x, y))
+def main(argv=None):
+    """主函数：读取输入，求解并输出结果（--offline 切换为 Tarjan 离线模式）"""
+    cli.run(TruckTransportSolver2, "货车运输问题 - Method 2（树链剖分）", argv)
 
 
 if __name__ == "__main__":
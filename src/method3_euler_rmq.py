@@ -0,0 +1,295 @@
+"""
+Method 3: Kruskal 重构树 + 欧拉序 + ST 表(Sparse Table) 求解货车运输问题
+
+算法步骤：
+1. 与 Method 2 相同，用 Kruskal 构建重构树（每条树边对应一个带权虚拟节点）
+2. 非递归 DFS 记录重构树的欧拉序，以及每个节点第一次出现的位置
+3. 在欧拉序的深度上建 ST 表，LCA 变为区间最小值查询，每次查询 O(1)
+
+ST 表中存放编码 depth << shift | node，直接比较整数即可取到深度最小的节点。
+预处理 O(n log n) 时间和空间，换取与树形无关的 O(1) 查询延迟。
+"""
+
+import cli
+from common import ForestTraversal, INT_INF, np
+from method2_tree_chain import TruckTransportSolver2
+
+
+class TruckTransportSolver3(TruckTransportSolver2):
+    """使用欧拉序 + ST 表的货车运输求解器（重构树与 Method 2 共用）"""
+
+    INDEX_KIND = "method3"  # 索引文件中的求解器类型
+
+    def __init__(self, n, m, engine="python", mst_mode="auto"):
+        """
+        初始化求解器
+        Args:
+            n: 城市数量（原始节点）
+            m: 道路数量
+            engine: "python"（列表）或 "numpy"（int64 数组，需要整数边权）
+            mst_mode: 构建最大生成森林的方式（见 common.MST_MODES）
+        """
+        super().__init__(n, m, engine, mst_mode)
+        self.first = []  # first[u] = u 在欧拉序中第一次出现的位置
+        self.sparse = []  # sparse[k][i] = 欧拉序 [i, i + 2^k) 中深度最小的节点编码
+        self.node_bits = 0  # 编码中节点编号占用的位数
+
+    def euler_tour(self, roots):
+        """
+        非递归 DFS 生成重构树森林的欧拉序
+        Args:
+            roots: 每棵重构树的根
+        Returns:
+            (tour, depth) 欧拉序节点列表和节点深度；同时记录 first 和连通分量编号
+        """
+        adj = self.tree.adj
+        total = len(adj)
+        depth = [0] * total
+        first = [0] * total
+        component_id = [0] * total
+        tour = []
+
+        for root in roots:
+            component_id[root] = root
+            first[root] = len(tour)
+            tour.append(root)
+            node_stack = [root]
+            parent_stack = [root]
+            next_stack = [0]
+
+            while node_stack:
+                u = node_stack[-1]
+                i = next_stack[-1]
+                if i < len(adj[u]):
+                    next_stack[-1] = i + 1
+                    v = adj[u][i][0]
+                    if v != parent_stack[-1]:
+                        depth[v] = depth[u] + 1
+                        component_id[v] = root
+                        first[v] = len(tour)
+                        tour.append(v)
+                        node_stack.append(v)
+                        parent_stack.append(u)
+                        next_stack.append(0)
+                    continue
+
+                # 回溯到父节点时父节点再次出现在欧拉序中
+                node_stack.pop()
+                parent_stack.pop()
+                next_stack.pop()
+                if node_stack:
+                    tour.append(node_stack[-1])
+
+        self.first = first
+        self.component_id = component_id
+        return tour, depth
+
+    def preprocess(self):
+        """
+        预处理欧拉序和 ST 表
+        """
+        # 并查集中仍指向自己的节点就是各棵重构树的根
+        uf_parent = self.uf.parent
+        with self.profiler.phase("euler_tour"):
+            roots = [i for i in range(1, self.node_count + 1) if uf_parent[i] == i]
+            tour, depth = self.euler_tour(roots)
+        self.depth = depth
+
+        with self.profiler.phase("sparse_table"):
+            self.node_bits = self.node_count.bit_length()
+            self.build_sparse([(depth[u] << self.node_bits) | u for u in tour])
+
+    def build_sparse(self, keys):
+        """
+        在欧拉序的编码上建 ST 表
+        Args:
+            keys: 欧拉序上的 depth << shift | node 编码
+        """
+        length = len(keys)
+        if self.engine == "numpy":
+            self.build_sparse_numpy(keys)
+            return
+
+        # sparse[k][i] = min(sparse[k-1][i], sparse[k-1][i + 2^(k-1)])
+        self.sparse = [keys]
+        half = 1
+        while 2 * half <= length:
+            prev = self.sparse[-1]
+            self.sparse.append([a if a < b else b for a, b in zip(prev, prev[half:])])
+            half *= 2
+
+    def build_sparse_numpy(self, keys):
+        """
+        numpy 引擎：ST 表为 (层数, 欧拉序长度) 的 int64 数组，每层一次 np.minimum
+        Args:
+            keys: 欧拉序上的 depth << shift | node 编码
+        """
+        length = len(keys)
+        levels = max(1, length.bit_length())
+        self.sparse = np.empty((levels, max(1, length)), dtype=np.int64)
+        self.sparse[0, :length] = keys
+        for k in range(1, levels):
+            half = 1 << (k - 1)
+            prev = self.sparse[k - 1]
+            row = self.sparse[k]
+            row[:] = prev
+            np.minimum(prev[:length - half], prev[half:length], out=row[:length - half])
+
+        self.build_log_table(length)
+        self.first = np.asarray(self.first, dtype=np.int64)
+        self.val = np.asarray(self.val, dtype=np.int64)
+        self.component_id = np.asarray(self.component_id, dtype=np.int64)
+
+    def build_log_table(self, length):
+        """
+        numpy 引擎：log_table[len] = floor(log2(len))，frexp 的指数是精确整数
+        Args:
+            length: 欧拉序长度
+        """
+        self.log_table = np.frexp(np.arange(length + 1, dtype=np.float64))[1] - 1
+
+    def get_lca(self, u, v):
+        """
+        区间最小值查询得到 LCA，O(1)
+        Args:
+            u, v: 同一棵重构树中的两个节点
+        Returns:
+            u 和 v 的最近公共祖先
+        """
+        left = self.first[u]
+        right = self.first[v]
+        if left > right:
+            left, right = right, left
+        k = (right - left + 1).bit_length() - 1
+        row = self.sparse[k]
+        a = row[left]
+        b = row[right - (1 << k) + 1]
+        return (a if a < b else b) & ((1 << self.node_bits) - 1)
+
+    def query_steps(self, x, y):
+        """
+        查询 x 到 y 的 ST 表查找次数（开启计时后用于统计）
+        Args:
+            x, y: 起点和终点城市
+        Returns:
+            连通且起点不等于终点时为 1（一次区间最小值查询），否则为 0
+        """
+        return int(self.component_id[x] == self.component_id[y] and x != y)
+
+    def query_many(self, xs, ys):
+        """
+        批量查询：每个查询两次 ST 表查找，全部向量化
+        Args:
+            xs, ys: 起点和终点城市序列（等长）
+        Returns:
+            numpy 引擎返回 int64 数组（不连通为 -1，起点等于终点为 INT_INF，用 to_answer 转换）；
+            python 引擎逐个调用 query_max_weight，返回列表
+        """
+        if self.engine != "numpy":
+            return [self.query_max_weight(x, y) for x, y in zip(xs, ys)]
+
+        xs = np.asarray(xs, dtype=np.int64)
+        ys = np.asarray(ys, dtype=np.int64)
+        connected = self.component_id[xs] == self.component_id[ys]
+        answers = np.where(connected, INT_INF, -1)
+
+        active = np.flatnonzero(connected & (xs != ys))
+        first_x = self.first[xs[active]]
+        first_y = self.first[ys[active]]
+        left = np.minimum(first_x, first_y)
+        right = np.maximum(first_x, first_y)
+        k = self.log_table[right - left + 1]
+        keys = np.minimum(self.sparse[k, left], self.sparse[k, right - (1 << k) + 1])
+        lca = keys & ((1 << self.node_bits) - 1)
+
+        answers[active] = self.val[lca]
+        return answers
+
+    def build_reach_index(self):
+        """
+        阈值可达查询的索引：Method 3 不做树链剖分，首次查询时在重构树上补算父节点、重儿子和链顶
+        Returns:
+            与 Method 2 的 build_reach_index 相同
+        """
+        if self.tree is None:
+            raise ValueError("Method 3 的索引文件不含重构树，无法建立可达查询索引")
+        uf_parent = self.uf.parent
+        roots = [i for i in range(1, self.node_count + 1) if uf_parent[i] == i]
+        traversal = ForestTraversal(self.tree, roots, root_depth=0)
+        self.parent = traversal.parent
+        self.build_heavy_light(traversal)
+        return super().build_reach_index()
+
+    def forest_edges(self):
+        """
+        与重构树等价的森林边（Method 3 不计算父节点数组，由重构树的邻接表得到）
+        Returns:
+            (us, vs, ws) 列表
+        """
+        if self.tree is None:
+            raise ValueError("Method 3 的索引文件不含重构树，无法导出森林边")
+        adj = self.tree.adj
+        rep = list(range(self.node_count + 1))
+        us, vs, ws = [], [], []
+        for z in range(self.n + 1, self.node_count + 1):
+            # 子节点的编号小于虚拟节点，父节点的编号大于虚拟节点
+            a, b = (c for c, _ in adj[z] if c < z)
+            rep[z] = rep[a]
+            us.append(rep[a])
+            vs.append(rep[b])
+            ws.append(self.val[z])
+        return us, vs, ws
+
+    def memory_structures(self):
+        """
+        内存报告中统计的常驻结构（在 Method 2 的基础上加上欧拉序和 ST 表）
+        Returns:
+            {结构名: 对象}
+        """
+        structures = super().memory_structures()
+        structures["euler_rmq"] = [self.first, self.sparse, getattr(self, "log_table", None)]
+        return structures
+
+    def index_tables(self):
+        """
+        需要写入索引文件的数组；python 引擎下 ST 表各层长度不同，补齐为矩形
+        Returns:
+            [(name, rows), ...]
+        """
+        end = self.node_count + 1
+        if self.engine == "numpy":
+            sparse = list(self.sparse)
+        else:
+            width = len(self.sparse[0])
+            sparse = [row + [0] * (width - len(row)) for row in self.sparse]
+        return [
+            ("meta", [[self.n, self.m, self.node_count, self.node_bits]]),
+            ("first", [self.first[:end]]),
+            ("sparse", sparse),
+            ("val", [self.val[:end]]),
+            ("component_id", [self.component_id[:end]]),
+        ]
+
+    def restore_index(self, index):
+        """
+        从索引文件恢复查询所需的数组（零拷贝视图）
+        Args:
+            index: IndexFile
+        """
+        self.n, self.m, self.node_count, self.node_bits = (int(v) for v in index.table("meta")[0])
+        self.first = index.table("first", self.engine)[0]
+        self.sparse = index.table("sparse", self.engine)
+        self.val = index.table("val", self.engine)[0]
+        self.component_id = index.table("component_id", self.engine)[0]
+        self.reach_index = None
+        if self.engine == "numpy":
+            self.build_log_table(self.sparse.shape[1])
+
+
+def main(argv=None):
+    """主函数：读取输入，求解并输出结果（--offline 切换为 Tarjan 离线模式）"""
+    cli.run(TruckTransportSolver3, "货车运输问题 - Method 3（欧拉序 + ST 表）", argv)
+
+
+if __name__ == "__main__":
+    main()
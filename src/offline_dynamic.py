@@ -0,0 +1,217 @@
+"""
+离线全动态模式：道路新增、封闭、限重修改与查询交错出现
+
+算法步骤（线段树分治）：
+1. 按时间顺序记录操作，时间轴以查询为刻度：第 t 个查询发生在时刻 t
+2. 每条道路的每个"版本"（一段不变的限重）在时间轴上对应一个区间 [l, r)，
+   把它挂到覆盖该区间的 O(log q) 个线段树节点上
+3. DFS 线段树：进入节点时插入挂在该节点上的道路，到达叶子时回答查询，
+   离开节点时按相反顺序撤销
+4. 插入道路时维护最大生成森林：
+   - 可撤销并查集（按集合大小合并、不做路径压缩）判断连通性
+   - Link-Cut Tree 维护森林本身，已连通时替换环上的最小边；
+     撤销即执行相反的 cut / link，摊还复杂度不受影响
+
+只用并查集只能回答连通性，瓶颈值需要最大生成森林本身，因此配合 Link-Cut Tree。
+总复杂度 O((m + q) log q log n)。
+
+操作格式（列表顺序即时间顺序）：
+    ("add", u, v, w)          新增道路，按出现顺序编号 0, 1, 2, ...
+    ("remove", edge_id)       封闭道路
+    ("set_weight", edge_id, w) 修改限重
+    ("query", x, y)           查询
+"""
+
+from common import RollbackUnionFind
+from link_cut_tree import LinkCutTree
+
+
+class TruckTransportSolverDynamic:
+    """使用线段树分治 + 可撤销并查集的离线全动态货车运输求解器"""
+
+    def __init__(self, n):
+        """
+        初始化求解器
+        Args:
+            n: 城市数量
+        """
+        self.n = n
+        self.edge_state = []  # edge_state[id] = [u, v, 当前限重, 当前版本开始时刻] 或 None（已封闭）
+        self.versions = []  # [(u, v, w, l, r), ...] 每个版本存在于查询时刻 [l, r)
+        self.queries = []  # [(x, y), ...]
+
+    def add_edge(self, u, v, weight):
+        """
+        新增一条道路
+        Args:
+            u, v: 道路连接的两个城市
+            weight: 道路的限重
+        Returns:
+            道路编号
+        """
+        self.edge_state.append([u, v, weight, len(self.queries)])
+        return len(self.edge_state) - 1
+
+    def _close_version(self, edge_id):
+        """结束道路当前版本，并返回其状态"""
+        state = self.edge_state[edge_id]
+        if state is None:
+            raise ValueError(f"道路 {edge_id} 已被封闭")
+        u, v, weight, start = state
+        if start < len(self.queries):
+            self.versions.append((u, v, weight, start, len(self.queries)))
+        return state
+
+    def remove_edge(self, edge_id):
+        """
+        封闭一条道路
+        Args:
+            edge_id: add_edge 返回的道路编号
+        """
+        self._close_version(edge_id)
+        self.edge_state[edge_id] = None
+
+    def set_weight(self, edge_id, weight):
+        """
+        修改一条道路的限重
+        Args:
+            edge_id: add_edge 返回的道路编号
+            weight: 新的限重
+        """
+        state = self._close_version(edge_id)
+        state[2] = weight
+        state[3] = len(self.queries)
+
+    def query(self, x, y):
+        """
+        记录一个查询
+        Args:
+            x, y: 起点和终点城市
+        Returns:
+            查询编号（solve() 返回的答案列表中的下标）
+        """
+        self.queries.append((x, y))
+        return len(self.queries) - 1
+
+    def apply(self, operations):
+        """
+        按时间顺序记录一串操作（格式见模块说明）
+        Args:
+            operations: 操作元组的可迭代对象
+        """
+        handlers = {
+            "add": self.add_edge,
+            "remove": self.remove_edge,
+            "set_weight": self.set_weight,
+            "query": self.query,
+        }
+        for op, *args in operations:
+            if op not in handlers:
+                raise ValueError(f"未知操作: {op!r}")
+            handlers[op](*args)
+
+    def solve(self):
+        """
+        离线求解所有查询
+        Returns:
+            答案列表（不连通为 -1，起点等于终点为 inf），与查询顺序一致
+        """
+        total = len(self.queries)
+        if total == 0:
+            return []
+
+        # 结束所有仍然存在的道路的版本
+        versions = list(self.versions)
+        for state in self.edge_state:
+            if state is not None and state[3] < total:
+                u, v, weight, start = state
+                versions.append((u, v, weight, start, total))
+
+        # 把每个版本挂到线段树节点上
+        self.segments = [None] * (4 * total)
+        for version in versions:
+            self._attach(1, 0, total, version)
+
+        self.uf = RollbackUnionFind(self.n)
+        self.lct = LinkCutTree(self.n)
+        self.answers = [None] * total
+        self._divide(1, 0, total)
+        return self.answers
+
+    def _attach(self, node, lo, hi, version):
+        """将版本挂到覆盖 [l, r) 的线段树节点上（递归深度 O(log q)）"""
+        l, r = version[3], version[4]
+        if l <= lo and hi <= r:
+            if self.segments[node] is None:
+                self.segments[node] = []
+            self.segments[node].append(version)
+            return
+        mid = (lo + hi) // 2
+        if l < mid:
+            self._attach(2 * node, lo, mid, version)
+        if r > mid:
+            self._attach(2 * node + 1, mid, hi, version)
+
+    def _divide(self, node, lo, hi):
+        """线段树分治：插入本节点的道路，递归子区间，再撤销（递归深度 O(log q)）"""
+        snapshot = self.uf.snapshot()
+        undo = []
+        if self.segments[node] is not None:
+            for u, v, weight, _, _ in self.segments[node]:
+                change = self._insert(u, v, weight)
+                if change is not None:
+                    undo.append(change)
+
+        if hi - lo == 1:
+            self.answers[lo] = self._query(*self.queries[lo])
+        else:
+            mid = (lo + hi) // 2
+            self._divide(2 * node, lo, mid)
+            self._divide(2 * node + 1, mid, hi)
+
+        # 按相反顺序撤销森林的修改，再回滚并查集
+        for new_node, replaced in reversed(undo):
+            self.lct.cut_edge(new_node)
+            if replaced is not None:
+                self.lct.link_edge(*replaced)
+        self.uf.rollback(snapshot)
+
+    def _insert(self, u, v, weight):
+        """
+        向最大生成森林中插入一条道路
+        Returns:
+            (新边节点, 被替换的边 (u, v, w) 或 None)；未改变森林时返回 None
+        """
+        if u == v:
+            return None
+
+        if self.uf.union(u, v):
+            return self.lct.link_edge(u, v, weight), None
+
+        node = self.lct.path_min(u, v)
+        if self.lct.val[node] >= weight:
+            return None
+        replaced = self.lct.cut_edge(node)
+        return self.lct.link_edge(u, v, weight), replaced
+
+    def _query(self, x, y):
+        """在当前森林上回答一个查询"""
+        if not self.uf.connected(x, y):
+            return -1
+        if x == y:
+            return float('inf')
+        return self.lct.val[self.lct.path_min(x, y)]
+
+
+def solve_operations(n, operations):
+    """
+    离线求解一串操作
+    Args:
+        n: 城市数量
+        operations: 操作元组列表（格式见模块说明）
+    Returns:
+        所有查询的答案列表
+    """
+    solver = TruckTransportSolverDynamic(n)
+    solver.apply(operations)
+    return solver.solve()
@@ -0,0 +1,189 @@
+"""
+离线模式：使用 Tarjan 离线 LCA 求解货车运输问题
+
+算法步骤：
+1. 使用 Kruskal 算法构建最大生成树（与 Method 1 相同）
+2. 读入全部查询后，对最大生成树做一次非递归 DFS（Tarjan 离线 LCA）
+3. 节点回溯时并入父节点所在集合，带权并查集在路径压缩的同时
+   维护"节点到集合代表元的路径最小边权"，在 LCA 回溯时即可得到答案
+
+不需要 O(n log n) 的倍增表，全部查询在一次遍历中回答：O(m log m + (n + q) α(n))
+"""
+
+from common import EdgeStore, UnionFind, Graph
+
+
+class TruckTransportSolverOffline:
+    """使用 Tarjan 离线 LCA 的货车运输求解器"""
+
+    def __init__(self, n, m):
+        """
+        初始化求解器
+        Args:
+            n: 城市数量
+            m: 道路数量
+        """
+        self.n = n
+        self.m = m
+        self.edges = EdgeStore()  # 原始边列表（u、v、w 三列）
+        self.tree = Graph(n)  # 最大生成树
+        self.uf = UnionFind(n)  # 并查集（Kruskal 用，同时用于判断连通性）
+
+    def add_edge(self, u, v, weight):
+        """
+        添加一条道路
+        Args:
+            u, v: 道路连接的两个城市
+            weight: 道路的限重
+        """
+        self.edges.append(u, v, weight)
+
+    def add_edges(self, us, vs, weights):
+        """
+        批量添加道路
+        Args:
+            us, vs: 每条道路两个端点的序列
+            weights: 每条道路限重的序列
+        """
+        self.edges.extend(us, vs, weights)
+
+    def build_maximum_spanning_tree(self):
+        """
+        使用 Kruskal 算法构建最大生成树
+        核心思想：按边权从大到小排序，依次加入不构成环的边，森林边数达到 n - 连通分量数时停止
+        """
+        target = self.n - self.edges.component_count(self.n)
+        merged = 0
+        for u, v, weight in self.edges.descending():
+            if self.uf.union(u, v):
+                self.tree.add_edge(u, v, weight)
+                merged += 1
+                if merged == target:
+                    break
+
+    def solve(self):
+        """
+        求解问题：只构建最大生成树，查询在 answer_queries 中离线处理
+        """
+        self.build_maximum_spanning_tree()
+
+    def answer_queries(self, queries):
+        """
+        离线回答一批查询
+        Args:
+            queries: [(x, y), ...] 查询列表
+        Returns:
+            与输入顺序一致的答案列表（不连通为 -1，起点等于终点为 inf）
+        """
+        n = self.n
+        adj = self.tree.adj
+        answers = [None] * len(queries)
+
+        # pending[u] = [(另一个端点, 查询编号), ...]
+        pending = [None] * (n + 1)
+        for idx, (x, y) in enumerate(queries):
+            if not self.uf.connected(x, y):
+                answers[idx] = -1
+            elif x == y:
+                answers[idx] = float('inf')
+            else:
+                for a, b in ((x, y), (y, x)):
+                    if pending[a] is None:
+                        pending[a] = []
+                    pending[a].append((b, idx))
+
+        # 带权并查集：weight[u] = u 到 dsu_parent[u] 的路径最小边权
+        self.dsu_parent = list(range(n + 1))
+        self.dsu_weight = [float('inf')] * (n + 1)
+        at_lca = [None] * (n + 1)  # at_lca[w] = LCA 为 w 的查询编号
+        visited = [False] * (n + 1)
+
+        for root in range(1, n + 1):
+            if visited[root]:
+                continue
+
+            # 显式栈：节点、下一个待访问的邻接表下标、到父节点的边权
+            node_stack = [root]
+            next_stack = [0]
+            weight_stack = [float('inf')]
+            self._enter(root, visited, pending, at_lca)
+
+            while node_stack:
+                u = node_stack[-1]
+                i = next_stack[-1]
+                if i < len(adj[u]):
+                    next_stack[-1] = i + 1
+                    v, weight = adj[u][i]
+                    if not visited[v]:
+                        node_stack.append(v)
+                        next_stack.append(0)
+                        weight_stack.append(weight)
+                        self._enter(v, visited, pending, at_lca)
+                    continue
+
+                # u 的子树处理完毕：回答 LCA 为 u 的查询，再并入父节点
+                node_stack.pop()
+                next_stack.pop()
+                weight = weight_stack.pop()
+                if at_lca[u] is not None:
+                    for idx in at_lca[u]:
+                        x, y = queries[idx]
+                        self._find(x)
+                        self._find(y)
+                        answers[idx] = min(self.dsu_weight[x], self.dsu_weight[y])
+                    at_lca[u] = None
+                if node_stack:
+                    self.dsu_parent[u] = node_stack[-1]
+                    self.dsu_weight[u] = weight
+
+        return answers
+
+    def _enter(self, u, visited, pending, at_lca):
+        """
+        DFS 进入节点 u：另一端已访问的查询，其 LCA 是另一端当前所在集合的代表元
+        """
+        visited[u] = True
+        if pending[u] is None:
+            return
+        for v, idx in pending[u]:
+            if visited[v]:
+                lca = self._find(v)
+                if at_lca[lca] is None:
+                    at_lca[lca] = []
+                at_lca[lca].append(idx)
+        pending[u] = None
+
+    def _find(self, x):
+        """
+        带权并查集的查找（迭代实现），路径压缩时同步更新到代表元的路径最小边权
+        Args:
+            x: 要查找的元素
+        Returns:
+            x 所在集合的代表元素（也是 DFS 栈上的祖先）
+        """
+        parent = self.dsu_parent
+        weight = self.dsu_weight
+        path = []
+        while parent[x] != x:
+            path.append(x)
+            x = parent[x]
+        root = x
+
+        # 从靠近根的一端开始压缩：父节点的权值已经是到根的最小值
+        for node in reversed(path):
+            p = parent[node]
+            if p != root:
+                if weight[p] < weight[node]:
+                    weight[node] = weight[p]
+                parent[node] = root
+        return root
+
+    def query_max_weight(self, x, y):
+        """
+        查询单个点对（每次都要遍历整棵树，批量查询请使用 answer_queries）
+        Args:
+            x, y: 起点和终点城市
+        Returns:
+            最大载重，如果不连通返回 -1
+        """
+        return self.answer_queries([(x, y)])[0]
@@ -0,0 +1,281 @@
+"""
+分阶段计时与计数：定位 solve() 和查询的耗时
+
+solver.enable_profiling() 之后：
+- solve() 的各阶段（sort / kruskal / traversal / lifting 或 heavy_light 等）分别计时
+- 并查集换成 CountingUnionFind，统计 find 调用次数和沿父指针走过的步数
+- 查询被包装：统计查询次数、查询总耗时，以及每个查询的跳跃步数
+  （Method 1 为倍增跳跃次数，斜二进制变体为跳跃指针和父边步数，Method 2 为跳链次数，Method 3 恒为 1）
+solver.stats() 返回 mst_stats 加上 {"phases_ns": {...}, "counters": {...}}。
+
+未开启时求解器使用 NULL_PROFILER：每次 solve() 只多几次空的 with 语句，
+并查集和查询都不被替换，逐条边、逐个查询的路径上没有任何额外开销。
+
+sort 阶段是得到按边权降序的边序列：sort 模式为完整排序，boruvka 模式为 Borůvka 选边；
+filter 模式的划分与过滤和合并交错进行，计入 kruskal 阶段。
+
+solver.enable_memory_report() 在上面的基础上用 tracemalloc 记录每个阶段的内存：
+峰值（阶段内相对阶段开始时的最大增量）和保留量（阶段结束时相对开始时的增量），
+stats()["memory"] 还给出各常驻结构（边表、树邻接表、并查集、倍增表 / 树链剖分数组等）
+的深度大小，以及每个节点、每条边平均占用的字节数。tracemalloc 会拖慢分配，此时的耗时只作参考。
+"""
+
+import sys
+import time
+import tracemalloc
+from array import array
+from contextlib import contextmanager, nullcontext
+
+from common import UnionFind, np
+
+_NULL_CONTEXT = nullcontext()
+
+
+class NullProfiler:
+    """未开启计时时使用的空实现"""
+
+    def phase(self, name):
+        """空的计时区间"""
+        return _NULL_CONTEXT
+
+    def count(self, name, amount=1):
+        """不计数"""
+
+    def report(self):
+        """
+        Returns:
+            空字典
+        """
+        return {}
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class Profiler:
+    """分阶段计时（perf_counter_ns 累加）与计数器"""
+
+    def __init__(self):
+        self.phases = {}  # 阶段名 -> 累计纳秒
+        self.counters = {}  # 计数器名 -> 计数
+
+    @contextmanager
+    def phase(self, name):
+        """
+        计时区间，耗时累加到 phases[name]
+        Args:
+            name: 阶段名
+        """
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0) + time.perf_counter_ns() - start
+
+    def count(self, name, amount=1):
+        """计数器 name 增加 amount"""
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def report(self):
+        """
+        Returns:
+            {"phases_ns": 各阶段耗时, "counters": 计数器（含并查集与查询的计数）}
+        """
+        return {"phases_ns": dict(self.phases), "counters": dict(self.counters)}
+
+
+class MemoryProfiler(Profiler):
+    """在分阶段计时的基础上，用 tracemalloc 记录每个阶段的峰值和保留内存"""
+
+    def __init__(self, solver):
+        """
+        Args:
+            solver: 被统计的求解器（report 时计算其常驻结构的大小）
+        """
+        super().__init__()
+        self.solver = solver
+        self.memory = {}  # 阶段名 -> {"peak_bytes", "retained_bytes"}
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def phase(self, name):
+        """
+        计时区间，同时记录阶段内的内存峰值增量和阶段结束时的保留增量
+        Args:
+            name: 阶段名
+        """
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        try:
+            with super().phase(name):
+                yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            # 同名阶段多次进入时（如每个查询），峰值取最大值，保留量累加
+            entry = self.memory.setdefault(name, {"peak_bytes": 0, "retained_bytes": 0})
+            entry["peak_bytes"] = max(entry["peak_bytes"], peak - before)
+            entry["retained_bytes"] += current - before
+
+    def report(self):
+        """
+        Returns:
+            Profiler.report() 加上 {"memory": {"phases", "structures", "total_bytes",
+            "bytes_per_node", "bytes_per_edge"}}
+        """
+        result = super().report()
+        solver = self.solver
+        structures = structure_sizes(solver.memory_structures(), exclude=(solver, self))
+        total = sum(structures.values())
+        result["memory"] = {
+            # retained_bytes 是净增量，阶段内回收了之前的对象时可能为负
+            "phases": {name: dict(entry) for name, entry in self.memory.items()},
+            "structures": structures,
+            "total_bytes": total,
+            "bytes_per_node": total / solver.n if solver.n else 0.0,
+            "bytes_per_edge": total / solver.m if solver.m else 0.0,
+        }
+        return result
+
+
+def deep_sizeof(obj, seen):
+    """
+    对象及其引用的全部对象占用的字节数（已在 seen 中的对象不重复计算）
+    Args:
+        obj: 要统计的对象
+        seen: 已统计对象的 id 集合
+    Returns:
+        字节数
+    """
+    total = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if obj is None or id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if np is not None and isinstance(obj, np.ndarray):
+            if obj.base is not None:
+                total += obj.nbytes  # 视图本身不持有数据，按数据大小计算
+        elif isinstance(obj, (array, memoryview, str, bytes, int, float)):
+            continue  # getsizeof 已包含缓冲区；memoryview 指向 mmap，不占堆内存
+        elif isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        else:
+            if hasattr(obj, "__dict__"):
+                stack.append(obj.__dict__)
+            for name in getattr(type(obj), "__slots__", ()):
+                stack.append(getattr(obj, name, None))
+    return total
+
+
+def structure_sizes(structures, exclude=()):
+    """
+    各常驻结构的深度大小；多个结构共享的对象只计入先出现的结构
+    Args:
+        structures: {结构名: 对象}
+        exclude: 不计入、也不继续展开的对象（如求解器本身和 CountingUnionFind 引用的 Profiler）
+    Returns:
+        {结构名: 字节数}
+    """
+    seen = {id(obj) for obj in exclude}
+    return {name: deep_sizeof(obj, seen) for name, obj in structures.items()}
+
+
+class CountingUnionFind(UnionFind):
+    """统计 find 调用次数和路径长度的并查集，只在开启计时后替换求解器的并查集"""
+
+    def __init__(self, n, profiler):
+        """
+        Args:
+            n: 元素个数
+            profiler: 计数写入的 Profiler
+        """
+        super().__init__(n)
+        self.profiler = profiler
+
+    def find(self, x):
+        """
+        与 UnionFind.find 相同（路径减半），同时统计走过的父指针数
+        Args:
+            x: 要查找的元素
+        Returns:
+            x 所在集合的代表元素
+        """
+        parent = self.parent
+        steps = 0
+        while True:
+            p = parent[x]
+            if p == x:
+                break
+            steps += 1
+            g = parent[p]
+            if g == p:
+                x = p
+                break
+            steps += 1
+            parent[x] = g
+            x = g
+        counters = self.profiler.counters
+        counters["dsu_finds"] = counters.get("dsu_finds", 0) + 1
+        counters["dsu_find_steps"] = counters.get("dsu_find_steps", 0) + steps
+        return x
+
+
+def enable_profiling(solver, profiler=None):
+    """
+    开启求解器的计时与计数（需在 solve() 之前调用）
+    Args:
+        solver: TruckTransportSolver1 / 1Skew / 2 / 3
+        profiler: 使用的 Profiler，默认新建一个
+    Returns:
+        solver.profiler
+    """
+    if profiler is None:
+        profiler = Profiler()
+    solver.profiler = profiler
+    if solver.uf is not None:  # load_index 得到的只读求解器没有并查集
+        solver.uf = CountingUnionFind(len(solver.uf.parent) - 1, profiler)
+    steps = solver.query_steps
+
+    # numpy 引擎的 query_max_weight 调用 query_many，python 引擎的 query_many 调用 query_max_weight，
+    # 只包装底层的那一个，每个查询恰好计数一次
+    if solver.engine == "numpy":
+        query_many = solver.query_many
+
+        def profiled_query_many(xs, ys):
+            with profiler.phase("query"):
+                answers = query_many(xs, ys)
+            pairs = list(zip(map(int, xs), map(int, ys)))
+            profiler.count("queries", len(pairs))
+            profiler.count("query_steps", sum(steps(x, y) for x, y in pairs))
+            return answers
+
+        solver.query_many = profiled_query_many
+    else:
+        query_max_weight = solver.query_max_weight
+
+        def profiled_query_max_weight(x, y):
+            with profiler.phase("query"):
+                answer = query_max_weight(x, y)
+            profiler.count("queries")
+            profiler.count("query_steps", steps(x, y))
+            return answer
+
+        solver.query_max_weight = profiled_query_max_weight
+    return profiler
+
+
+def enable_memory_report(solver):
+    """
+    开启计时、计数和分阶段内存统计（需在 solve() 之前调用）
+    Args:
+        solver: TruckTransportSolver1 / 1Skew / 2 / 3
+    Returns:
+        solver.profiler（MemoryProfiler）
+    """
+    return enable_profiling(solver, MemoryProfiler(solver))
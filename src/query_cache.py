@@ -0,0 +1,182 @@
+"""
+查询结果缓存：放在求解器前面的有界 LRU 缓存
+
+货车路线往往集中在少数几对仓库之间，同一对城市会被反复查询。
+CachedSolver 以无序点对 (min(x, y), max(x, y)) 为键缓存答案：
+- query_max_weight 先查缓存，未命中再调用求解器
+- query_many 先在批内对重复点对去重，再查缓存，只把未命中的点对交给求解器批量计算
+- solve() 重新构建求解器、add_edge / add_edges 修改道路时清空缓存
+stats() 返回命中、未命中、淘汰次数，用于确定缓存容量。
+
+用法：
+    solver = CachedSolver(TruckTransportSolver2(n, m), capacity=100000)
+    solver.add_edge(1, 2, 4)
+    solver.solve()
+    solver.query_max_weight(1, 2)
+    solver.stats()
+"""
+
+from collections import OrderedDict
+
+from common import INT_INF, to_answer, np
+
+
+class LRUCache:
+    """有界 LRU 缓存（OrderedDict 实现，末尾为最近使用）"""
+
+    def __init__(self, capacity):
+        """
+        Args:
+            capacity: 最多缓存的条目数（正整数）
+        """
+        if capacity <= 0:
+            raise ValueError("缓存容量必须为正整数")
+        self.capacity = capacity
+        self.data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """
+        查询缓存
+        Returns:
+            缓存的值；未命中返回 None
+        """
+        value = self.data.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """写入缓存，超出容量时淘汰最久未使用的条目"""
+        self.data[key] = value
+        self.data.move_to_end(key)
+        if len(self.data) > self.capacity:
+            self.data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """清空缓存（计数器保留）"""
+        self.data.clear()
+
+    def __len__(self):
+        return len(self.data)
+
+
+class CachedSolver:
+    """在求解器前面加一层查询结果缓存，其余属性和方法透传给求解器"""
+
+    def __init__(self, solver, capacity=65536):
+        """
+        Args:
+            solver: TruckTransportSolver1 / 2 / 3（可以是 load_index 得到的只读求解器）
+            capacity: 缓存容量
+        """
+        self.solver = solver
+        self.cache = LRUCache(capacity)
+        self.deduplicated = 0  # 批量查询中因批内重复而省去的计算次数
+
+    def __getattr__(self, name):
+        return getattr(self.solver, name)
+
+    def solve(self):
+        """重新构建求解器，并使缓存失效"""
+        self.solver.solve()
+        self.invalidate()
+
+    def add_edge(self, u, v, weight):
+        """
+        添加一条道路，并使缓存失效
+        Args:
+            u, v: 道路连接的两个城市
+            weight: 道路的限重
+        """
+        self.solver.add_edge(u, v, weight)
+        self.invalidate()
+
+    def add_edges(self, us, vs, weights):
+        """
+        批量添加道路，并使缓存失效
+        Args:
+            us, vs: 每条道路两个端点的序列
+            weights: 每条道路限重的序列
+        """
+        self.solver.add_edges(us, vs, weights)
+        self.invalidate()
+
+    def invalidate(self):
+        """清空缓存（求解器被修改或重建后调用）"""
+        self.cache.clear()
+
+    def query_max_weight(self, x, y):
+        """
+        查询从 x 到 y 的路径上能承载的最大重量（先查缓存）
+        Args:
+            x, y: 起点和终点城市
+        Returns:
+            最大载重，如果不连通返回 -1
+        """
+        key = (x, y) if x <= y else (y, x)
+        answer = self.cache.get(key)
+        if answer is None:
+            answer = self.solver.query_max_weight(x, y)
+            self.cache.put(key, answer)
+        return answer
+
+    def query_many(self, xs, ys):
+        """
+        批量查询：批内去重，再查缓存，未命中的点对一次交给求解器
+        Args:
+            xs, ys: 起点和终点城市序列（等长）
+        Returns:
+            与被包装求解器的 query_many 相同：numpy 引擎返回 int64 数组（起点等于终点为 INT_INF），否则返回列表
+        """
+        keys = [(x, y) if x <= y else (y, x) for x, y in zip(map(int, xs), map(int, ys))]
+        unique = dict.fromkeys(keys)
+        self.deduplicated += len(keys) - len(unique)
+
+        missing = []
+        for key in unique:
+            answer = self.cache.get(key)
+            if answer is None:
+                missing.append(key)
+            else:
+                unique[key] = answer
+
+        if missing:
+            miss_xs = [x for x, _ in missing]
+            miss_ys = [y for _, y in missing]
+            if self.solver.engine == "numpy":
+                computed = map(to_answer, self.solver.query_many(miss_xs, miss_ys).tolist())
+            else:
+                computed = map(self.solver.query_max_weight, miss_xs, miss_ys)
+            for key, answer in zip(missing, computed):
+                unique[key] = answer
+                self.cache.put(key, answer)
+
+        answers = [unique[key] for key in keys]
+        if self.solver.engine == "numpy":
+            return np.array([INT_INF if a == float('inf') else a for a in answers], dtype=np.int64)
+        return answers
+
+    def stats(self):
+        """
+        缓存统计
+        Returns:
+            {"hits", "misses", "evictions", "deduplicated", "size", "capacity", "hit_rate"}
+        """
+        cache = self.cache
+        lookups = cache.hits + cache.misses
+        return {
+            "hits": cache.hits,
+            "misses": cache.misses,
+            "evictions": cache.evictions,
+            "deduplicated": self.deduplicated,
+            "size": len(cache),
+            "capacity": cache.capacity,
+            "hit_rate": cache.hits / lookups if lookups else 0.0,
+        }
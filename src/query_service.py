@@ -0,0 +1,370 @@
+"""
+查询服务：asyncio 服务端 + 客户端 + 压测工具
+
+服务端加载一个预处理索引文件（见 index_file.py），监听 Unix socket 或本机 TCP。
+协议为按行的文本：客户端发送 "x y\\n"，服务端按请求顺序返回答案行（格式与命令行相同）。
+同一个时间窗口内（默认 1ms）到达的请求合并为一次批量查询（micro-batching），
+numpy 引擎下一次 query_many 回答整批请求。
+
+用法：
+    python query_service.py serve   --index roads.idx --method 2 --engine numpy --unix /tmp/truck.sock
+    python query_service.py query   --unix /tmp/truck.sock 1 3
+    python query_service.py loadgen --unix /tmp/truck.sock --clients 64 --requests 2000 --n 10000
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from common import ENGINES, to_answer
+from method1_binary_lifting import TruckTransportSolver1
+from method2_tree_chain import TruckTransportSolver2
+from method3_euler_rmq import TruckTransportSolver3
+from query_cache import CachedSolver
+
+SOLVERS = {
+    "1": TruckTransportSolver1,
+    "2": TruckTransportSolver2,
+    "3": TruckTransportSolver3,
+}
+
+
+class MicroBatcher:
+    """把一个时间窗口内到达的查询合并成一次批量查询"""
+
+    def __init__(self, solver, window=0.001, max_batch=4096):
+        """
+        Args:
+            solver: 已完成预处理（或从索引加载）的求解器
+            window: 合并窗口（秒）
+            max_batch: 单批最大请求数，达到后立即执行
+        """
+        self.solver = solver
+        self.window = window
+        self.max_batch = max_batch
+        self.pending = []  # [(x, y, future), ...]
+        self.timer = None
+        self.batches = 0  # 已执行的批次数
+        self.requests = 0  # 已回答的请求数
+
+    def submit(self, x, y):
+        """
+        提交一个查询
+        Returns:
+            完成时结果为答案的 Future
+        """
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((x, y, future))
+        if len(self.pending) >= self.max_batch:
+            self.flush()
+        elif self.timer is None:
+            self.timer = asyncio.get_running_loop().call_later(self.window, self.flush)
+        return future
+
+    def answer(self, xs, ys):
+        """
+        回答一批查询
+        Args:
+            xs, ys: 起点和终点列表
+        Returns:
+            答案列表
+        """
+        if self.solver.engine == "numpy":
+            return [to_answer(value) for value in self.solver.query_many(xs, ys).tolist()]
+        return [self.solver.query_max_weight(x, y) for x, y in zip(xs, ys)]
+
+    def flush(self):
+        """执行当前批次；查询出错时对应的 Future 得到 "error: ..." 而不是一直挂起"""
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        batch, self.pending = self.pending, []
+        if not batch:
+            return
+
+        xs = [x for x, _, _ in batch]
+        ys = [y for _, y, _ in batch]
+        try:
+            answers = self.answer(xs, ys)
+        except Exception:
+            # 整批失败时逐个重试，只有出错的请求得到错误行，同批其他请求照常回答
+            answers = []
+            for x, y in zip(xs, ys):
+                try:
+                    answers.append(self.answer([x], [y])[0])
+                except Exception as exc:
+                    answers.append(f"error: {exc}")
+
+        self.batches += 1
+        self.requests += len(batch)
+        for (_, _, future), answer in zip(batch, answers):
+            if not future.done():
+                future.set_result(answer)
+
+
+def parse_request(line, n):
+    """
+    解析一行请求
+    Args:
+        line: 客户端发送的一行（bytes）
+        n: 城市数量
+    Returns:
+        (x, y)
+    Raises:
+        ValueError: 格式不是两个整数，或编号不在 1..n 内（错误信息即返回给客户端的内容）
+    """
+    parts = line.split()
+    if len(parts) != 2:
+        raise ValueError("expected 'x y'")
+    try:
+        x, y = int(parts[0]), int(parts[1])
+    except ValueError:
+        raise ValueError("expected two integers") from None
+    if not (1 <= x <= n and 1 <= y <= n):
+        raise ValueError(f"city out of range 1..{n}")
+    return x, y
+
+
+async def handle_connection(batcher, reader, writer):
+    """
+    处理一个客户端连接：读请求与写答案分开，同一连接上的请求可以流水线发送
+    Args:
+        batcher: 共享的 MicroBatcher
+        reader, writer: 连接的 asyncio 流
+    """
+    results = asyncio.Queue()
+
+    async def write_results():
+        """按请求顺序等待答案并写回客户端"""
+        while True:
+            future = await results.get()
+            if future is None:
+                break
+            writer.write(f"{await future}\n".encode())
+            if results.empty():
+                await writer.drain()
+
+    writer_task = asyncio.create_task(write_results())
+    n = batcher.solver.n
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                x, y = parse_request(line, n)
+            except ValueError as exc:
+                future = asyncio.get_running_loop().create_future()
+                future.set_result(f"error: {exc}")
+            else:
+                future = batcher.submit(x, y)
+            results.put_nowait(future)
+    finally:
+        results.put_nowait(None)
+        await writer_task
+        writer.close()
+
+
+async def start_server(solver, unix=None, host="127.0.0.1", port=8765, window=0.001, max_batch=4096):
+    """
+    启动查询服务
+    Args:
+        solver: 求解器
+        unix: Unix socket 路径；为 None 时监听 host:port
+        host, port: TCP 地址
+        window: 合并窗口（秒）
+        max_batch: 单批最大请求数
+    Returns:
+        (asyncio.Server, MicroBatcher)
+    """
+    batcher = MicroBatcher(solver, window, max_batch)
+
+    async def handler(reader, writer):
+        """每个连接交给 handle_connection，共用同一个 batcher"""
+        await handle_connection(batcher, reader, writer)
+
+    if unix is not None:
+        server = await asyncio.start_unix_server(handler, path=unix)
+    else:
+        server = await asyncio.start_server(handler, host, port)
+    return server, batcher
+
+
+class QueryClient:
+    """查询客户端（一个连接上一次只发一个请求；并发请使用多个客户端）"""
+
+    def __init__(self, unix=None, host="127.0.0.1", port=8765):
+        """
+        Args:
+            unix: Unix socket 路径；为 None 时连接 host:port
+            host, port: TCP 地址
+        """
+        self.unix = unix
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def connect(self):
+        """建立连接"""
+        if self.unix is not None:
+            self.reader, self.writer = await asyncio.open_unix_connection(self.unix)
+        else:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def query(self, x, y):
+        """
+        查询一个点对
+        Args:
+            x, y: 起点和终点
+        Returns:
+            答案（int 或 float('inf')）
+        """
+        self.writer.write(f"{x} {y}\n".encode())
+        await self.writer.drain()
+        line = (await self.reader.readline()).decode().strip()
+        return float(line) if line == "inf" else int(line)
+
+    async def close(self):
+        """关闭连接"""
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+async def run_load(clients, requests, n, unix=None, host="127.0.0.1", port=8765, seed=0):
+    """
+    压测：clients 个客户端各自顺序发送 requests 个随机查询
+    Args:
+        clients: 并发客户端数
+        requests: 每个客户端的请求数
+        n: 城市数量（随机查询的范围）
+        unix, host, port: 服务地址
+        seed: 随机种子
+    Returns:
+        {"requests", "seconds", "throughput", "p50_ms", "p99_ms"}
+    """
+    latencies = []
+
+    async def one_client(index):
+        """第 index 个客户端顺序发送请求并记录延迟"""
+        rng = random.Random(seed + index)
+        client = QueryClient(unix, host, port)
+        await client.connect()
+        try:
+            for _ in range(requests):
+                x, y = rng.randint(1, n), rng.randint(1, n)
+                start = time.perf_counter_ns()
+                await client.query(x, y)
+                latencies.append(time.perf_counter_ns() - start)
+        finally:
+            await client.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_client(i) for i in range(clients)))
+    seconds = time.perf_counter() - start
+
+    latencies.sort()
+    total = len(latencies)
+    return {
+        "requests": total,
+        "seconds": seconds,
+        "throughput": total / seconds if seconds > 0 else float("inf"),
+        "p50_ms": latencies[total // 2] / 1e6 if total else 0.0,
+        "p99_ms": latencies[min(total - 1, total * 99 // 100)] / 1e6 if total else 0.0,
+    }
+
+
+def parse_args(argv=None):
+    """
+    解析命令行参数（serve / query / loadgen 三个子命令）
+    Args:
+        argv: 命令行参数，默认为 sys.argv[1:]
+    Returns:
+        argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(description="货车运输问题 - 查询服务")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_address(p):
+        """添加服务地址参数"""
+        p.add_argument("--unix", default=None, help="Unix socket 路径（优先于 TCP）")
+        p.add_argument("--host", default="127.0.0.1")
+        p.add_argument("--port", type=int, default=8765)
+
+    serve = sub.add_parser("serve", help="加载索引文件并启动服务")
+    serve.add_argument("--index", required=True, help="save_index 生成的索引文件")
+    serve.add_argument("--method", choices=sorted(SOLVERS), default="2")
+    serve.add_argument("--engine", choices=ENGINES, default="numpy")
+    serve.add_argument("--window-ms", type=float, default=1.0, help="请求合并窗口（毫秒）")
+    serve.add_argument("--max-batch", type=int, default=4096)
+    serve.add_argument("--cache-size", type=int, default=0, help="查询结果 LRU 缓存容量（0 为不缓存）")
+    add_address(serve)
+
+    query = sub.add_parser("query", help="发送单个查询")
+    query.add_argument("x", type=int)
+    query.add_argument("y", type=int)
+    add_address(query)
+
+    loadgen = sub.add_parser("loadgen", help="压测吞吐量和 p99 延迟")
+    loadgen.add_argument("--clients", type=int, default=32)
+    loadgen.add_argument("--requests", type=int, default=1000, help="每个客户端的请求数")
+    loadgen.add_argument("--n", type=int, required=True, help="城市数量（随机查询的范围）")
+    loadgen.add_argument("--seed", type=int, default=0)
+    add_address(loadgen)
+
+    return parser.parse_args(argv)
+
+
+async def serve_forever(args):
+    """
+    加载索引文件并一直提供服务
+    Args:
+        args: serve 子命令的参数
+    """
+    solver = SOLVERS[args.method].load_index(args.index, engine=args.engine)
+    if args.cache_size > 0:
+        solver = CachedSolver(solver, args.cache_size)
+    server, _ = await start_server(solver, args.unix, args.host, args.port,
+                                   args.window_ms / 1000.0, args.max_batch)
+    where = args.unix if args.unix is not None else f"{args.host}:{args.port}"
+    print(f"serving {args.index} on {where}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+async def query_once(args):
+    """
+    发送单个查询并打印答案
+    Args:
+        args: query 子命令的参数
+    """
+    client = QueryClient(args.unix, args.host, args.port)
+    await client.connect()
+    try:
+        print(await client.query(args.x, args.y))
+    finally:
+        await client.close()
+
+
+def main(argv=None):
+    """
+    命令行入口
+    Args:
+        argv: 命令行参数，默认为 sys.argv[1:]
+    """
+    args = parse_args(argv)
+    if args.command == "serve":
+        asyncio.run(serve_forever(args))
+    elif args.command == "query":
+        asyncio.run(query_once(args))
+    else:
+        stats = asyncio.run(run_load(args.clients, args.requests, args.n,
+                                     args.unix, args.host, args.port, args.seed))
+        print(f"requests: {stats['requests']}, time: {stats['seconds']:.3f}s, "
+              f"throughput: {stats['throughput']:.0f} req/s, "
+              f"p50: {stats['p50_ms']:.3f}ms, p99: {stats['p99_ms']:.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,7 +12,13 @@ import sys
 import time
 from io import StringIO
 from method1_binary_lifting import TruckTransportSolver1
+from method1_skew_binary import TruckTransportSolver1Skew
 from method2_tree_chain import TruckTransportSolver2
+from method3_euler_rmq import TruckTransportSolver3
+from incremental_lct import TruckTransportSolverIncremental
+from offline_dynamic import solve_operations
+from offline_tarjan import TruckTransportSolverOffline
+from common import EdgeStore, UnionFind, RollbackUnionFind, to_answer, np
 
 
 class TestCase:
@@ -59,6 +65,40 @@ def run_test_case(solver_class, test_case):
     return results, time_used
 
 
+def make_random_case(rng, n, m, q, name, max_weight=100):
+    """
+    生成随机测试用例（期望结果为空，由各方法互相对比）
+    Args:
+        rng: random.Random 实例
+        n, m, q: 节点数、边数、查询数
+        name: 用例名称
+        max_weight: 边权上限
+    """
+    edges = []
+    for _ in range(m):
+        u = rng.randint(1, n)
+        v = rng.randint(1, n)
+        edges.append((u, v, rng.randint(1, max_weight)))
+    queries = [(rng.randint(1, n), rng.randint(1, n)) for _ in range(q)]
+    return TestCase(name=name, n=n, m=m, edges=edges, queries=queries, expected=None)
+
+
+def solve_case(solver, test_case):
+    """向求解器添加用例中的边并完成预处理，返回求解器"""
+    for u, v, w in test_case.edges:
+        solver.add_edge(u, v, w)
+    solver.solve()
+    return solver
+
+
+def batch_answers(solver, xs, ys):
+    """query_many 的结果转换为与 query_max_weight 相同的 Python 值列表"""
+    answers = solver.query_many(xs, ys)
+    if isinstance(answers, list):
+        return answers
+    return [to_answer(value) for value in answers.tolist()]
+
+
 def test_basic_cases():
     """基础功能测试"""
     print("=" * 60)
@@ -267,6 +307,1262 @@ def test_consistency():
     return True
 
 
+def test_deep_chain():
+    """长链测试：最大生成树是一条长链，验证非递归预处理不受递归深度限制"""
+    print("\n" + "=" * 60)
+    print("长链测试（远超默认递归深度）")
+    print("=" * 60)
+
+    n = 20000
+    # 链上第 i 条边的权值为 (i * 7919) % 1000 + 1，另加少量更轻的横跨边
+    edges = [(i, i + 1, (i * 7919) % 1000 + 1) for i in range(1, n)]
+    edges += [(1, n, 0), (2, n - 1, 0)]
+    queries = [(1, n), (n, 1), (1, 2), (n // 2, n), (3, 3)]
+
+    # 期望结果：链上区间最小值
+    weights = [0, 0] + [(i * 7919) % 1000 + 1 for i in range(1, n)]
+    def chain_min(x, y):
+        if x == y:
+            return float('inf')
+        lo, hi = min(x, y), max(x, y)
+        return min(weights[lo + 1:hi + 1])
+    expected = [chain_min(x, y) for x, y in queries]
+
+    test_case = TestCase(
+        name="长链",
+        n=n, m=len(edges),
+        edges=edges,
+        queries=queries,
+        expected=expected
+    )
+
+    print(f"\n  图: n={n}, m={len(edges)}")
+    results1, time1 = run_test_case(TruckTransportSolver1, test_case)
+    print(f"  Method 1: {results1} (耗时: {time1*1000:.2f}ms)")
+    results2, time2 = run_test_case(TruckTransportSolver2, test_case)
+    print(f"  Method 2: {results2} (耗时: {time2*1000:.2f}ms)")
+    results3, time3 = run_test_case(TruckTransportSolver1Skew, test_case)
+    print(f"  Method 1（跳跃指针）: {results3} (耗时: {time3*1000:.2f}ms)")
+
+    if results1 != expected or results2 != expected or results3 != expected:
+        print(f"  ⚠️  结果与期望不符! 期望: {expected}")
+        return False
+
+    print("\n✓ 长链测试通过!")
+    return True
+
+
+def test_numpy_engine():
+    """numpy 引擎测试：两种方法的 numpy 数组实现与批量查询 query_many"""
+    print("\n" + "=" * 60)
+    print("numpy 引擎测试")
+    print("=" * 60)
+
+    if np is None:
+        print("  未安装 NumPy，跳过")
+        return True
+
+    import random
+    rng = random.Random(7)
+
+    for i in range(5):
+        n = rng.randint(2, 300)
+        test_case = make_random_case(rng, n, rng.randint(0, 2 * n), 200, f"numpy {i+1}")
+        # 加入起点等于终点的查询
+        test_case.queries.append((1, 1))
+
+        expected, _ = run_test_case(TruckTransportSolver1, test_case)
+        xs = [x for x, _ in test_case.queries]
+        ys = [y for _, y in test_case.queries]
+
+        for solver_class in (TruckTransportSolver1, TruckTransportSolver2):
+            solver = solve_case(solver_class(test_case.n, test_case.m, engine="numpy"), test_case)
+            batch = batch_answers(solver, xs, ys)
+            single = [solver.query_max_weight(x, y) for x, y in test_case.queries]
+
+            ok = batch == expected and single == expected
+            print(f"  {test_case.name} {solver_class.__name__}: n={n}, m={test_case.m} - {'✓ 一致' if ok else '✗ 不一致'}")
+            if not ok:
+                print("  ⚠️  测试失败!")
+                return False
+
+    # 非整数边权不能截断为 int64；超过 2^53 的整数边权不能经过 float64
+    big = (1 << 60) + 1
+    for solver_class in (TruckTransportSolver1, TruckTransportSolver1Skew,
+                         TruckTransportSolver2, TruckTransportSolver3):
+        solver = solver_class(2, 1, engine="numpy")
+        solver.add_edge(1, 2, 2.5)
+        try:
+            solver.solve()
+            rejected = False
+        except ValueError:
+            rejected = True
+        solver = solve_case(solver_class(3, 2, engine="numpy"),
+                            TestCase("大边权", 3, 2, [(1, 2, big), (2, 3, big + 2)], [], None))
+        ok = (rejected and solver.query_max_weight(1, 3) == big
+              and batch_answers(solver, [1, 1, 1], [3, 1, 2]) == [big, float('inf'), big])
+        print(f"  {solver_class.__name__} 非整数边权与大整数边权: {'✓ 正确' if ok else '✗ 错误'}")
+        if not ok:
+            print("  ⚠️  测试失败!")
+            return False
+
+    print("\n✓ numpy 引擎测试通过!")
+    return True
+
+
+def test_offline_tarjan():
+    """离线模式测试：Tarjan 离线 LCA 与 Method 1 结果一致"""
+    print("\n" + "=" * 60)
+    print("离线 Tarjan 测试")
+    print("=" * 60)
+
+    import random
+    rng = random.Random(2024)
+
+    for i in range(5):
+        n = rng.randint(2, 200)
+        test_case = make_random_case(rng, n, rng.randint(0, 3 * n), 300, f"离线 {i+1}")
+        test_case.queries.append((n, n))
+
+        expected, _ = run_test_case(TruckTransportSolver1, test_case)
+        solver = solve_case(TruckTransportSolverOffline(test_case.n, test_case.m), test_case)
+        results = solver.answer_queries(test_case.queries)
+
+        ok = results == expected
+        print(f"  {test_case.name}: n={n}, m={test_case.m} - {'✓ 一致' if ok else '✗ 不一致'}")
+        if not ok:
+            print("  ⚠️  测试失败!")
+            return False
+
+    print("\n✓ 离线 Tarjan 测试通过!")
+    return True
+
+
+def test_euler_rmq():
+    """Method 3 测试：欧拉序 + ST 表的 O(1) 查询与 Method 1 结果一致"""
+    print("\n" + "=" * 60)
+    print("Method 3（欧拉序 + ST 表）测试")
+    print("=" * 60)
+
+    import random
+    rng = random.Random(99)
+    engines = ["python", "numpy"] if np is not None else ["python"]
+
+    for i in range(5):
+        n = rng.randint(1, 200)
+        test_case = make_random_case(rng, n, rng.randint(0, 3 * n), 300, f"ST 表 {i+1}")
+        test_case.queries.append((1, 1))
+        expected, _ = run_test_case(TruckTransportSolver1, test_case)
+
+        for engine in engines:
+            solver = solve_case(TruckTransportSolver3(test_case.n, test_case.m, engine=engine), test_case)
+            single = [solver.query_max_weight(x, y) for x, y in test_case.queries]
+            batch = batch_answers(solver, [x for x, _ in test_case.queries], [y for _, y in test_case.queries])
+            ok = single == expected and batch == expected
+            print(f"  {test_case.name} ({engine}): n={n}, m={test_case.m} - {'✓ 一致' if ok else '✗ 不一致'}")
+            if not ok:
+                print("  ⚠️  测试失败!")
+                return False
+
+    print("\n✓ Method 3 测试通过!")
+    return True
+
+
+def test_fast_io():
+    """命令行测试：--fast-io / --input / --workers 与逐行读写的输出完全相同"""
+    print("\n" + "=" * 60)
+    print("命令行批量输入输出测试")
+    print("=" * 60)
+
+    import os
+    import random
+    import subprocess
+    import tempfile
+
+    rng = random.Random(11)
+    test_case = make_random_case(rng, 60, 80, 100, "命令行")
+    test_case.queries.append((3, 3))
+    lines = [f"{test_case.n} {test_case.m}"]
+    lines += [f"{u} {v} {w}" for u, v, w in test_case.edges]
+    lines.append(str(len(test_case.queries)))
+    lines += [f"{x} {y}" for x, y in test_case.queries]
+    text = "\n".join(lines) + "\n"
+
+    src_dir = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+        f.write(text)
+        input_path = f.name
+
+    try:
+        # 映射文件按很小的窗口切分，窗口边界上的数不会被切成两半
+        import cli
+        expected_ints = [int(token) for token in text.split()]
+        for window in (1, 5, 64, 1 << 20):
+            if list(cli.read_ints(input_path, window=window)) != expected_ints:
+                print(f"  ⚠️  read_ints(window={window}) 读入错误!")
+                return False
+        print("  read_ints 按窗口切分: ✓ 一致")
+
+        for script in ("method1_binary_lifting.py", "method2_tree_chain.py"):
+            outputs = []
+            for flags in ([], ["--fast-io"], ["--input", input_path], ["--offline", "--fast-io"],
+                          ["--workers", "3"]):
+                completed = subprocess.run(
+                    [sys.executable, script] + flags, input=text, cwd=src_dir,
+                    capture_output=True, text=True, check=True
+                )
+                outputs.append(completed.stdout)
+
+            ok = all(out == outputs[0] for out in outputs) and outputs[0].count("\n") == len(test_case.queries)
+
+            # 离线求解器没有引擎和构建方式选项，组合使用时报错而不是静默忽略
+            for flags in (["--offline", "--engine", "numpy"], ["--offline", "--mst-mode", "filter"]):
+                completed = subprocess.run(
+                    [sys.executable, script] + flags, input=text, cwd=src_dir,
+                    capture_output=True, text=True
+                )
+                ok = ok and completed.returncode == 2 and "--offline" in completed.stderr
+            print(f"  {script}: {'✓ 一致' if ok else '✗ 不一致'}")
+            if not ok:
+                print("  ⚠️  测试失败!")
+                return False
+    finally:
+        os.remove(input_path)
+
+    print("\n✓ 命令行批量输入输出测试通过!")
+    return True
+
+
+def test_incremental():
+    """增量模式测试：solve() 之后逐条加边，结果与重新构建的 Method 1 一致"""
+    print("\n" + "=" * 60)
+    print("增量加边（Link-Cut Tree）测试")
+    print("=" * 60)
+
+    import random
+    rng = random.Random(31)
+
+    for i in range(3):
+        n = rng.randint(2, 80)
+        test_case = make_random_case(rng, n, 3 * n, 100, f"增量 {i+1}")
+        initial = len(test_case.edges) // 3
+        solver = TruckTransportSolverIncremental(n, initial)
+        for u, v, w in test_case.edges[:initial]:
+            solver.add_edge(u, v, w)
+        solver.solve()
+
+        for count in range(initial + 1, len(test_case.edges) + 1):
+            solver.add_edge(*test_case.edges[count - 1])
+            if count % 10 != 0 and count != len(test_case.edges):
+                continue
+            prefix = TestCase(test_case.name, n, count, test_case.edges[:count], test_case.queries, None)
+            expected, _ = run_test_case(TruckTransportSolver1, prefix)
+            results = [solver.query_max_weight(x, y) for x, y in test_case.queries]
+            if results != expected:
+                print(f"  {test_case.name}: 第 {count} 条边后结果不一致")
+                print("  ⚠️  测试失败!")
+                return False
+
+        print(f"  {test_case.name}: n={n}, 初始 {initial} 条边, 增量 {len(test_case.edges) - initial} 条边 - ✓ 一致")
+
+    print("\n✓ 增量加边测试通过!")
+    return True
+
+
+def test_offline_dynamic():
+    """离线全动态测试：加边、封路、改限重与查询交错，结果与逐次重建的 Method 1 一致"""
+    print("\n" + "=" * 60)
+    print("离线全动态（线段树分治）测试")
+    print("=" * 60)
+
+    import random
+    rng = random.Random(8)
+
+    for i in range(3):
+        n = rng.randint(2, 40)
+        operations = []
+        alive = {}  # 道路编号 -> [u, v, w]
+        next_id = 0
+        expected = []
+
+        for _ in range(300):
+            kind = rng.random()
+            if kind < 0.35 or not alive:
+                u, v, w = rng.randint(1, n), rng.randint(1, n), rng.randint(1, 50)
+                operations.append(("add", u, v, w))
+                alive[next_id] = [u, v, w]
+                next_id += 1
+            elif kind < 0.5:
+                edge_id = rng.choice(list(alive))
+                operations.append(("remove", edge_id))
+                del alive[edge_id]
+            elif kind < 0.65:
+                edge_id = rng.choice(list(alive))
+                w = rng.randint(1, 50)
+                operations.append(("set_weight", edge_id, w))
+                alive[edge_id][2] = w
+            else:
+                x, y = rng.randint(1, n), rng.randint(1, n)
+                operations.append(("query", x, y))
+                edges = [tuple(edge) for edge in alive.values()]
+                snapshot = TestCase("快照", n, len(edges), edges, [(x, y)], None)
+                expected.extend(run_test_case(TruckTransportSolver1, snapshot)[0])
+
+        results = solve_operations(n, operations)
+        ok = results == expected
+        print(f"  动态 {i+1}: n={n}, 操作 {len(operations)} 个, 查询 {len(expected)} 个 - {'✓ 一致' if ok else '✗ 不一致'}")
+        if not ok:
+            print("  ⚠️  测试失败!")
+            return False
+
+    print("\n✓ 离线全动态测试通过!")
+    return True
+
+
+def test_index_file():
+    """索引文件测试：save_index 后用 mmap 加载，查询结果与原求解器一致"""
+    print("\n" + "=" * 60)
+    print("预处理索引文件测试")
+    print("=" * 60)
+
+    import os
+    import random
+    import tempfile
+
+    rng = random.Random(5)
+    test_case = make_random_case(rng, 150, 200, 300, "索引文件")
+    test_case.queries.append((2, 2))
+    expected, _ = run_test_case(TruckTransportSolver1, test_case)
+    xs = [x for x, _ in test_case.queries]
+    ys = [y for _, y in test_case.queries]
+    engines = ["python", "numpy"] if np is not None else ["python"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for solver_class in (TruckTransportSolver1, TruckTransportSolver1Skew,
+                             TruckTransportSolver2, TruckTransportSolver3):
+            for build_engine in engines:
+                path = os.path.join(tmp, f"{solver_class.__name__}_{build_engine}.idx")
+                solver = solve_case(solver_class(test_case.n, test_case.m, engine=build_engine), test_case)
+                solver.save_index(path)
+
+                for load_engine in engines:
+                    loaded = solver_class.load_index(path, engine=load_engine)
+                    single = [loaded.query_max_weight(x, y) for x, y in test_case.queries]
+                    batch = batch_answers(loaded, xs, ys)
+                    ok = single == expected and batch == expected
+                    print(f"  {solver_class.__name__} {build_engine} -> {load_engine}: {'✓ 一致' if ok else '✗ 不一致'}")
+                    if not ok:
+                        print("  ⚠️  测试失败!")
+                        return False
+
+        # 索引类型不匹配时应当报错
+        try:
+            TruckTransportSolver1.load_index(path)
+        except ValueError:
+            pass
+        else:
+            print("  ⚠️  索引类型不匹配时应当报错!")
+            return False
+
+    print("\n✓ 预处理索引文件测试通过!")
+    return True
+
+
+def test_query_service():
+    """查询服务测试：多个客户端并发查询，答案与求解器一致，且请求被合并成批"""
+    print("\n" + "=" * 60)
+    print("查询服务测试")
+    print("=" * 60)
+
+    import asyncio
+    import os
+    import random
+    import tempfile
+    from query_service import QueryClient, start_server
+
+    rng = random.Random(6)
+    test_case = make_random_case(rng, 120, 160, 200, "查询服务")
+    test_case.queries.append((3, 3))
+    expected, _ = run_test_case(TruckTransportSolver2, test_case)
+    engine = "numpy" if np is not None else "python"
+
+    async def scenario(path):
+        solver = solve_case(TruckTransportSolver2(test_case.n, test_case.m, engine=engine), test_case)
+        server, batcher = await start_server(solver, unix=path, window=0.005)
+
+        async def client_queries(pairs):
+            client = QueryClient(unix=path)
+            await client.connect()
+            try:
+                return [await client.query(x, y) for x, y in pairs]
+            finally:
+                await client.close()
+
+        clients = 8
+        chunks = [test_case.queries[i::clients] for i in range(clients)]
+        async with server:
+            results = await asyncio.gather(*(client_queries(chunk) for chunk in chunks))
+
+        answers = [None] * len(test_case.queries)
+        for i, chunk_results in enumerate(results):
+            answers[i::clients] = chunk_results
+        return answers, batcher
+
+    with tempfile.TemporaryDirectory() as tmp:
+        answers, batcher = asyncio.run(scenario(os.path.join(tmp, "truck.sock")))
+
+    ok = answers == expected
+    print(f"  {batcher.requests} 个请求合并为 {batcher.batches} 批: {'✓ 一致' if ok else '✗ 不一致'}")
+    if not ok or batcher.batches >= batcher.requests:
+        print("  ⚠️  测试失败!")
+        return False
+
+    async def bad_requests(path):
+        solver = solve_case(TruckTransportSolver2(test_case.n, test_case.m, engine=engine), test_case)
+        server, batcher = await start_server(solver, unix=path, window=0.005)
+        async with server:
+            # 非法请求得到错误行，连接不断开，之后的合法请求照常回答
+            reader, writer = await asyncio.open_unix_connection(path)
+            writer.write(b"1 99999\na b\n1 -1\n1 2 3\n1 2\n")
+            await writer.drain()
+            lines = [(await asyncio.wait_for(reader.readline(), 5)).decode().strip() for _ in range(5)]
+            writer.close()
+            await writer.wait_closed()
+
+            # 绕过校验直接提交：出错的请求不会让同批的其他请求一直挂起
+            futures = [batcher.submit(1, 99999), batcher.submit(1, 2)]
+            batched = await asyncio.wait_for(asyncio.gather(*futures), 5)
+        return lines, batched
+
+    with tempfile.TemporaryDirectory() as tmp:
+        lines, batched = asyncio.run(bad_requests(os.path.join(tmp, "truck.sock")))
+    reference = solve_case(TruckTransportSolver2(test_case.n, test_case.m), test_case).query_max_weight(1, 2)
+    ok = (all(line.startswith("error: ") for line in lines[:4]) and lines[4] == str(reference)
+          and str(batched[0]).startswith("error: ") and batched[1] == reference)
+    print(f"  非法请求与出错的批次: {'✓ 一致' if ok else '✗ 不一致'}")
+    if not ok:
+        print(f"  {lines} {batched}")
+        print("  ⚠️  测试失败!")
+        return False
+
+    print("\n✓ 查询服务测试通过!")
+    return True
+
+
+def test_query_cache():
+    """查询缓存测试：偏斜的查询分布下答案不变，计数器与淘汰行为正确"""
+    print("\n" + "=" * 60)
+    print("查询缓存测试")
+    print("=" * 60)
+
+    import random
+    from query_cache import CachedSolver
+
+    rng = random.Random(12)
+    test_case = make_random_case(rng, 100, 150, 0, "查询缓存")
+    hot = [(rng.randint(1, 100), rng.randint(1, 100)) for _ in range(5)]
+    for _ in range(400):
+        if rng.random() < 0.8:
+            x, y = rng.choice(hot)
+            test_case.queries.append((y, x) if rng.random() < 0.5 else (x, y))
+        else:
+            test_case.queries.append((rng.randint(1, 100), rng.randint(1, 100)))
+    expected, _ = run_test_case(TruckTransportSolver1, test_case)
+    xs = [x for x, _ in test_case.queries]
+    ys = [y for _, y in test_case.queries]
+    engines = ["python", "numpy"] if np is not None else ["python"]
+
+    for solver_class in (TruckTransportSolver1, TruckTransportSolver2):
+        for engine in engines:
+            cached = CachedSolver(solver_class(test_case.n, test_case.m, engine=engine), capacity=32)
+            cached.cache.put((1, 2), 12345)  # 过期条目：solve() 后应被清空
+            solve_case(cached, test_case)
+            if len(cached.cache) != 0:
+                print("  ⚠️  solve() 后缓存未清空!")
+                return False
+
+            single = [cached.query_max_weight(x, y) for x, y in test_case.queries]
+            batch = batch_answers(cached, xs, ys)
+            stats = cached.stats()
+            ok = (single == expected and batch == expected and stats["hits"] > stats["misses"]
+                  and stats["deduplicated"] > 0 and stats["evictions"] > 0 and stats["size"] <= 32)
+            # numpy 引擎的批量结果与求解器相同，为 int64
+            ok = ok and (engine == "python" or cached.query_many(xs, ys).dtype == np.int64)
+
+            # 加边之后旧答案可能失效，缓存必须清空
+            sizes = []
+            for add in (lambda: cached.add_edge(1, 2, 1000), lambda: cached.add_edges([2], [3], [1000])):
+                cached.query_max_weight(1, 2)
+                add()
+                sizes.append(len(cached.cache))
+            ok = ok and sizes == [0, 0] and len(cached.edges) == test_case.m + 2
+            print(f"  {solver_class.__name__} {engine}: 命中率 {stats['hit_rate']:.2f}, "
+                  f"淘汰 {stats['evictions']}, 批内去重 {stats['deduplicated']}: {'✓ 一致' if ok else '✗ 不一致'}")
+            if not ok:
+                print("  ⚠️  测试失败!")
+                return False
+
+    print("\n✓ 查询缓存测试通过!")
+    return True
+
+
+def test_edge_store():
+    """边存储测试：from_edges 批量建图与逐条 add_edge 结果一致"""
+    print("\n" + "=" * 60)
+    print("边存储与 from_edges 测试")
+    print("=" * 60)
+
+    import random
+    from array import array
+
+    rng = random.Random(13)
+    test_case = make_random_case(rng, 200, 400, 300, "边存储", max_weight=20)
+    expected, _ = run_test_case(TruckTransportSolver1, test_case)
+    us = [u for u, _, _ in test_case.edges]
+    vs = [v for _, v, _ in test_case.edges]
+    ws = [w for _, _, w in test_case.edges]
+    columns = {"list": (us, vs, ws), "array": (array('q', us), array('q', vs), array('q', ws))}
+    if np is not None:
+        columns["numpy"] = (np.array(us), np.array(vs), np.array(ws))
+
+    for solver_class in (TruckTransportSolver1, TruckTransportSolver2, TruckTransportSolver3):
+        for kind, (cu, cv, cw) in columns.items():
+            solver = solver_class.from_edges(test_case.n, cu, cv, cw)
+            solver.solve()
+            results = [solver.query_max_weight(x, y) for x, y in test_case.queries]
+            ok = results == expected and len(solver.edges) == test_case.m
+            print(f"  {solver_class.__name__} from_edges({kind}): {'✓ 一致' if ok else '✗ 不一致'}")
+            if not ok:
+                print("  ⚠️  测试失败!")
+                return False
+
+    # 非整数边权退化为列表存储，仍可求解
+    solver = TruckTransportSolver2(3, 2)
+    solver.add_edge(1, 2, 2.5)
+    solver.add_edge(2, 3, 4)
+    solver.solve()
+    if solver.query_max_weight(1, 3) != 2.5:
+        print("  ⚠️  非整数边权求解错误!")
+        return False
+
+    # 整数与非整数混合的一批边权：三列保持对齐，不重复追加
+    weight_batches = {"混合 list": [5, 2.5, 7]}
+    if np is not None:
+        weight_batches["浮点 numpy"] = np.array([5.9, 2.5, 1.25])  # 不能被截断为整数
+    for kind, weights in weight_batches.items():
+        for solver_class in (TruckTransportSolver1, TruckTransportSolver2, TruckTransportSolver3):
+            solver = solver_class.from_edges(3, [1, 2, 3], [2, 3, 1], weights)
+            solver.solve()
+            a, b, c = (float(w) for w in weights)  # 三角形 1-2、2-3、3-1
+            ok = (list(solver.edges.ws) == [a, b, c] and len(solver.edges.us) == 3
+                  and solver.query_max_weight(1, 2) == max(a, min(b, c))
+                  and solver.query_max_weight(1, 3) == max(c, min(a, b)))
+            print(f"  {solver_class.__name__} 边权（{kind}）: {'✓ 一致' if ok else '✗ 不一致'}")
+            if not ok:
+                print("  ⚠️  测试失败!")
+                return False
+
+    # 端点超出 int32 的边（或一批边）被拒绝，不留下只追加了一部分的列
+    store = EdgeStore()
+    for u, v in ((10 ** 12, 5), (1, 10 ** 12)):
+        try:
+            store.append(u, v, 9)
+        except OverflowError:
+            pass
+    try:
+        store.extend([1, 2], [3, 10 ** 12], [4, 5])
+    except OverflowError:
+        pass
+    store.append(1, 2, 3)
+    ok = (len(store.us), len(store.vs), len(store.ws)) == (1, 1, 1) and list(store.descending()) == [(1, 2, 3)]
+    print(f"  端点溢出后三列对齐: {'✓ 正确' if ok else '✗ 错误'}")
+    if not ok:
+        print("  ⚠️  测试失败!")
+        return False
+
+    print("\n✓ 边存储与 from_edges 测试通过!")
+    return True
+
+
+def test_union_find():
+    """并查集测试：与朴素的标号合并对比，验证 freeze / connected_many / rollback"""
+    print("\n" + "=" * 60)
+    print("并查集测试")
+    print("=" * 60)
+
+    import random
+
+    rng = random.Random(14)
+    n = 300
+    uf = UnionFind(n)
+    rollback_uf = RollbackUnionFind(n)
+    label = list(range(n + 1))  # 朴素实现：合并时整体改写标号
+    snapshot = None
+    for step in range(250):
+        x, y = rng.randint(1, n), rng.randint(1, n)
+        if step == 150:
+            snapshot = rollback_uf.snapshot()
+            label_at_snapshot = list(label)
+        merged = label[x] != label[y]
+        if merged:
+            old = label[y]
+            label = [label[x] if lab == old else lab for lab in label]
+        if uf.union(x, y) != merged or rollback_uf.union(x, y) != merged:
+            print("  ⚠️  union 返回值错误!")
+            return False
+
+    xs = [rng.randint(1, n) for _ in range(500)]
+    ys = [rng.randint(1, n) for _ in range(500)]
+    expected = [label[x] == label[y] for x, y in zip(xs, ys)]
+    before = [uf.connected(x, y) for x, y in zip(xs, ys)]
+    uf.freeze()
+    after = [uf.connected(x, y) for x, y in zip(xs, ys)]
+    batch = [bool(v) for v in uf.connected_many(xs, ys)]
+    ok = before == expected and after == expected and batch == expected
+    print(f"  freeze 前后与 connected_many: {'✓ 一致' if ok else '✗ 不一致'}")
+    if not ok:
+        return False
+
+    rollback_uf.rollback(snapshot)
+    expected = [label_at_snapshot[x] == label_at_snapshot[y] for x, y in zip(xs, ys)]
+    ok = [rollback_uf.connected(x, y) for x, y in zip(xs, ys)] == expected
+    print(f"  rollback: {'✓ 一致' if ok else '✗ 不一致'}")
+    if not ok:
+        return False
+
+    # 求解器的批量连通性判断
+    test_case = make_random_case(rng, 120, 90, 200, "连通性")
+    expected = [answer != -1 for answer in run_test_case(TruckTransportSolver1, test_case)[0]]
+    xs = [x for x, _ in test_case.queries]
+    ys = [y for _, y in test_case.queries]
+    engines = ["python", "numpy"] if np is not None else ["python"]
+    for solver_class in (TruckTransportSolver1, TruckTransportSolver2, TruckTransportSolver3):
+        for engine in engines:
+            solver = solve_case(solver_class(test_case.n, test_case.m, engine=engine), test_case)
+            ok = [bool(v) for v in solver.connected_many(xs, ys)] == expected
+            print(f"  {solver_class.__name__} {engine} connected_many: {'✓ 一致' if ok else '✗ 不一致'}")
+            if not ok:
+                return False
+
+    print("\n✓ 并查集测试通过!")
+    return True
+
+
+def test_skew_binary():
+    """跳跃指针测试：线性内存的斜二进制跳跃指针与倍增结果一致"""
+    print("\n" + "=" * 60)
+    print("斜二进制跳跃指针测试")
+    print("=" * 60)
+
+    import random
+
+    rng = random.Random(15)
+    engines = ["python", "numpy"] if np is not None else ["python"]
+    cases = [make_random_case(rng, n, m, 300, f"随机 n={n}") for n, m in ((50, 40), (300, 600), (1000, 1100))]
+    # 随机长链：深度接近 n，跳跃指针要走多段
+    n = 3000
+    chain = [(i, i + 1, rng.randint(1, 1000)) for i in range(1, n)]
+    queries = [(rng.randint(1, n), rng.randint(1, n)) for _ in range(300)]
+    cases.append(TestCase("随机长链", n, len(chain), chain, queries, None))
+
+    for test_case in cases:
+        expected, _ = run_test_case(TruckTransportSolver1, test_case)
+        xs = [x for x, _ in test_case.queries]
+        ys = [y for _, y in test_case.queries]
+        for engine in engines:
+            solver = solve_case(TruckTransportSolver1Skew(test_case.n, test_case.m, engine=engine), test_case)
+            single = [solver.query_max_weight(x, y) for x, y in test_case.queries]
+            batch = batch_answers(solver, xs, ys)
+            ok = single == expected and batch == expected
+            print(f"  {test_case.name} {engine}: {'✓ 一致' if ok else '✗ 不一致'}")
+            if not ok:
+                print("  ⚠️  测试失败!")
+                return False
+
+    print("\n✓ 斜二进制跳跃指针测试通过!")
+    return True
+
+
+def test_filter_kruskal():
+    """Filter-Kruskal 测试：与完整排序的 Kruskal 结果一致，并在 stats() 中报告模式"""
+    print("\n" + "=" * 60)
+    print("Filter-Kruskal 测试")
+    print("=" * 60)
+
+    import random
+    from common import EdgeStore
+
+    rng = random.Random(16)
+    engines = ["python", "numpy"] if np is not None else ["python"]
+    # 稠密图（边权范围小，大量相同边权）与不连通的稠密图（无法提前结束）
+    cases = [make_random_case(rng, 200, 4000, 300, "稠密图", max_weight=50)]
+    half = make_random_case(rng, 100, 2000, 0, "不连通")
+    edges = half.edges + [(u + 100, v + 100, w) for u, v, w in half.edges]
+    queries = [(rng.randint(1, 200), rng.randint(1, 200)) for _ in range(300)]
+    cases.append(TestCase("不连通稠密图", 200, len(edges), edges, queries, None))
+    # m < n - 1：Method 2 的并查集只有 n + m 个元素，过滤较轻的大段时不能越界
+    # 约九成边权为 1：无论轴取到哪种边权，较重的一段处理完后都会剩下一段超过过滤阈值的边
+    sparse = make_random_case(rng, 10000, 9000, 300, "稀疏")
+    edges = [(u, v, 2 if w > 90 else 1) for u, v, w in sparse.edges]
+    cases.append(TestCase("m < n - 1", sparse.n, sparse.m, edges, sparse.queries, None))
+
+    for test_case in cases:
+        expected, _ = run_test_case(TruckTransportSolver1, test_case)
+        for solver_class in (TruckTransportSolver1, TruckTransportSolver2, TruckTransportSolver3):
+            for engine in engines:
+                solver = solve_case(solver_class(test_case.n, test_case.m, engine=engine, mst_mode="filter"), test_case)
+                results = [solver.query_max_weight(x, y) for x, y in test_case.queries]
+                stats = solver.stats()
+                ok = results == expected and stats["mst_mode"] == "filter"
+                print(f"  {test_case.name} {solver_class.__name__} {engine}: "
+                      f"检查 {stats['edges_scanned']}/{test_case.m} 条边 {'✓ 一致' if ok else '✗ 不一致'}")
+                if not ok:
+                    print("  ⚠️  测试失败!")
+                    return False
+
+    # 小的 base_size 让划分和过滤反复发生；产出的生成森林边权与完整排序相同
+    for use_list in (False, True):
+        store = EdgeStore()
+        for u, v, w in cases[0].edges:
+            store.append(u, v, w)
+        if use_list:
+            store.ws = list(store.ws)  # 走纯 Python 实现
+        forests = []
+        for edges_iter in ("sort", "filter"):
+            uf = UnionFind(cases[0].n)
+            order = store.descending() if edges_iter == "sort" else store.descending_filtered(uf, base_size=8)
+            forests.append(sorted(w for u, v, w in order if uf.union(u, v)))
+        ok = forests[0] == forests[1]
+        print(f"  descending_filtered({'list' if use_list else 'array'}): {'✓ 一致' if ok else '✗ 不一致'}")
+        if not ok:
+            return False
+
+    print("\n✓ Filter-Kruskal 测试通过!")
+    return True
+
+
+def test_boruvka():
+    """Borůvka 测试：向量化 Borůvka 得到的树邻接表与 Kruskal 完全相同"""
+    print("\n" + "=" * 60)
+    print("向量化 Borůvka 测试")
+    print("=" * 60)
+
+    if np is None:
+        print("  未安装 NumPy，跳过")
+        return True
+
+    import random
+
+    rng = random.Random(17)
+    cases = [
+        make_random_case(rng, 300, 1500, 200, "大量相同边权", max_weight=5),
+        make_random_case(rng, 400, 300, 200, "稀疏不连通"),
+    ]
+    # 自环、重边和超出直接编码范围的边权（走名次键）
+    edges = [(1, 1, 9), (1, 2, 5), (1, 2, 5), (2, 3, (1 << 62)), (3, 4, -(1 << 62)), (4, 5, 7), (5, 1, 7)]
+    cases.append(TestCase("自环与极端边权", 6, len(edges), edges, [(1, 4), (2, 5), (6, 1), (3, 3)], None))
+
+    for test_case in cases:
+        expected, _ = run_test_case(TruckTransportSolver1, test_case)
+        for solver_class in (TruckTransportSolver1, TruckTransportSolver2, TruckTransportSolver3):
+            reference = solve_case(solver_class(test_case.n, test_case.m, mst_mode="sort"), test_case)
+            for engine in ("python", "numpy"):
+                if engine == "numpy" and test_case.name == "自环与极端边权":
+                    continue  # numpy 引擎的 inf 哨兵要求边权小于 INT_INF
+                solver = solve_case(solver_class(test_case.n, test_case.m, engine=engine, mst_mode="boruvka"), test_case)
+                results = [solver.query_max_weight(x, y) for x, y in test_case.queries]
+                ok = (results == expected and solver.tree.adj == reference.tree.adj
+                      and solver.stats()["mst_mode"] == "boruvka")
+                print(f"  {test_case.name} {solver_class.__name__} {engine}: {'✓ 一致' if ok else '✗ 不一致'}")
+                if not ok:
+                    print("  ⚠️  测试失败!")
+                    return False
+
+    print("\n✓ 向量化 Borůvka 测试通过!")
+    return True
+
+
+def test_benchmark():
+    """基准测试脚本测试：各图族可生成、结果 JSON 可与基线对比，变慢超过阈值时退出码为 1"""
+    print("\n" + "=" * 60)
+    print("基准测试脚本测试")
+    print("=" * 60)
+
+    import json
+    import os
+    import tempfile
+    import benchmark
+
+    # 各图族生成的图在所有求解器上答案一致
+    for family in benchmark.FAMILIES:
+        n, us, vs, ws = benchmark.make_graph(family, 200, 600, seed=5)
+        queries = [(x, y) for x, y in zip(range(1, n + 1, 7), range(n, 0, -7))]
+        answers = []
+        for solver_class in (TruckTransportSolver1, TruckTransportSolver1Skew, TruckTransportSolver2):
+            solver = solver_class.from_edges(n, us, vs, ws)
+            solver.solve()
+            answers.append([solver.query_max_weight(x, y) for x, y in queries])
+        ok = len(us) == len(vs) == len(ws) and all(a == answers[0] for a in answers)
+        print(f"  {family}: n={n}, m={len(us)} {'✓ 一致' if ok else '✗ 不一致'}")
+        if not ok:
+            print("  ⚠️  测试失败!")
+            return False
+
+    # 长链和星形的最大生成树就是骨架本身：深度分别为 n - 1 和 1
+    for family, depth in (("chain", 1999), ("star", 1)):
+        n, us, vs, ws = benchmark.make_graph(family, 2000, 16000, seed=5)
+        solver = TruckTransportSolver1.from_edges(n, us, vs, ws)
+        solver.solve()
+        height = max(solver.depth[1:]) - min(solver.depth[1:])  # 根为节点 1（链的端点、星形的中心）
+        ok = height == depth
+        print(f"  {family} 生成树深度 {height}: {'✓ 正确' if ok else '✗ 错误'}")
+        if not ok:
+            print("  ⚠️  测试失败!")
+            return False
+
+    with tempfile.TemporaryDirectory() as tmp:
+        current = os.path.join(tmp, "current.json")
+        baseline = os.path.join(tmp, "baseline.json")
+        output = StringIO()
+        old_stdout = sys.stdout
+        sys.stdout = output
+        try:
+            code = benchmark.main(["run", "--families", "random,grid", "--n", "300", "--m-factor", "2",
+                                   "--solvers", "method1,method2", "--q", "50", "--warmup", "0",
+                                   "--repeat", "1", "--output", current])
+            with open(current) as f:
+                result = json.load(f)
+            same = benchmark.main(["compare", current, current, "--threshold", "0"])
+
+            # 把基线改快一倍，对比应当报告变慢
+            faster = dict(result, results=[dict(r, median_ns=r["median_ns"] // 2 - 1) for r in result["results"]])
+            with open(baseline, "w") as f:
+                json.dump(faster, f)
+            slower = benchmark.main(["compare", baseline, current, "--threshold", "0.5"])
+
+            # 与基线没有任何相同的条目时不能算通过
+            other = dict(result, results=[dict(r, family="chain") for r in result["results"]])
+            with open(baseline, "w") as f:
+                json.dump(other, f)
+            unmatched = benchmark.main(["compare", baseline, current])
+        finally:
+            sys.stdout = old_stdout
+
+    phases = {(r["family"], r["solver"], r["phase"]) for r in result["results"]}
+    ok = (code == 0 and same == 0 and slower == 1 and unmatched == 1 and len(phases) == 8
+          and "REGRESSION" in output.getvalue())
+    print(f"  运行与对比: {'✓ 正确' if ok else '✗ 错误'}")
+    if not ok:
+        print("  ⚠️  测试失败!")
+        return False
+
+    print("\n✓ 基准测试脚本测试通过!")
+    return True
+
+
+def test_profiling():
+    """分阶段计时测试：开启后答案不变，stats() 含各阶段耗时和计数；未开启时不含"""
+    print("\n" + "=" * 60)
+    print("分阶段计时测试")
+    print("=" * 60)
+
+    import random
+
+    rng = random.Random(19)
+    test_case = make_random_case(rng, 300, 900, 200, "随机图")
+    expected, _ = run_test_case(TruckTransportSolver1, test_case)
+    xs = [x for x, _ in test_case.queries]
+    ys = [y for _, y in test_case.queries]
+    phases = {
+        TruckTransportSolver1: {"sort", "kruskal", "traversal", "lifting", "query"},
+        TruckTransportSolver1Skew: {"sort", "kruskal", "traversal", "jump_pointers", "query"},
+        TruckTransportSolver2: {"sort", "kruskal", "traversal", "heavy_light", "query"},
+        TruckTransportSolver3: {"sort", "kruskal", "euler_tour", "sparse_table", "query"},
+    }
+
+    engines = ("python", "numpy") if np is not None else ("python",)
+    for solver_class, names in phases.items():
+        for engine in engines:
+            plain = solve_case(solver_class(test_case.n, test_case.m, engine=engine), test_case)
+            solver = solver_class(test_case.n, test_case.m, engine=engine)
+            solver.enable_profiling()
+            solve_case(solver, test_case)
+            if engine == "numpy":
+                results = batch_answers(solver, xs, ys)
+            else:
+                results = [solver.query_max_weight(x, y) for x, y in test_case.queries]
+            stats = solver.stats()
+            counters = stats["counters"]
+            ok = (results == expected
+                  and "phases_ns" not in plain.stats()
+                  and set(stats["phases_ns"]) == names
+                  and counters["queries"] == len(test_case.queries)
+                  and counters["query_steps"] == sum(solver.query_steps(x, y) for x, y in test_case.queries)
+                  and counters["unions"] == stats["tree_edges"]
+                  and counters["dsu_finds"] >= stats["edges_scanned"])
+            print(f"  {solver_class.__name__} {engine}: {'✓ 正确' if ok else '✗ 错误'}")
+            if not ok:
+                print("  ⚠️  测试失败!")
+                return False
+
+    # 长链上两种方法的跳跃次数都是 O(log n)
+    n = 1024
+    for solver_class, bound in ((TruckTransportSolver1, 2 * n.bit_length()), (TruckTransportSolver2, n.bit_length())):
+        solver = solver_class.from_edges(n, list(range(1, n)), list(range(2, n + 1)), [5] * (n - 1))
+        solver.solve()
+        ok = solver.query_steps(1, n) <= bound and solver.query_steps(1, n) == solver.query_steps(n, 1)
+        print(f"  长链 {solver_class.__name__} 跳跃次数 {solver.query_steps(1, n)}: {'✓ 正确' if ok else '✗ 错误'}")
+        if not ok:
+            print("  ⚠️  测试失败!")
+            return False
+
+    print("\n✓ 分阶段计时测试通过!")
+    return True
+
+
+def test_memory_report():
+    """内存报告测试：各阶段有峰值和保留量，常驻结构大小与数组实际大小相符"""
+    print("\n" + "=" * 60)
+    print("内存报告测试")
+    print("=" * 60)
+
+    import random
+
+    rng = random.Random(20)
+    test_case = make_random_case(rng, 500, 1500, 100, "随机图")
+    expected, _ = run_test_case(TruckTransportSolver1, test_case)
+    structures = {
+        TruckTransportSolver1: {"edges", "tree.adj", "dsu", "lifting"},
+        TruckTransportSolver1Skew: {"edges", "tree.adj", "dsu", "jump_pointers"},
+        TruckTransportSolver2: {"edges", "tree.adj", "dsu", "hld"},
+        TruckTransportSolver3: {"edges", "tree.adj", "dsu", "hld", "euler_rmq"},
+    }
+
+    engines = ("python", "numpy") if np is not None else ("python",)
+    for solver_class, names in structures.items():
+        for engine in engines:
+            solver = solver_class(test_case.n, test_case.m, engine=engine)
+            solver.enable_memory_report()
+            solve_case(solver, test_case)
+            results = [solver.query_max_weight(x, y) for x, y in test_case.queries]
+            memory = solver.stats()["memory"]
+            sizes = memory["structures"]
+            ok = (results == expected
+                  and set(sizes) == names
+                  and all(size > 0 for size in sizes.values())
+                  and sizes["edges"] >= 16 * test_case.m  # 两个 int32 列加一个 int64 列
+                  and memory["total_bytes"] == sum(sizes.values())
+                  and memory["bytes_per_node"] == memory["total_bytes"] / test_case.n
+                  and all(entry["peak_bytes"] >= max(entry["retained_bytes"], 0)
+                          for name, entry in memory["phases"].items() if name != "query")
+                  and memory["phases"]["sort"]["peak_bytes"] > 0)
+            if ok and engine == "numpy" and solver_class is TruckTransportSolver1:
+                ok = sizes["lifting"] >= solver.parent.nbytes + solver.min_weight.nbytes
+            print(f"  {solver_class.__name__} {engine}: {memory['bytes_per_node']:.0f} B/node "
+                  f"{'✓ 正确' if ok else '✗ 错误'}")
+            if not ok:
+                print("  ⚠️  测试失败!")
+                return False
+
+    print("\n✓ 内存报告测试通过!")
+    return True
+
+
+def test_floyd_engines():
+    """Floyd 对照测试：numpy 引擎与纯 Python 的瓶颈 Floyd 结果相同，且与 Method 1 一致"""
+    print("\n" + "=" * 60)
+    print("瓶颈 Floyd 引擎测试")
+    print("=" * 60)
+
+    if np is None:
+        print("  未安装 NumPy，跳过")
+        return True
+
+    import cmp_method1_floyd as floyd
+
+    for n, m, tile in ((60, 80, 7), (120, 400, 64), (90, 50, 0)):
+        edges = floyd.make_random_graph(n, m, seed=n)
+        expected = floyd.floyd_bottleneck(n, edges)
+        dp = floyd.floyd_bottleneck_numpy(n, edges, tile=tile)
+        solver = TruckTransportSolver1.from_edges(n, *zip(*edges))
+        solver.solve()
+        ok = all(
+            (dp[i][j] == 0 and expected[i][j] == 0 and solver.query_max_weight(i + 1, j + 1) == -1)
+            or (i == j and expected[i][j] == float('inf'))
+            or (dp[i][j] == expected[i][j] == solver.query_max_weight(i + 1, j + 1))
+            for i in range(n) for j in range(n)
+        )
+        print(f"  n={n}, m={m}, tile={tile}: {'✓ 一致' if ok else '✗ 不一致'}")
+        if not ok:
+            print("  ⚠️  测试失败!")
+            return False
+
+    # 超过阈值时跳过 Floyd
+    result = floyd.run_one_trial(50, 80, 10, 1, 1, 100, False, "numpy", skip_floyd_threshold=40)
+    ok = result[0] is None and result[4] is None
+    print(f"  超过阈值跳过: {'✓ 正确' if ok else '✗ 错误'}")
+    if not ok:
+        print("  ⚠️  测试失败!")
+        return False
+
+    print("\n✓ 瓶颈 Floyd 引擎测试通过!")
+    return True
+
+
+def test_all_pairs():
+    """全点对矩阵测试：由合并顺序得到的矩阵与逐个查询的结果相同，可写入内存映射的 .npy 文件"""
+    print("\n" + "=" * 60)
+    print("全点对瓶颈矩阵测试")
+    print("=" * 60)
+
+    if np is None:
+        print("  未安装 NumPy，跳过")
+        return True
+
+    import os
+    import random
+    import tempfile
+
+    def matches(solver, matrix, n):
+        xs = [x for x in range(1, n + 1) for _ in range(n)]
+        ys = [y for _ in range(n) for y in range(1, n + 1)]
+        diagonal = np.iinfo(matrix.dtype).max
+        expected = [diagonal if a == float('inf') else a for a in batch_answers(solver, xs, ys)]
+        return np.array_equal(np.asarray(expected).reshape(n, n), matrix)
+
+    rng = random.Random(22)
+    cases = [
+        make_random_case(rng, 60, 90, 1, "随机图"),
+        make_random_case(rng, 80, 50, 1, "稀疏不连通", max_weight=5),
+        TestCase("孤立点", 3, 0, [], [], None),
+    ]
+    for test_case in cases:
+        for solver_class in (TruckTransportSolver1, TruckTransportSolver1Skew,
+                             TruckTransportSolver2, TruckTransportSolver3):
+            for engine in ("python", "numpy"):
+                solver = solve_case(solver_class(test_case.n, test_case.m, engine=engine), test_case)
+                matrix = solver.all_pairs()
+                ok = matrix.shape == (test_case.n, test_case.n) and matches(solver, matrix, test_case.n)
+                if not ok:
+                    print(f"  {test_case.name} {solver_class.__name__} {engine}: ✗ 不一致")
+                    print("  ⚠️  测试失败!")
+                    return False
+        print(f"  {test_case.name}: ✓ 一致（dtype {matrix.dtype}）")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        test_case = cases[0]
+        solver = solve_case(TruckTransportSolver2(test_case.n, test_case.m), test_case)
+        path = os.path.join(tmp, "all_pairs.npy")
+        matrix = solver.all_pairs(path=path)
+        loaded = np.load(path, mmap_mode="r")
+        ok = isinstance(matrix, np.memmap) and np.array_equal(loaded, solver.all_pairs())
+        del matrix, loaded
+
+        # 从索引文件加载的只读求解器同样可以导出
+        for solver_class in (TruckTransportSolver1, TruckTransportSolver2):
+            index_path = os.path.join(tmp, f"{solver_class.__name__}.idx")
+            built = solve_case(solver_class(test_case.n, test_case.m), test_case)
+            built.save_index(index_path)
+            restored = solver_class.load_index(index_path, engine="numpy")
+            ok = ok and np.array_equal(restored.all_pairs(), built.all_pairs())
+    print(f"  内存映射文件与索引加载: {'✓ 正确' if ok else '✗ 错误'}")
+    if not ok:
+        print("  ⚠️  测试失败!")
+        return False
+
+    print("\n✓ 全点对瓶颈矩阵测试通过!")
+    return True
+
+
+def test_reachability():
+    """阈值可达查询测试：reachable_set / reachable_count / can_ship 与逐对查询的结果一致"""
+    print("\n" + "=" * 60)
+    print("阈值可达查询测试")
+    print("=" * 60)
+
+    import os
+    import random
+    import tempfile
+
+    rng = random.Random(23)
+    cases = [
+        make_random_case(rng, 120, 200, 1, "随机图", max_weight=20),
+        make_random_case(rng, 150, 90, 1, "稀疏不连通", max_weight=5),
+    ]
+    n = 300
+    chain = [(i, i + 1, n - i) for i in range(1, n)]
+    cases.append(TestCase("长链（边权递减）", n, len(chain), chain, [], None))
+
+    engines = ("python", "numpy") if np is not None else ("python",)
+    with tempfile.TemporaryDirectory() as tmp:
+        for test_case in cases:
+            solvers = []
+            for solver_class in (TruckTransportSolver2, TruckTransportSolver3):
+                for engine in engines:
+                    solvers.append((f"{solver_class.__name__} {engine}",
+                                    solve_case(solver_class(test_case.n, test_case.m, engine=engine), test_case)))
+            # 从索引文件加载的 Method 2 同样可以回答
+            path = os.path.join(tmp, "method2.idx")
+            solvers[0][1].save_index(path)
+            solvers.append(("TruckTransportSolver2 索引", TruckTransportSolver2.load_index(path)))
+
+            reference = solvers[0][1]
+            weights = sorted({w for _, _, w in test_case.edges} | {0, 1 << 40})
+            for name, solver in solvers:
+                ok = True
+                for x in range(1, test_case.n + 1, 3):
+                    for weight in weights[::max(1, len(weights) // 6)] + [weights[-1]]:
+                        expected = sorted(y for y in range(1, test_case.n + 1)
+                                          if y == x or reference.query_max_weight(x, y) >= weight)
+                        reached = sorted(int(y) for y in solver.reachable_set(x, weight))
+                        y = rng.randint(1, test_case.n)
+                        if (reached != expected or solver.reachable_count(x, weight) != len(expected)
+                                or solver.can_ship(x, y, weight) != (y in expected)):
+                            ok = False
+                print(f"  {test_case.name} {name}: {'✓ 一致' if ok else '✗ 不一致'}")
+                if not ok:
+                    print("  ⚠️  测试失败!")
+                    return False
+
+    print("\n✓ 阈值可达查询测试通过!")
+    return True
+
+
+def test_external_sort():
+    """外部排序测试：多路归并送入 Kruskal 得到的树与内存中排序完全相同，命令行输出一致"""
+    print("\n" + "=" * 60)
+    print("外部排序测试")
+    print("=" * 60)
+
+    import os
+    import random
+    import subprocess
+    import tempfile
+    from external_sort import sort_edges
+
+    rng = random.Random(24)
+    cases = [
+        make_random_case(rng, 200, 1200, 200, "大量相同边权", max_weight=8),
+        make_random_case(rng, 300, 250, 200, "稀疏不连通"),
+    ]
+    engines = ["python", "numpy"] if np is not None else ["python"]
+
+    for test_case in cases:
+        expected, _ = run_test_case(TruckTransportSolver1, test_case)
+        for solver_class in (TruckTransportSolver1, TruckTransportSolver2, TruckTransportSolver3):
+            reference = solve_case(solver_class(test_case.n, test_case.m, mst_mode="sort"), test_case)
+            for engine in engines:
+                # 很小的段和 fan_in 让分组归并也被执行
+                with sort_edges(iter(test_case.edges), chunk_size=37, fan_in=3) as runs:
+                    solver = solver_class.from_sorted_runs(test_case.n, runs, engine=engine)
+                    solver.solve()
+                    passes = runs.passes
+                results = [solver.query_max_weight(x, y) for x, y in test_case.queries]
+                ok = results == expected and solver.tree.adj == reference.tree.adj and passes > 0
+                print(f"  {test_case.name} {solver_class.__name__} {engine}: {'✓ 一致' if ok else '✗ 不一致'}")
+                if not ok:
+                    print("  ⚠️  测试失败!")
+                    return False
+
+    # 非整数边权直接报错，临时目录被删除
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            sort_edges([(1, 2, 3), (2, 3, 1.5)], chunk_size=1, tmpdir=tmp)
+            ok = False
+        except ValueError:
+            ok = os.listdir(tmp) == []
+        print(f"  非整数边权: {'✓ 一致' if ok else '✗ 不一致'}")
+        if not ok:
+            return False
+
+    # 命令行：--external-sort 与逐行读写的输出相同
+    test_case = cases[0]
+    lines = [f"{test_case.n} {test_case.m}"]
+    lines += [f"{u} {v} {w}" for u, v, w in test_case.edges]
+    lines.append(str(len(test_case.queries)))
+    lines += [f"{x} {y}" for x, y in test_case.queries]
+    text = "\n".join(lines) + "\n"
+    src_dir = os.path.dirname(os.path.abspath(__file__))
+    for script in ("method1_binary_lifting.py", "method2_tree_chain.py"):
+        outputs = []
+        for flags in ([], ["--external-sort", "100"], ["--external-sort", "100", "--engine", engines[-1]]):
+            completed = subprocess.run(
+                [sys.executable, script] + flags, input=text, cwd=src_dir,
+                capture_output=True, text=True, check=True
+            )
+            outputs.append(completed.stdout)
+        ok = all(out == outputs[0] for out in outputs) and outputs[0].count("\n") == len(test_case.queries)
+        print(f"  {script} --external-sort: {'✓ 一致' if ok else '✗ 不一致'}")
+        if not ok:
+            print("  ⚠️  测试失败!")
+            return False
+
+    print("\n✓ 外部排序测试通过!")
+    return True
+
+
+def test_radix_sort():
+    """基数排序测试：有界整数边权的降序与稳定比较排序相同，Kruskal 在 n - 连通分量数条边时停止"""
+    print("\n" + "=" * 60)
+    print("基数排序与提前结束测试")
+    print("=" * 60)
+
+    import random
+    from common import EdgeStore, descending_argsort, radix_descending_order
+
+    if np is not None:
+        rng = np.random.default_rng(25)
+        # 单位（计数排序）、两位、三位基数排序，以及超出范围退回比较排序
+        for low, high, radix in ((0, 3, True), (-300, 300, True), (-(1 << 30), 1 << 30, True),
+                                 (0, (1 << 48) - 1, True), (-(1 << 62), 1 << 62, False)):
+            ws = rng.integers(low, high, 20000, dtype=np.int64, endpoint=True)
+            expected = sorted(range(len(ws)), key=ws.tolist().__getitem__, reverse=True)
+            ok = (descending_argsort(ws).tolist() == expected
+                  and (radix_descending_order(ws) is not None) == radix)
+            print(f"  边权范围 [{low}, {high}]: {'✓ 一致' if ok else '✗ 不一致'}")
+            if not ok:
+                print("  ⚠️  测试失败!")
+                return False
+
+    # 连通分量数与逐条合并的并查集相同；不连通图上 Kruskal 不再扫描全部边
+    rng = random.Random(25)
+    n = 400
+    edges = []
+    for offset in (0, 150, 300):  # 三个稠密块，另有若干孤立点
+        for _ in range(600):
+            edges.append((offset + rng.randint(1, 100), offset + rng.randint(1, 100), rng.randint(1, 1000)))
+    edges.append((1, 1, 0))  # 最轻的边是自环，扫描到它之前森林就已完整
+    store = EdgeStore()
+    uf = UnionFind(n)
+    for u, v, w in edges:
+        store.append(u, v, w)
+        uf.union(u, v)
+    components = sum(1 for u in range(1, n + 1) if uf.find(u) == u)
+    counted = store.component_count(n)
+    ok = counted == components if np is not None else counted <= components
+    print(f"  连通分量数 {counted}/{components}: {'✓ 一致' if ok else '✗ 不一致'}")
+    if not ok:
+        return False
+
+    test_case = TestCase("多个连通分量", n, len(edges), edges,
+                         [(rng.randint(1, n), rng.randint(1, n)) for _ in range(300)], None)
+    expected, _ = run_test_case(TruckTransportSolver1, test_case)
+    for solver_class in (TruckTransportSolver1, TruckTransportSolver2, TruckTransportSolver3):
+        solver = solve_case(solver_class(test_case.n, test_case.m, mst_mode="sort"), test_case)
+        results = [solver.query_max_weight(x, y) for x, y in test_case.queries]
+        stats = solver.stats()
+        ok = (results == expected and stats["tree_edges"] == n - components
+              and (np is None or stats["edges_scanned"] < test_case.m))
+        print(f"  {solver_class.__name__}: 检查 {stats['edges_scanned']}/{test_case.m} 条边 "
+              f"{'✓ 一致' if ok else '✗ 不一致'}")
+        if not ok:
+            print("  ⚠️  测试失败!")
+            return False
+
+    print("\n✓ 基数排序与提前结束测试通过!")
+    return True
+
+
 def test_performance():
     """性能测试：在较大规模数据下对比两种方法"""
     print("\n" + "=" * 60)
@@ -352,6 +1648,98 @@ def main():
     if not test_consistency():
         all_passed = False
 
+    # 运行长链测试
+    if not test_deep_chain():
+        all_passed = False
+
+    # 运行 numpy 引擎测试
+    if not test_numpy_engine():
+        all_passed = False
+
+    # 运行离线 Tarjan 测试
+    if not test_offline_tarjan():
+        all_passed = False
+
+    # 运行 Method 3 测试
+    if not test_euler_rmq():
+        all_passed = False
+
+    # 运行命令行批量输入输出测试
+    if not test_fast_io():
+        all_passed = False
+
+    # 运行增量加边测试
+    if not test_incremental():
+        all_passed = False
+
+    # 运行离线全动态测试
+    if not test_offline_dynamic():
+        all_passed = False
+
+    # 运行预处理索引文件测试
+    if not test_index_file():
+        all_passed = False
+
+    # 运行查询服务测试
+    if not test_query_service():
+        all_passed = False
+
+    # 运行查询缓存测试
+    if not test_query_cache():
+        all_passed = False
+
+    # 运行边存储测试
+    if not test_edge_store():
+        all_passed = False
+
+    # 运行并查集测试
+    if not test_union_find():
+        all_passed = False
+
+    # 运行斜二进制跳跃指针测试
+    if not test_skew_binary():
+        all_passed = False
+
+    # 运行 Filter-Kruskal 测试
+    if not test_filter_kruskal():
+        all_passed = False
+
+    # 运行 Borůvka 测试
+    if not test_boruvka():
+        all_passed = False
+
+    # 运行基准测试脚本测试
+    if not test_benchmark():
+        all_passed = False
+
+    # 运行分阶段计时测试
+    if not test_profiling():
+        all_passed = False
+
+    # 运行内存报告测试
+    if not test_memory_report():
+        all_passed = False
+
+    # 运行瓶颈 Floyd 引擎测试
+    if not test_floyd_engines():
+        all_passed = False
+
+    # 运行全点对瓶颈矩阵测试
+    if not test_all_pairs():
+        all_passed = False
+
+    # 运行阈值可达查询测试
+    if not test_reachability():
+        all_passed = False
+
+    # 运行外部排序测试
+    if not test_external_sort():
+        all_passed = False
+
+    # 运行基数排序测试
+    if not test_radix_sort():
+        all_passed = False
+
     # 运行性能测试
     test_performance()
 